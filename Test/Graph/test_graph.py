@@ -2,6 +2,7 @@ import netket as nk
 import networkx as nx
 import igraph as ig
 import math
+import numpy as np
 
 from netket.graph import *
 
@@ -273,3 +274,18 @@ def test_union():
 
         assert ug.n_nodes == graph1.n_nodes + graph.n_nodes
         assert ug.n_edges == graph1.n_edges + graph.n_edges
+
+
+def test_grid_translations():
+    for length in [[5], [4, 3], [3, 3, 4]]:
+        g = nk.graph.Grid(length=length, pbc=True)
+        translations = g.translations()
+        assert translations.shape == (g.n_nodes, g.n_nodes)
+
+        # The translations are a subgroup of the automorphisms
+        autom = set(map(tuple, np.asarray(g.automorphisms())))
+        assert all(tuple(p) in autom for p in translations)
+        assert len(set(map(tuple, translations))) == g.n_nodes
+
+    with pytest.raises(ValueError):
+        nk.graph.Grid(length=[4, 3], pbc=[True, False]).translations()
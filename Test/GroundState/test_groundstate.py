@@ -1,4 +1,5 @@
 import json
+import pytest
 from pytest import approx
 import netket as nk
 import numpy as np
@@ -60,6 +61,112 @@ def test_vmc_advance_iterative():
     assert (ma1.parameters == ma2.parameters).all()
 
 
+def test_vmc_persistent_chains():
+    ma, vmc, _ = _setup_vmc(n_samples=500, diag_shift=0.01, persistent_chains=True)
+
+    vmc.advance(20)
+    assert vmc._chain_stats is not None
+    assert vmc.estimate(vmc._ham).mean.real == approx(-10.25, abs=0.5)
+
+    vmc.reset()
+    assert vmc._chain_stats is None
+
+
+def test_adaptive_n_discard():
+    from netket.stats import Stats
+
+    assert nk.vmc_common.adaptive_n_discard(None, 100) == 100
+
+    stats = Stats(mean=1.0, tau_corr=3.2, R_hat=1.01)
+    assert nk.vmc_common.adaptive_n_discard(stats, 100) == 7
+    assert nk.vmc_common.adaptive_n_discard(stats, 5) == 5
+
+    stats = Stats(mean=1.0, tau_corr=3.2, R_hat=1.5)
+    assert nk.vmc_common.adaptive_n_discard(stats, 100) == 100
+
+    stats = Stats(mean=1.0, tau_corr=float("nan"), R_hat=float("nan"))
+    assert nk.vmc_common.adaptive_n_discard(stats, 100) == 100
+
+
+def test_vmc_tune_sweep_size():
+    ma, vmc, _ = _setup_vmc(n_samples=500, diag_shift=0.01, tune_sweep_size=True)
+
+    for step in vmc.iter(30):
+        sweep_size = vmc._sampler.sweep_size
+        assert 1 <= sweep_size <= 10 * ma.input_size
+
+    assert vmc.energy.mean.real < -9.5
+
+    with pytest.raises(ValueError):
+        nk.Vmc(
+            vmc._ham,
+            nk.sampler.ExactSampler(ma),
+            nk.optimizer.Sgd(ma, learning_rate=0.1),
+            n_samples=100,
+            tune_sweep_size=True,
+        )
+
+    # The times of sampling and local energies overlap when pipelining
+    with pytest.raises(ValueError):
+        _setup_vmc(n_samples=500, tune_sweep_size=True, pipeline_depth=2)
+
+
+def test_tuned_sweep_size():
+    from netket.stats import Stats
+    from netket.vmc_common import tuned_sweep_size
+
+    assert tuned_sweep_size(None, 8, 1.0, 1.0, 100) == 8
+
+    # The optimal sweep size is sqrt(2 * tau_moves * b / a) = 64
+    stats = Stats(mean=1.0, tau_corr=256.0, R_hat=1.0)
+    assert tuned_sweep_size(stats, 8, 1.0, 1.0, 100) == 16
+    assert tuned_sweep_size(stats, 32, 1.0, 1.0, 100) == 64
+    assert tuned_sweep_size(stats, 32, 1.0, 1.0, 40) == 32
+
+    # Sweep sizes which are not powers of two
+    assert tuned_sweep_size(stats, 6, 1.0, 1.0, 60) == 8
+    assert tuned_sweep_size(stats, 20, 1.0, 1.0, 60) == 32
+    assert tuned_sweep_size(stats, 20, 1.0, 1.0, 30) == 16
+
+    # Uncorrelated samples
+    stats = Stats(mean=1.0, tau_corr=0.0, R_hat=1.0)
+    assert tuned_sweep_size(stats, 8, 1.0, 1.0, 100) == 4
+    assert tuned_sweep_size(stats, 1, 1.0, 1.0, 100) == 1
+    assert tuned_sweep_size(stats, 6, 1.0, 1.0, 100) == 4
+
+    # Chains that are not equilibrated
+    stats = Stats(mean=1.0, tau_corr=0.0, R_hat=1.5)
+    assert tuned_sweep_size(stats, 8, 1.0, 1.0, 100) == 8
+    assert tuned_sweep_size(stats, 6, 1.0, 1.0, 100) == 8
+
+
+def test_vmc_pipeline():
+    ma1, vmc1, _ = _setup_vmc(n_samples=500, diag_shift=0.01)
+    vmc1.advance(5)
+
+    ma2, vmc2, _ = _setup_vmc(n_samples=500, diag_shift=0.01, pipeline_depth=3)
+    vmc2.advance(5)
+
+    # Only the local energies are computed in a different thread
+    assert np.array_equal(vmc1._samples, vmc2._samples)
+    assert vmc1.energy.mean == approx(vmc2.energy.mean)
+    assert ma1.parameters == approx(ma2.parameters)
+
+
+def test_vmc_chunk_size():
+    ma, vmc, sx = _setup_vmc(n_samples=500, diag_shift=0.01, chunk_size=37)
+    vmc.advance(2)
+
+    obs = vmc.estimate({"Energy": vmc._ham, "SigmaX": sx})
+
+    vmc.chunk_size = None
+    obs_full = vmc.estimate({"Energy": vmc._ham, "SigmaX": sx})
+
+    for name in "Energy", "SigmaX":
+        assert obs[name].mean == approx(obs_full[name].mean)
+        assert obs[name].variance == approx(obs_full[name].variance)
+
+
 def test_vmc_iterator():
     ma, vmc, sx = _setup_vmc(n_samples=500, diag_shift=0.01)
     operators = {"Energy": vmc._ham, "SigmaX": sx}
@@ -194,6 +301,14 @@ def test_ed():
     assert w_tol.shape == (first_n,)
     assert w_tol == approx(w)
 
+    # Test matrix-free Lanczos ED, enumerating the basis in several chunks
+    ha_op = ha.to_linear_operator(chunk_size=100)
+    v = np.random.rand(hi.n_states) + 1j * np.random.rand(hi.n_states)
+    assert np.allclose(ha_op @ v, ha.to_sparse() @ v)
+
+    w_mf = nk.exact.lanczos_ed(ha, k=first_n, matrix_free=True)
+    assert w_mf == approx(w)
+
     # Test Full ED with eigenvectors
     w_full, v_full = nk.exact.full_ed(ha, compute_eigenvectors=True)
     assert w_full.shape == (hi.n_states,)
@@ -210,6 +325,45 @@ def test_ed():
     assert w == approx(w_full[:3], rel=1e-14, abs=1e-14)
 
 
+def test_ed_symmetry_sectors():
+    L = 8
+    g = nk.graph.Chain(L)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes, total_sz=0)
+    ha = nk.operator.Heisenberg(hi, graph=g)
+
+    w_full = nk.exact.full_ed(ha)
+    translations = [np.roll(np.arange(L), t) for t in range(L)]
+
+    # The spectra of all momentum and spin-flip sectors give the full spectrum
+    w_sectors = []
+    for k in range(L):
+        for parity in [1, -1]:
+            sector = nk.exact.SymmetrySector(
+                hi,
+                translations,
+                characters=np.exp(2j * np.pi * k * np.arange(L) / L),
+                spin_flip=parity,
+            )
+            if sector.n_states == 0:
+                continue
+
+            w, v = nk.exact.full_ed(ha, compute_eigenvectors=True, sector=sector)
+            w_sectors.append(w)
+
+            # Eigenvectors expanded in the full Hilbert space
+            psi = sector.to_full(v[:, 0])
+            assert np.vdot(psi, psi) == approx(1.0)
+            assert np.vdot(psi, ha.to_sparse() @ psi) == approx(w[0])
+
+    assert np.sort(np.concatenate(w_sectors)) == approx(w_full)
+
+    # Symmetric sector of the automorphisms of the graph
+    sector = nk.exact.SymmetrySector(hi, g.automorphisms())
+    assert sector.n_states < hi.n_states // 4
+    w = nk.exact.lanczos_ed(ha, sector=sector)
+    assert w[0] == approx(w_full[0])
+
+
 def test_ed_restricted():
     g = nk.graph.Hypercube(length=8, n_dim=1, pbc=True)
     hi1 = nk.hilbert.Spin(s=0.5, N=g.n_nodes, total_sz=0)
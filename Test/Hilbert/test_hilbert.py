@@ -177,3 +177,74 @@ def test_deprecations():
     hi = Spin(0.5, N=2)
     with pytest.warns(FutureWarning):
         hi.random_vals()
+
+
+def test_compact_states():
+    for name, hi in hilberts.items():
+        if not hi.is_discrete or not hi.is_finite:
+            continue
+
+        states = hi.random_state(size=7)
+
+        # Compact integer type
+        dtype = hi.compact_dtype
+        assert np.array_equal(states.astype(dtype), states)
+        if name.startswith("Custom"):
+            assert dtype == np.int16
+
+        # Local indices
+        indices = hi.states_to_local_indices(states)
+        assert indices.dtype == np.int8
+        assert np.array_equal(hi.local_indices_to_states(indices), states)
+
+        # Bit packing
+        if hi.local_size == 2:
+            words = hi.pack_states(states)
+            assert words.dtype == np.uint64
+            assert words.shape == (7, -(-hi.size // 64))
+            assert np.array_equal(hi.unpack_states(words), states)
+        else:
+            with pytest.raises(ValueError):
+                hi.pack_states(states)
+
+
+def test_compact_conn():
+    g = nk.graph.Hypercube(length=10, n_dim=1)
+    hi = Spin(s=0.5, N=g.n_nodes)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.1)
+
+    states = hi.random_state(size=9)
+    states_c = states.astype(hi.compact_dtype)
+
+    for op in [nk.operator.Ising(hi, g, h=1.0), nk.operator.Heisenberg(hi, g)]:
+        sections = np.empty(states.shape[0], dtype=np.int32)
+        x_primes, mels = op.get_conn_flattened(states, sections)
+        x_primes_c, mels_c = op.get_conn_flattened(states_c, sections)
+
+        # Operators preserve the compact type of the configurations
+        assert x_primes_c.dtype == hi.compact_dtype
+        assert np.array_equal(x_primes, x_primes_c)
+        assert np.array_equal(mels, mels_c)
+
+        assert np.allclose(
+            nk.operator.local_values(op, ma, states),
+            nk.operator.local_values(op, ma, states_c),
+        )
+
+    hi = nk.hilbert.Boson(n_max=3, N=g.n_nodes)
+    op = nk.operator.BoseHubbard(hi, g, U=1.0, V=0.5)
+
+    states = hi.random_state(size=9)
+    states_c = states.astype(hi.compact_dtype)
+
+    sections = np.empty(states.shape[0], dtype=np.int32)
+    x_primes, mels = op.get_conn_flattened(states, sections)
+    x_primes_c, mels_c = op.get_conn_flattened(states_c, sections)
+
+    assert x_primes_c.dtype == hi.compact_dtype
+    assert np.array_equal(x_primes, x_primes_c)
+    assert np.array_equal(mels, mels_c)
+
+    x_primes_c, mels_c = op.get_conn(states_c[0])
+    assert x_primes_c.dtype == hi.compact_dtype
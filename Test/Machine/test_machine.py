@@ -92,6 +92,10 @@ machines["RbmSpinSymm 1d Hypercube spin"] = nk.machine.RbmSpinSymm(
     hilbert=hi, alpha=2, automorphisms=g
 )
 
+machines["RbmSpinSymm 1d Hypercube translations"] = nk.machine.RbmSpinSymm(
+    hilbert=hi, alpha=2, automorphisms=g.translations()
+)
+
 machines["Real RBM"] = nk.machine.RbmSpinReal(hilbert=hi, alpha=2)
 
 machines["Phase RBM"] = nk.machine.RbmSpinPhase(hilbert=hi, alpha=2)
@@ -310,6 +314,123 @@ def test_vector_jacobian():
         same_derivatives(vjp, num_der_log)
 
 
+def test_vector_jacobian_without_jacobian():
+    for name, machine in machines.items():
+        if name.startswith(("Jax", "Torch")):
+            continue
+        print("Machine test: %s" % name)
+
+        hi = machine.hilbert
+        batch_size = 20
+        v = np.zeros((batch_size, machine.input_size))
+        for i in range(batch_size):
+            hi.random_state(out=v[i])
+
+        machine.init_random_parameters(seed=1234, sigma=0.1)
+        vec = np.random.normal(size=batch_size) + 1.0j * np.random.normal(
+            size=batch_size
+        )
+
+        # The product computed without the Jacobian matches the one using it
+        for conjugate in [True, False]:
+            vjp = machine.vector_jacobian_prod(v, vec, conjugate=conjugate)
+            vjp_jac, _ = machine.vector_jacobian_prod(
+                v, vec, conjugate=conjugate, return_jacobian=True
+            )
+            assert vjp == approx(vjp_jac)
+
+
+def test_single_precision():
+    for name, machine in machines.items():
+        print("Machine test: %s" % name)
+        if name.startswith("Torch"):
+            with pytest.raises(ValueError):
+                machine.precision = "single"
+            assert machine.precision == "double"
+            continue
+
+        hi = machine.hilbert
+        batch_size = 20
+        v = np.zeros((batch_size, machine.input_size))
+        for i in range(batch_size):
+            hi.random_state(out=v[i])
+
+        machine.init_random_parameters(seed=1234, sigma=0.1)
+        vec = np.random.normal(size=batch_size) + 1.0j * np.random.normal(
+            size=batch_size
+        )
+
+        log_val = machine.log_val(v)
+        der_log = machine.numpy_flatten(machine.der_log(v))
+        vjp = machine.numpy_flatten(machine.vector_jacobian_prod(v, vec))
+
+        pars = machine.parameters
+        machine.precision = "single"
+        try:
+            log_val_s = machine.log_val(v)
+            der_log_s = machine.numpy_flatten(machine.der_log(v))
+            vjp_s = machine.numpy_flatten(machine.vector_jacobian_prod(v, vec))
+            vjp_jac_s, _ = machine.vector_jacobian_prod(v, vec, return_jacobian=True)
+
+            # The single-precision weights follow the parameters
+            machine.init_random_parameters(seed=4321, sigma=0.1)
+            log_val_new_s = machine.log_val(v)
+        finally:
+            machine.precision = "double"
+
+        log_val_new = machine.log_val(v)
+        machine.parameters = pars
+
+        # The log-values are returned in double precision
+        assert log_val_s.dtype == log_val.dtype
+        assert log_val_s == approx(log_val, rel=1.0e-5, abs=1.0e-5)
+        assert der_log_s == approx(der_log, rel=1.0e-4, abs=1.0e-5)
+        assert vjp_s == approx(vjp, rel=1.0e-4, abs=1.0e-5)
+        assert machine.numpy_flatten(vjp_jac_s) == approx(vjp, rel=1.0e-4, abs=1.0e-5)
+        assert log_val_new_s == approx(log_val_new, rel=1.0e-5, abs=1.0e-5)
+
+        with pytest.raises(ValueError):
+            machine.precision = "half"
+
+    for name, machine in dm_machines.items():
+        print("Density matrix test: %s" % name)
+        with pytest.raises(ValueError):
+            machine.precision = "single"
+        assert machine.precision == "double"
+
+
+def test_rbm_translations():
+    g = nk.graph.Grid(length=[4, 3], pbc=True)
+    hi = Spin(s=0.5, N=g.n_nodes)
+
+    for dtype in [complex, float]:
+        ma = nk.machine.RbmSpinSymm(
+            hilbert=hi, alpha=2, automorphisms=g.translations(), dtype=dtype
+        )
+        assert ma._translations is not None
+        ma.init_random_parameters(seed=1234, sigma=0.2)
+
+        # Same machine, evaluated with the dense weights
+        ma_dense = nk.machine.RbmSpinSymm(
+            hilbert=hi, alpha=2, automorphisms=g.translations(), dtype=dtype
+        )
+        ma_dense._translations = None
+        ma_dense.parameters = ma.parameters
+
+        v = np.array([hi.random_state() for _ in range(10)])
+        vec = np.random.normal(size=10) + 1.0j * np.random.normal(size=10)
+
+        assert ma.log_val(v) == approx(ma_dense.log_val(v))
+        assert ma.der_log(v) == approx(ma_dense.der_log(v))
+        assert ma.vector_jacobian_prod(v, vec) == approx(
+            ma_dense.vector_jacobian_prod(v, vec)
+        )
+
+    # Groups with reflections use the dense weights
+    ma = nk.machine.RbmSpinSymm(hilbert=hi, alpha=2, automorphisms=g)
+    assert ma._translations is None
+
+
 def test_input_size():
     for name, machine in machines.items():
         print("Machine test: %s" % name)
@@ -381,3 +502,115 @@ def test_to_array():
                 np.exp(machine.log_val(rstate.reshape(1, -1)) - logmax) / np.sqrt(norm)
                 - all_psis_normalized[number]
             ) == approx(0.0)
+
+
+def test_fast_update():
+    np.random.seed(12345)
+
+    for name, machine in machines.items():
+        if not machine.has_fast_update:
+            continue
+
+        print("Machine test: %s" % name)
+
+        hi = machine.hilbert
+        machine.init_random_parameters(seed=1234, sigma=0.2)
+
+        batch_size = 10
+        v = np.zeros((batch_size, machine.input_size))
+        for i in range(batch_size):
+            hi.random_state(out=v[i])
+
+        lookup = machine.init_lookup(v)
+
+        for n_changes in [1, 2, 3]:
+            vp = v.copy()
+            sites = np.empty((batch_size, n_changes), dtype=np.int64)
+            for i in range(batch_size):
+                hi.random_state(out=vp[i])
+                sites[i] = np.random.choice(hi.size, size=n_changes, replace=False)
+            vp_changed = v.copy()
+            for i in range(batch_size):
+                vp_changed[i, sites[i]] = vp[i, sites[i]]
+            deltas = np.take_along_axis(vp_changed - v, sites, axis=1)
+
+            # padding is ignored
+            sites[0, -1] = -1
+            vp_changed[0] = v[0]
+            vp_changed[0, sites[0, :-1]] = vp[0, sites[0, :-1]]
+
+            diff = machine.log_val_diff(lookup, sites, deltas)
+            assert diff == approx(machine.log_val(vp_changed) - machine.log_val(v))
+
+            mask = np.arange(batch_size) % 2 == 0
+            lookup_new = lookup.copy()
+            machine.update_lookup(lookup_new, sites, deltas, mask)
+
+            v_updated = np.where(mask.reshape(-1, 1), vp_changed, v)
+            assert lookup_new == approx(machine.init_lookup(v_updated))
+
+
+def test_jastrow_lookup_parameters():
+    hi = Spin(s=0.5, N=8)
+    ma = nk.machine.Jastrow(hilbert=hi, use_visible_bias=True)
+
+    v = np.array([hi.random_state() for _ in range(5)])
+    sites = np.array([[i % hi.size] for i in range(v.shape[0])])
+    deltas = -2.0 * np.take_along_axis(v, sites, axis=1)
+    vp = v.copy()
+    np.put_along_axis(vp, sites, -np.take_along_axis(v, sites, axis=1), axis=1)
+
+    # The lookup tables are computed by another machine with the same
+    # parameters, such that ma.init_lookup is never called
+    ma_lookup = nk.machine.Jastrow(hilbert=hi, use_visible_bias=True)
+
+    for seed in [1234, 4321]:
+        ma.init_random_parameters(seed=seed, sigma=0.2)
+        ma_lookup.parameters = ma.parameters
+        lookup = ma_lookup.init_lookup(v)
+
+        diff = ma.log_val_diff(lookup, sites, deltas)
+        assert diff == approx(ma.log_val(vp) - ma.log_val(v))
+
+    ma.update_lookup(lookup, sites, deltas, np.ones(v.shape[0], dtype=bool))
+    assert lookup == approx(ma.init_lookup(vp))
+
+
+@pytest.mark.skipif(not test_jax, reason="Jax not installed")
+def test_jax_batch_buckets():
+    ma = nk.machine.Jax(
+        hi,
+        jax.experimental.stax.serial(
+            jax.experimental.stax.Dense(4, initializer, initializer),
+            jax.experimental.stax.Tanh,
+            jax.experimental.stax.Dense(1, initializer, initializer),
+        ),
+        dtype=complex,
+        batch_buckets=[8, 32],
+    )
+    ma.init_random_parameters(seed=1234, sigma=0.2)
+
+    v = np.array([hi.random_state() for _ in range(40)])
+    expected = np.array([ma.log_val(v[i : i + 1])[0] for i in range(v.shape[0])])
+
+    for n in [1, 3, 8, 9, 20, 32, 40]:
+        assert ma.log_val(v[:n]) == approx(expected[:n])
+
+    # Compiled for the buckets 8, 32 and for 64 > 32
+    assert ma.compile_count == 3
+    assert ma.cache_hits == v.shape[0] + 4
+
+    vec = np.random.normal(size=20) + 1.0j * np.random.normal(size=20)
+    vjp = ma.numpy_flatten(ma.vector_jacobian_prod(v[:20], vec))
+    vjp_jac, _ = ma.vector_jacobian_prod(v[:20], vec, return_jacobian=True)
+    assert vjp == approx(ma.numpy_flatten(vjp_jac))
+
+    # Changing the precision changes the compiled forward pass
+    compile_count = ma.compile_count
+    ma.precision = "single"
+    ma.log_val(v[:8])
+    assert ma.compile_count == compile_count + 1
+
+    ma.precision = "double"
+    ma.log_val(v[:8])
+    assert ma.compile_count == compile_count + 1
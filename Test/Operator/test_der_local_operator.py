@@ -125,6 +125,37 @@ def test_der_log_val_batched():
     np.testing.assert_array_almost_equal(der_locs_c, der_locs_all_c)
 
 
+def test_chunked_local_values():
+    ma = nk.machine.density_matrix.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(seed=1234, sigma=0.1)
+
+    states = lind.hilbert.all_states()[[0, 5, 11, 12, 40, 63, 7]]
+
+    for center_derivative in [True, False]:
+        der_locs = nk.operator.der_local_values(
+            lind, ma, states, center_derivative=center_derivative
+        )
+        der_locs_chunked = nk.operator.der_local_values(
+            lind, ma, states, center_derivative=center_derivative, chunk_size=3
+        )
+        np.testing.assert_array_almost_equal(der_locs, der_locs_chunked)
+
+    locs = nk.operator.local_values(lind, ma, states)
+    out = np.empty(states.shape[0], dtype=np.complex128)
+    locs_chunked = nk.operator.local_values(lind, ma, states, out=out, chunk_size=2)
+    assert locs_chunked is out
+    np.testing.assert_array_almost_equal(locs, locs_chunked)
+
+    # Observables of the density matrix
+    ma_obs = nk.machine.density_matrix.RbmSpin(hilbert=hi, alpha=1)
+    ma_obs.init_random_parameters(seed=1234, sigma=0.1)
+    states_obs = hi.all_states()[[0, 3, 5, 6, 7]]
+    np.testing.assert_array_almost_equal(
+        nk.operator.local_values(ha, ma_obs, states_obs),
+        nk.operator.local_values(ha, ma_obs, states_obs, chunk_size=2),
+    )
+
+
 if test_jax:
     import jax
     import jax.experimental
@@ -71,6 +71,41 @@ def test_lindblad_form():
     assert (lind_mat.todense() == lind.to_dense()).all()
 
 
+def test_composite_jump_operators():
+    # Jump operators made of several local terms and a constant
+    c_ops = [
+        0.5 * nk.operator.LocalOperator(hi, sigmam, [i])
+        + nk.operator.LocalOperator(hi, sx, [(i + 2) % L])
+        + 0.3
+        for i in range(L)
+    ]
+    lind_c = nk.operator.LocalLiouvillian(ha, c_ops)
+
+    idmat = sparse.eye(2 ** L)
+    hnh_mat = ha.to_sparse()
+    for c_op in c_ops:
+        c_mat = c_op.to_sparse()
+        hnh_mat -= 0.5j * c_mat.H * c_mat
+
+    lind_mat = -1j * sparse.kron(idmat, hnh_mat) + 1j * sparse.kron(hnh_mat.H, idmat)
+    for c_op in c_ops:
+        c_mat = c_op.to_sparse()
+        lind_mat += sparse.kron(c_mat.conj(), c_mat)
+
+    assert np.allclose(lind_mat.todense(), lind_c.to_dense())
+
+    # get_conn agrees with the batched version
+    x = lind_c.hilbert.random_state(size=4)
+    sections = np.empty(x.shape[0], dtype=np.int64)
+    x_primes, mels = lind_c.get_conn_flattened(x, sections)
+    for b, (x_b, mels_b) in enumerate(
+        zip(np.split(x_primes, sections[:-1]), np.split(mels, sections[:-1]))
+    ):
+        x_prime, mel = lind_c.get_conn(x[b])
+        assert np.array_equal(x_prime, x_b)
+        assert np.array_equal(mel, mels_b)
+
+
 def test_lindblad_zero_eigenvalue():
     lind_mat = lind.to_sparse()
     w, v = linalg.eigsh(lind_mat.H * lind_mat, which="SM")
@@ -109,6 +144,19 @@ def test_linear_operator():
     )
 
 
+def test_cached_linear_operator():
+    cached = nk.operator.CachedOperator(lind)
+    dm = np.random.rand(hi.n_states ** 2) + 1j * np.random.rand(hi.n_states ** 2)
+
+    res = lind.to_linear_operator() @ dm
+    assert np.allclose(cached.to_linear_operator() @ dm, res)
+    assert np.allclose(cached.to_linear_operator(128) @ dm, res)
+
+    dmptr = np.append(dm, 0.0)
+    res_tr = cached.to_linear_operator(append_trace=True) @ dmptr
+    assert np.allclose(res_tr[:-1], res)
+
+
 # Construct the operators for Sx, Sy and Sz
 obs_sx = nk.operator.LocalOperator(hi)
 obs_sy = nk.operator.LocalOperator(hi)
@@ -122,3 +170,22 @@ for i in range(L):
 sxmat = obs_sx.to_dense()
 symat = obs_sy.to_dense()
 szmat = obs_sz.to_dense()
+
+
+def test_parallel_kernel(monkeypatch):
+    from netket.operator import _local_liouvillian
+
+    x = lind.hilbert.random_state(size=300)
+
+    def conns(pad):
+        sections = np.empty(x.shape[0], dtype=np.int32)
+        x_prime, mels = lind.get_conn_flattened(x, sections, pad=pad)
+        return x_prime, mels, sections
+
+    serial = [conns(False), conns(True)]
+    monkeypatch.setattr(_local_liouvillian, "_use_parallel_kernel", lambda n: True)
+    parallel = [conns(False), conns(True)]
+
+    for a, b in zip(serial, parallel):
+        for a_i, b_i in zip(a, b):
+            assert np.array_equal(a_i, b_i)
@@ -263,3 +263,28 @@ def test_copy():
             assert o1 is not o2
             assert np.all(o1 == o2)
         same_matrices(op, op_copy)
+
+
+def test_parallel_kernels(monkeypatch):
+    from netket.operator import _local_operator
+
+    op = herm_operators["Custom Hamiltonian"]
+    x = hi.random_state(size=300)
+    filters = np.random.randint(0, op._n_conns.shape[0], size=x.shape[0])
+
+    def conns():
+        sections = np.empty(x.shape[0], dtype=np.int32)
+        res = []
+        for pad in [False, True]:
+            res += op.get_conn_flattened(x, sections, pad=pad)
+            res.append(sections.copy())
+        res += op.get_conn_filtered(x, sections, filters)
+        res.append(sections.copy())
+        return res
+
+    serial = conns()
+    monkeypatch.setattr(_local_operator, "_use_parallel_kernel", lambda n: True)
+    parallel = conns()
+
+    for a, b in zip(serial, parallel):
+        assert np.array_equal(a, b)
@@ -118,6 +118,53 @@ def test_operator_is_hermitean():
                 assert found
 
 
+def test_to_sparse():
+    for name, op in operators.items():
+        print(name)
+        hi = op.hilbert
+        if hi.n_states > 4096:
+            continue
+
+        # Matrix elements computed row by row
+        sections = np.empty(hi.n_states, dtype=np.int32)
+        x_prime, mels = op.get_conn_flattened(hi.all_states(), sections)
+        rows = np.repeat(np.arange(hi.n_states), np.diff(sections, prepend=0))
+        cols = hi.states_to_numbers(x_prime)
+        dense = np.zeros((hi.n_states, hi.n_states), dtype=np.complex128)
+        np.add.at(dense, (rows, cols), mels)
+
+        assert op.to_sparse().shape == (hi.n_states, hi.n_states)
+        assert np.allclose(op.to_dense(), dense)
+
+        # Built in several blocks of rows
+        op._invalidate_cache()
+        assert np.allclose(op.to_sparse(chunk_size=7).toarray(), dense)
+
+
+def test_to_sparse_cache():
+    g = nk.graph.Hypercube(length=6, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+    op = nk.operator.LocalOperator(hi, sx, [0])
+
+    # The cached matrix is reused, while the returned copies can be modified
+    sp = op.to_sparse()
+    assert op._cached_sparse() is op._cached_sparse()
+    sp *= 3.0
+    assert np.allclose(op.to_dense(), nk.operator.LocalOperator(hi, sx, [0]).to_dense())
+
+    # In-place modifications discard the cached matrix
+    dense = op.to_dense()
+    op += nk.operator.LocalOperator(hi, sz, [1])
+    dense_z = nk.operator.LocalOperator(hi, sz, [1]).to_dense()
+    assert np.allclose(op.to_dense(), dense + dense_z)
+
+    op *= 2.0
+    assert np.allclose(op.to_dense(), 2.0 * (dense + dense_z))
+
+    op += 1.0
+    assert np.allclose(op.to_dense(), 2.0 * (dense + dense_z) + np.eye(hi.n_states))
+
+
 def test_no_segfault():
     g = nk.graph.Hypercube(8, 1)
     hi = nk.hilbert.Spin(0.5, N=g.n_nodes)
@@ -139,6 +186,35 @@ def test_deduced_hilbert_pauli():
     assert np.allclose(op.hilbert.local_states, (0, 1))
 
 
+def test_pauli_strings_many_qubits():
+    # Strings longer than a 64-bit word, compared with the product of the
+    # single-qubit matrices acting on the configuration
+    n = 70
+    rng = np.random.RandomState(1234)
+    ops = ["".join(rng.choice(list("IXYZ"), size=n)) for _ in range(10)]
+    weights = rng.randn(len(ops))
+    op = nk.operator.PauliStrings(ops, weights)
+
+    paulis = {
+        "I": np.eye(2),
+        "X": np.array([[0, 1], [1, 0]]),
+        "Y": np.array([[0, -1j], [1j, 0]]),
+        "Z": np.array([[1, 0], [0, -1]]),
+    }
+
+    x = rng.randint(0, 2, size=n).astype(np.float64)
+    x_primes, mels = op.get_conn(x)
+    assert x_primes.shape[0] == len(set(ops))
+
+    for x_prime, mel in zip(x_primes, mels):
+        expected = 0.0
+        for string, w in zip(ops, weights):
+            expected += w * np.prod(
+                [paulis[c][int(x_prime[j]), int(x[j])] for j, c in enumerate(string)]
+            )
+        assert mel == pytest.approx(expected)
+
+
 def test_Heisenberg():
     g = nk.graph.Hypercube(8, 1)
     hi = nk.hilbert.Spin(0.5) ** 8
@@ -170,3 +246,200 @@ def test_Heisenberg():
 def test_repr():
     for op in operators.values():
         assert type(op).__name__ in repr(op)
+
+
+def test_local_values_unique_conn():
+    g = nk.graph.Hypercube(length=8, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.3)
+
+    psi = ma.to_array(normalize=False)
+
+    # Repeated samples, as visited by the chains at low temperature
+    v = hi.all_states()[[3, 17, 3, 3, 250, 17]]
+
+    log_val = ma.log_val
+    evaluated = []
+
+    def counting_log_val(x, *args, **kwargs):
+        evaluated.append(x.shape[0])
+        return log_val(x, *args, **kwargs)
+
+    ma.log_val = counting_log_val
+
+    for op in [
+        nk.operator.Ising(hi, g, h=1.321),
+        nk.operator.Heisenberg(hilbert=hi, graph=g),
+    ]:
+        evaluated.clear()
+        loc = nk.operator.local_values(op, ma, v, log_val(v))
+
+        op_sparse = op.to_sparse()
+        numbers = hi.states_to_numbers(v)
+        loc_exact = op_sparse[numbers].dot(psi) / psi[numbers]
+        assert loc == pytest.approx(loc_exact)
+
+        # Diagonal elements and repeated configurations are not evaluated
+        sections = np.empty(v.shape[0], dtype=np.int32)
+        v_primes, _ = op.get_conn_flattened(v, sections)
+        assert sum(evaluated) <= np.unique(v_primes, axis=0).shape[0]
+        assert sum(evaluated) < v_primes.shape[0] // 2
+
+
+@pytest.mark.skipif(not nk.utils.jax_available, reason="Jax not installed")
+def test_local_values_jax():
+    g = nk.graph.Hypercube(length=6, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+
+    ops = [
+        nk.operator.Ising(hi, g, h=1.321),
+        nk.operator.Heisenberg(hilbert=hi, graph=g),
+        # PauliStrings acts on its own Qubit hilbert space, with 0/1 states
+        nk.operator.PauliStrings(["XXIZII", "ZYIIXI", "IIIIII"], [1.0, 0.5, -2.0]),
+    ]
+    for op in ops:
+        op_hi = op.hilbert
+        ma = nk.machine.JaxRbmSpinPhase(op_hi, alpha=1)
+        ma.init_random_parameters(seed=1234, sigma=0.3)
+
+        psi = ma.to_array(normalize=False)
+        v = op_hi.all_states()[[3, 17, 3, 40, 63]]
+        numbers = op_hi.states_to_numbers(v)
+
+        conn_fn, table = op.jax_get_conn_padded
+        v_primes, mels = conn_fn(table, v)
+
+        # The padded connected elements give the rows of the matrix
+        dense = op.to_dense()
+        for b in range(v.shape[0]):
+            row = np.zeros(op_hi.n_states, dtype=complex)
+            conn_numbers = op_hi.states_to_numbers(np.asarray(v_primes[b]))
+            np.add.at(row, conn_numbers, np.asarray(mels[b]))
+            assert row == pytest.approx(dense[numbers[b]])
+
+        loc_exact = op.to_sparse()[numbers].dot(psi) / psi[numbers]
+
+        loc = nk.operator.local_values_jax(op, ma, v)
+        assert np.asarray(loc) == pytest.approx(loc_exact)
+
+        # The log-values given by the caller are used instead of recomputed
+        log_vals = ma.log_val(v)
+        loc = nk.operator.local_values_jax(op, ma, v, log_vals=log_vals)
+        assert np.asarray(loc) == pytest.approx(loc_exact)
+
+        loc = nk.operator.local_values(op, ma, v, log_vals)
+        assert loc == pytest.approx(loc_exact)
+
+
+def test_local_values_single_precision():
+    g = nk.graph.Hypercube(length=10, n_dim=1, pbc=True)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+    ha = nk.operator.Ising(hi, g, h=1.0)
+
+    ma = nk.machine.RbmSpin(hi, alpha=2)
+    ma.init_random_parameters(seed=1234, sigma=0.2)
+
+    # Exact samples of |psi|^2
+    prob = np.abs(ma.to_array()) ** 2
+    rng = np.random.RandomState(1234)
+    v = hi.numbers_to_states(rng.choice(hi.n_states, size=4000, p=prob / prob.sum()))
+
+    energy = nk.stats.statistics(nk.operator.local_values(ha, ma, v))
+
+    ma.precision = "single"
+    loc_single = nk.operator.local_values(ha, ma, v)
+    energy_single = nk.stats.statistics(loc_single)
+
+    assert loc_single.dtype == np.complex128
+
+    # The bias of single precision is well within the statistical error
+    assert abs(energy_single.mean - energy.mean) < 1.0e-2 * energy.error_of_mean
+    assert energy_single.error_of_mean == pytest.approx(energy.error_of_mean, rel=1e-3)
+
+    # Statistics of single-precision data are accumulated in double precision
+    energy_c64 = nk.stats.statistics(loc_single.astype(np.complex64))
+    assert energy_c64.mean == pytest.approx(energy_single.mean, rel=1e-6)
+
+
+def test_cached_operator():
+    g = nk.graph.Hypercube(length=8, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+
+    for op in [
+        nk.operator.Ising(hi, g, h=1.321),
+        nk.operator.Heisenberg(hilbert=hi, graph=g),
+        nk.operator.LocalOperator(hi, [sx, sz], [[0], [3]]),
+    ]:
+        cached = nk.operator.CachedOperator(op, max_size=5)
+
+        x = hi.all_states()[[0, 7, 0, 11, 7, 0]]
+        sections = np.empty(x.shape[0], dtype=np.int32)
+        sections_c = np.empty(x.shape[0], dtype=np.int32)
+
+        x_primes, mels = op.get_conn_flattened(x, sections)
+        for _ in range(2):
+            x_primes_c, mels_c = cached.get_conn_flattened(x, sections_c)
+            assert np.all(sections_c == sections)
+            assert np.all(x_primes_c == x_primes)
+            assert np.all(mels_c == mels)
+
+        assert cached.misses == 3
+        assert cached.hits == 9
+
+        # Least recently used configurations are evicted
+        cached.get_conn_flattened(hi.all_states()[20:24], sections_c[:4])
+        assert len(cached) == 5
+
+        for i, evicted in [(0, False), (11, True), (7, True)]:
+            hits, misses = cached.hits, cached.misses
+            cached.get_conn_flattened(hi.all_states()[[i]], sections_c[:1])
+            assert cached.misses - misses == int(evicted)
+            assert cached.hits - hits == int(not evicted)
+
+        n_conn = np.empty(x.shape[0], dtype=np.intc)
+        assert np.all(cached.n_conn(x) == op.n_conn(x, n_conn))
+        assert np.all(cached.to_dense() == op.to_dense())
+
+        cached.clear()
+        assert cached.hits == 0 and cached.misses == 0 and len(cached) == 0
+        assert cached
+
+
+def test_cached_operator_eviction():
+    g = nk.graph.Hypercube(length=6, n_dim=1)
+    hi = nk.hilbert.Boson(n_max=3, N=g.n_nodes)
+    op = nk.operator.BoseHubbard(hilbert=hi, U=1.0, V=0.3, graph=g)
+    cached = nk.operator.CachedOperator(op, max_size=3)
+
+    # Configurations are evicted and the buffers compacted many times
+    rng = np.random.RandomState(1234)
+    states = hi.all_states()[:40]
+    for _ in range(200):
+        x = states[rng.randint(0, states.shape[0], size=rng.randint(1, 12))]
+        sections = np.empty(x.shape[0], dtype=np.int32)
+        sections_c = np.empty(x.shape[0], dtype=np.int32)
+
+        x_primes, mels = op.get_conn_flattened(x, sections)
+        x_primes_c, mels_c = cached.get_conn_flattened(x, sections_c)
+        assert np.all(sections_c == sections)
+        assert np.all(x_primes_c == x_primes)
+        assert np.all(mels_c == mels)
+        assert len(cached) <= 3
+
+
+def test_cached_operator_sampler():
+    g = nk.graph.Hypercube(length=8, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+    ha = nk.operator.Ising(hi, g, h=1.0)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.1)
+
+    cached = nk.operator.CachedOperator(ha, max_size=128)
+    sa = nk.sampler.MetropolisHamiltonian(ma, cached, n_chains=4)
+    samples = sa.generate_samples(20).reshape(-1, hi.size)
+    assert cached.hits > 0
+
+    assert nk.operator.local_values(cached, ma, samples) == pytest.approx(
+        nk.operator.local_values(ha, ma, samples)
+    )
@@ -29,3 +29,32 @@ def test_svd_threshold():
         hi = nk.hilbert.Spin(s=0.5) ** 20
         machine = nk.machine.RbmSpin(alpha=1, hilbert=hi)
         SR(machine, use_iterative=True, svd_threshold=1e-3)
+
+
+def test_single_precision_oks():
+    np.random.seed(1234)
+    hi = nk.hilbert.Spin(s=0.5) ** 4
+    machine = nk.machine.RbmSpin(alpha=1, hilbert=hi)
+
+    n_samples = 2500
+    oks = np.random.normal(size=(n_samples, machine.n_par)) + 1.0j * np.random.normal(
+        size=(n_samples, machine.n_par)
+    )
+    oks = oks.astype(np.complex64)
+    grad = np.random.normal(size=machine.n_par) + 1.0j * np.random.normal(
+        size=machine.n_par
+    )
+
+    for use_iterative in [False, True]:
+        sr = SR(machine, use_iterative=use_iterative, diag_shift=0.1)
+        dp = sr.compute_update(oks.astype(np.complex128), grad)
+
+        sr = SR(machine, use_iterative=use_iterative, diag_shift=0.1)
+        oks_s = oks.copy()
+        dp_s = sr.compute_update(oks_s, grad)
+
+        # The log-derivatives are centered in place, without an upcast copy
+        assert oks_s.dtype == np.complex64
+        assert np.abs(oks_s.mean(axis=0, dtype=np.complex128)).max() < 1e-5
+        assert dp_s.dtype == np.complex128
+        assert dp_s == pytest.approx(dp, rel=1e-4, abs=1e-4)
@@ -26,6 +26,9 @@ ma.init_random_parameters(sigma=0.2)
 sa = nk.sampler.MetropolisLocal(machine=ma, n_chains=16)
 samplers["MetropolisLocal RbmSpin"] = sa
 
+sa = nk.sampler.MetropolisLocal(machine=ma, n_chains=16, n_threads=3)
+samplers["MetropolisLocal RbmSpin threaded"] = sa
+
 hib = nk.hilbert.Boson(n_max=1, N=g.n_nodes, n_bosons=1)
 mab = nk.machine.RbmSpin(hilbert=hib, alpha=1)
 mab.init_random_parameters(sigma=0.2)
@@ -38,6 +41,9 @@ samplers["Exact RbmSpin"] = sa
 sa = nk.sampler.MetropolisLocalPt(machine=ma, n_replicas=4)
 samplers["MetropolisLocalPt RbmSpin"] = sa
 
+sa = nk.sampler.MetropolisLocalPt(machine=ma, n_replicas=4, n_chains=8)
+samplers["MetropolisLocalPt RbmSpin ensemble"] = sa
+
 ha = nk.operator.Ising(hilbert=hi, graph=g, h=1.0)
 sa = nk.sampler.MetropolisHamiltonian(machine=ma, hamiltonian=ha)
 samplers["MetropolisHamiltonian RbmSpin"] = sa
@@ -168,6 +174,9 @@ if test_jax:
     ma = nk.machine.Jax(hi, Jastrow(), dtype=float)
     ma.init_random_parameters(sigma=0.2)
     samplers["Metropolis Jastrow Jax"] = nk.sampler.MetropolisLocal(ma, n_chains=16)
+    samplers["MetropolisPt Jastrow Jax"] = nk.sampler.MetropolisLocalPt(
+        ma, n_replicas=4, n_chains=8
+    )
 
 
 def test_states_in_hilbert():
@@ -243,3 +252,228 @@ def test_correct_sampling():
 
         s, pval = combine_pvalues(pvalues, method="fisher")
         assert pval > 0.01 or np.max(pvalues) > 0.01
+
+
+def test_returned_log_values():
+    for name, sa in samplers.items():
+        print("Sampler test: %s" % name)
+
+        ma = sa.machine
+
+        samples, log_values = sa.generate_samples(10, return_log_values=True)
+        assert log_values.shape == samples.shape[0:2]
+
+        samples_r = np.asarray(samples).reshape(-1, ma.input_size)
+        assert np.asarray(log_values).reshape(-1) == approx(ma.log_val(samples_r))
+
+        samples, log_values = sa.generate_samples(0, return_log_values=True)
+        assert samples.shape == (0,) + tuple(sa.sample_shape)
+        assert log_values.shape == samples.shape[0:2]
+
+
+def test_pt_ensemble():
+    g = nk.graph.Hypercube(length=6, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.2)
+
+    sa = nk.sampler.MetropolisLocalPt(machine=ma, n_replicas=5, n_chains=7)
+    assert sa.sample_shape == (7, hi.size)
+
+    samples, log_values = sa.generate_samples(20, return_log_values=True)
+    assert samples.shape == (20, 7, hi.size)
+    assert log_values.reshape(-1) == approx(ma.log_val(samples.reshape(-1, hi.size)))
+
+    # Every chain keeps its own full set of temperatures
+    for beta in sa._beta:
+        assert np.sort(beta) == approx(np.sort(sa._beta[0]))
+        assert beta.max() == 1.0
+
+    stats = sa.stats
+    assert 0 <= stats["mean_acceptance"] <= 1
+    assert -0.5 <= stats["normalized_beta=1_position"] <= 0.5
+
+    sa.n_chains = 3
+    assert sa.generate_samples(2).shape == (2, 3, hi.size)
+
+
+def test_compact_samples():
+    for name, sa in samplers.items():
+        if "Jax" in name:
+            continue
+        print("Sampler test: %s" % name)
+
+        ma = sa.machine
+
+        # The samples are stored in the compact type of the hilbert space
+        assert sa.sample_dtype == ma.hilbert.compact_dtype
+        if hasattr(sa, "_state"):
+            assert sa._state.dtype == ma.hilbert.compact_dtype
+
+        samples, log_values = sa.generate_samples(3, return_log_values=True)
+        assert samples.dtype == ma.hilbert.compact_dtype
+
+        samples_r = samples.reshape(-1, ma.input_size).astype(np.float64)
+        assert log_values.reshape(-1) == approx(ma.log_val(samples_r))
+
+
+def test_exact_sampler_table():
+    hi = nk.hilbert.Spin(s=0.5, N=6)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(seed=1234, sigma=0.3)
+
+    sa = nk.sampler.ExactSampler(machine=ma, chunk_size=7)
+    sa_full = nk.sampler.ExactSampler(machine=ma, chunk_size=hi.n_states)
+
+    # The alias table reproduces the probabilities of all states
+    def table_probabilities(sa):
+        n = sa._prob.size
+        p = sa._prob / n
+        np.add.at(p, sa._alias, (1.0 - sa._prob) / n)
+        return p
+
+    # 12 bytes per state
+    assert sa._prob.dtype == np.float64
+    assert sa._alias.dtype == np.int32
+
+    ps = np.absolute(ma.to_array()) ** 2
+    assert table_probabilities(sa) == approx(ps, rel=1e-12)
+    assert table_probabilities(sa_full) == approx(ps, rel=1e-12)
+
+    # The table is only rebuilt when the parameters change
+    prob = sa._prob
+    sa.reset()
+    assert sa._prob is prob
+
+    ma.init_random_parameters(seed=4321, sigma=0.3)
+    sa.reset()
+    assert sa._prob is not prob
+    assert table_probabilities(sa) == approx(np.absolute(ma.to_array()) ** 2, rel=1e-12)
+
+
+def test_samples_consumer():
+    hi = nk.hilbert.Spin(s=0.5, N=6)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.2)
+    sa = nk.sampler.MetropolisLocal(machine=ma, n_chains=4)
+
+    nk.random.seed(1234)
+    expected = [np.array(sample) for sample in sa.samples(20, init_random=True)]
+
+    def consumer(samples, log_values):
+        return samples, log_values
+
+    for n_workers, max_in_flight in [(1, 1), (3, 5)]:
+        nk.random.seed(1234)
+        results = list(
+            sa.samples(
+                20,
+                init_random=True,
+                consumer=consumer,
+                n_workers=n_workers,
+                max_in_flight=max_in_flight,
+            )
+        )
+
+        assert len(results) == 20
+        for sample, (samples, log_values) in zip(expected, results):
+            assert np.array_equal(sample, samples)
+            assert log_values == approx(ma.log_val(samples))
+
+
+def test_fast_update_log_values():
+    g = nk.graph.Hypercube(length=6, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+
+    for ma in [
+        nk.machine.RbmSpin(hilbert=hi, alpha=1),
+        nk.machine.RbmSpinSymm(hilbert=hi, alpha=1, automorphisms=g),
+        nk.machine.Jastrow(hilbert=hi, use_visible_bias=True),
+    ]:
+        ma.init_random_parameters(sigma=0.2)
+
+        for sa in [
+            nk.sampler.MetropolisLocal(machine=ma, n_chains=8),
+            nk.sampler.MetropolisExchange(machine=ma, n_chains=8, graph=g),
+        ]:
+            assert sa._fast_update
+            sa.generate_samples(20)
+
+            # The incrementally updated log-values match the exact ones
+            assert sa._log_values == approx(ma.log_val(sa._state))
+
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    sa = nk.sampler.MetropolisLocal(machine=ma, fast_update=False)
+    assert not sa._fast_update
+
+
+def test_threaded_reproducibility():
+    g = nk.graph.Hypercube(length=6, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.2)
+
+    samples = []
+    for fast_update in [True, True, False]:
+        nk.random.seed(1234)
+        sa = nk.sampler.MetropolisLocal(
+            machine=ma, n_chains=10, n_threads=4, fast_update=fast_update
+        )
+        samples.append(sa.generate_samples(10))
+        assert sa._log_values == approx(ma.log_val(sa._state))
+
+    assert np.array_equal(samples[0], samples[1])
+    assert np.array_equal(samples[0], samples[2])
+
+
+def test_threads_released():
+    import threading
+
+    hi = nk.hilbert.Spin(s=0.5, N=6)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.2)
+    move_op = nk.operator.LocalOperator(
+        hilbert=hi, operators=[[[0, 1], [1, 0]]] * 6, acting_on=[[i] for i in range(6)]
+    )
+
+    sa = nk.sampler.CustomSampler(
+        machine=ma, move_operators=move_op, n_chains=10, n_threads=3
+    )
+    sa.generate_samples(5)
+    n_active = threading.active_count()
+
+    # Every pool replaces the previous one, whose threads are released
+    for n_threads in [3, 2, 3, 3]:
+        sa.n_threads = n_threads
+        sa.generate_samples(5)
+        assert sa._log_values == approx(ma.log_val(sa._state))
+
+    assert threading.active_count() <= n_active
+
+
+@pytest.mark.skipif(not test_jax, reason="requires jax")
+def test_autoregressive_sampler():
+    hi = nk.hilbert.Spin(s=0.5, N=5)
+    ma = nk.machine.JaxAutoregressiveDense(hilbert=hi, alpha=2)
+    ma.init_random_parameters(sigma=0.5)
+
+    # The autoregressive machine is normalized
+    all_states = hi.all_states()
+    ps = np.exp(2.0 * np.asarray(ma.log_val(all_states)).real)
+    assert ps.sum() == approx(1.0)
+    ps /= ps.sum()
+
+    sa = nk.sampler.AutoregressiveSampler(ma, n_chains=50)
+    samples, log_values = sa.generate_samples(200, return_log_values=True)
+    assert samples.shape == (200, 50, hi.size)
+    assert np.asarray(log_values).reshape(-1) == approx(
+        np.asarray(ma.log_val(np.asarray(samples).reshape(-1, hi.size)))
+    )
+
+    sttn = hi.states_to_numbers(np.asarray(samples).reshape(-1, hi.size))
+    hist_samp = np.bincount(sttn, minlength=hi.n_states)
+    _, pval = chisquare(hist_samp, f_exp=sttn.size * ps)
+    assert pval > 0.001
+
+    with pytest.raises(ValueError):
+        sa.machine_pow = 1
@@ -32,12 +32,14 @@ _NaN = float("NaN")
 
 
 def _make_op(op, matrix_type):
+    # The matrices are only read, such that the cached sparse matrix of the
+    # operator can be used without copying it
     if matrix_type == "sparse":
-        return op.to_sparse()
+        return op._cached_sparse()
     elif matrix_type == "dense":
         return op.to_dense()
     elif matrix_type == "direct":
-        return op.to_linear_op()
+        return op.to_linear_operator()
 
 
 def _make_rhs(hamiltonian, propagation_type):
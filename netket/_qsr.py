@@ -5,6 +5,7 @@ import numpy as _np
 import netket as _nk
 from netket._core import deprecated
 from .operator import local_values as _local_values
+from .hilbert._compact_states import _machine_input
 
 from netket.random import randint
 
@@ -14,7 +15,7 @@ from netket.stats import (
     mean as _mean,
 )
 
-from netket.vmc_common import info
+from netket.vmc_common import info, adaptive_n_discard
 from netket.abstract_variational_driver import AbstractVariationalDriver
 
 from numba import jit
@@ -38,6 +39,7 @@ class Qsr(AbstractVariationalDriver):
         n_samples_data,
         n_discard=None,
         sr=None,
+        persistent_chains=False,
     ):
         """
         Initializes the driver class.
@@ -63,6 +65,10 @@ class Qsr(AbstractVariationalDriver):
             sr (SR, optional): Determines whether and how stochastic reconfiguration
                 is applied to the bare energy gradient before performing applying
                 the optimizer. If this parameter is not passed or None, SR is not used.
+            persistent_chains (bool, optional): If True, after the first step the number
+                of discarded sweeps is adapted to the autocorrelation time and R_hat
+                of the log-probability of the samples measured at the previous step,
+                with n_discard as upper bound.
 
         """
         super(Qsr, self).__init__(sampler.machine, optimizer)
@@ -81,6 +87,9 @@ class Qsr(AbstractVariationalDriver):
 
         self.n_samples = n_samples
         self.n_discard = n_discard
+        self.persistent_chains = persistent_chains
+
+        self._chain_stats = None
 
         self.n_samples_data = n_samples_data
 
@@ -120,6 +129,7 @@ class Qsr(AbstractVariationalDriver):
         self._samples = _np.ndarray(
             (self._n_samples_node, self._batch_size, self._hilbert.size)
         )
+        self._log_values = None
 
         self._der_logs = _np.ndarray(
             (self._n_samples_node, self._batch_size, self._npar), dtype=_np.complex128
@@ -176,12 +186,21 @@ class Qsr(AbstractVariationalDriver):
         self._sampler.reset()
 
         # Burnout phase
-        for _ in self._sampler.samples(self._n_discard):
-            pass
+        n_discard = self._n_discard
+        if self.persistent_chains:
+            n_discard = adaptive_n_discard(self._chain_stats, n_discard)
+
+        self._sampler.generate_samples(n_discard)
 
-        # Generate samples and store them
-        for i, sample in enumerate(self._sampler.samples(self._n_samples_node)):
-            self._samples[i] = sample
+        # Generate samples and store them, together with the log-values
+        # computed by the sampler
+        self._samples, self._log_values = self._sampler.generate_samples(
+            self._n_samples_node, samples=self._samples, return_log_values=True
+        )
+
+        if self.persistent_chains:
+            # Diagnose the equilibration of the chains from the log-probability
+            self._chain_stats = _statistics(2.0 * self._log_values.real.T)
 
         # Randomly select a batch of training data
         self._rand_ind = self._get_rand_ind(
@@ -196,7 +215,9 @@ class Qsr(AbstractVariationalDriver):
             # When using the SR (Natural gradient) we need to have the full jacobian
             # Computes the jacobian
             for i, sample in enumerate(self._samples):
-                self._der_logs[i] = self._machine.der_log(sample, out=self._der_logs[i])
+                self._der_logs[i] = self._machine.der_log(
+                    _machine_input(sample), out=self._der_logs[i]
+                )
 
             grad_neg = _mean(self._der_logs.reshape(-1, self._npar), axis=0).conjugate()
 
@@ -221,7 +242,7 @@ class Qsr(AbstractVariationalDriver):
                 self._batch_size
             )
             for x, grad_x in zip(self._samples, self._grads):
-                self._machine.vector_jacobian_prod(x, vec_ones, grad_x)
+                self._machine.vector_jacobian_prod(_machine_input(x), vec_ones, grad_x)
 
             grad_neg = _mean(self._grads, axis=0)
 
@@ -239,6 +260,7 @@ class Qsr(AbstractVariationalDriver):
 
     def _compute_rotated_grad(self, x, basis, out):
         x_primes, mels = self._rotations[basis].get_conn(x)
+        x_primes = _machine_input(x_primes)
 
         log_val_primes = self._machine.log_val(x_primes)
 
@@ -263,14 +285,21 @@ class Qsr(AbstractVariationalDriver):
     def _estimate_stats(self, obs):
         return self._get_mc_stats(obs)[1]
 
+    def update_parameters(self, dp):
+        # The stored log-values are not valid for the new parameters
+        self._log_values = None
+        super().update_parameters(dp)
+
     def reset(self):
         self._sampler.reset()
+        self._chain_stats = None
         super().reset()
 
     def _get_mc_stats(self, op):
         loc = _np.empty(self._samples.shape[0:2], dtype=_np.complex128)
         for i, sample in enumerate(self._samples):
-            _local_values(op, self._machine, sample, out=loc[i])
+            log_vals = self._log_values[i] if self._log_values is not None else None
+            _local_values(op, self._machine, sample, log_vals=log_vals, out=loc[i])
         # notice that loc.T is passed to statistics, since that function assumes
         # that the first index is the batch index.
         return loc, _statistics(loc.T)
@@ -312,7 +341,7 @@ class Qsr(AbstractVariationalDriver):
         for x, basis in zip(samples, bases):
             x_primes, mels = rotations[basis].get_conn(x)
 
-            log_val_primes = self._machine.log_val(x_primes)
+            log_val_primes = self._machine.log_val(_machine_input(x_primes))
 
             max_log_val = log_val_primes.real.max()
             psi_rotated = (mels * _np.exp(log_val_primes - max_log_val)).sum()
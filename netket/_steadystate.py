@@ -6,13 +6,14 @@ from .operator import (
     local_values as _local_values,
     der_local_values as _der_local_values,
 )
+from .hilbert._compact_states import _machine_input
 from netket.stats import (
     statistics as _statistics,
     mean as _mean,
     sum_inplace as _sum_inplace,
 )
 
-from netket.vmc_common import info, tree_map, trees2_map
+from netket.vmc_common import info, tree_map, trees2_map, adaptive_n_discard
 from netket.abstract_variational_driver import AbstractVariationalDriver
 import operator
 
@@ -34,6 +35,7 @@ class SteadyState(AbstractVariationalDriver):
         sampler_obs=None,
         n_samples_obs=None,
         n_discard_obs=None,
+        persistent_chains=False,
     ):
         """
         Initializes the driver class.
@@ -56,6 +58,9 @@ class SteadyState(AbstractVariationalDriver):
                 to compute observables (default: same as sampler).
             n_samples_obs: n_samples for the observables (default: n_samples)
             n_discard_obs: n_discard for the observables (default: n_discard)
+            persistent_chains (bool, optional): If True, after the first step the number
+                of discarded sweeps is adapted to the autocorrelation time and R_hat
+                of LdagL measured at the previous step, with n_discard as upper bound.
 
         """
         super(SteadyState, self).__init__(
@@ -77,6 +82,9 @@ class SteadyState(AbstractVariationalDriver):
 
         self.n_samples = n_samples
         self.n_discard = n_discard
+        self.persistent_chains = persistent_chains
+
+        self._chain_stats = None
 
         self._obs_samples_valid = False
         if sampler_obs is not None:
@@ -130,6 +138,7 @@ class SteadyState(AbstractVariationalDriver):
         self._n_samples = int(self._n_samples_node * self._batch_size * self.n_nodes)
 
         self._samples = None
+        self._log_values = None
         self._grads = None
         self._jac = None
 
@@ -154,6 +163,7 @@ class SteadyState(AbstractVariationalDriver):
         )
 
         self._samples_obs = None
+        self._log_values_obs = None
 
     @property
     def n_discard(self):
@@ -204,28 +214,38 @@ class SteadyState(AbstractVariationalDriver):
         self._obs_samples_valid = False
 
         # Burnout phase
-        self._sampler.generate_samples(self._n_discard)
+        n_discard = self._n_discard
+        if self.persistent_chains:
+            n_discard = adaptive_n_discard(self._chain_stats, n_discard)
 
-        # Generate samples and store them
-        self._samples = self._sampler.generate_samples(
-            self._n_samples_node, samples=self._samples
+        self._sampler.generate_samples(n_discard)
+
+        # Generate samples and store them, together with the log-values
+        # computed by the sampler
+        self._samples, self._log_values = self._sampler.generate_samples(
+            self._n_samples_node, samples=self._samples, return_log_values=True
         )
 
         # Estimate C^[loc] (local energy) and LdagL
         self._lloc, self._loss_stats = self._get_mc_superop_stats(self._lind)
+        self._chain_stats = self._loss_stats
 
         # Flatten chain dimension
         samples_r = self._samples.reshape((-1, self._samples.shape[-1]))
         lloc_r = self._lloc.reshape(-1, 1)
 
         # Compute Log derivatives
-        self._der_logs = self._machine.der_log(samples_r)
+        self._der_logs = self._machine.der_log(_machine_input(samples_r))
         # Compute statistical average (also across nodes)
         self._der_logs_ave = tree_map(_mean, self._der_logs, axis=0)
 
         # Compute \nabla C^[Loc]
         self._der_loc_vals = _der_local_values(
-            self._lind, self._machine, samples_r, center_derivative=False
+            self._lind,
+            self._machine,
+            samples_r,
+            log_vals=self._log_values.reshape(-1),
+            center_derivative=False,
         )
 
         # apply this function to every element of the gradient.
@@ -274,8 +294,8 @@ class SteadyState(AbstractVariationalDriver):
         self._sampler_obs.generate_samples(self._n_discard)
 
         # Generate samples and store them
-        self._samples_obs = self._sampler_obs.generate_samples(
-            self._n_samples_node_obs, samples=self._samples_obs
+        self._samples_obs, self._log_values_obs = self._sampler_obs.generate_samples(
+            self._n_samples_node_obs, samples=self._samples_obs, return_log_values=True
         )
 
         self._obs_samples_valid = True
@@ -283,14 +303,24 @@ class SteadyState(AbstractVariationalDriver):
     def _estimate_stats(self, obs):
         return self._get_mc_obs_stats(obs)[1]
 
+    def update_parameters(self, dp):
+        # The stored log-values are not valid for the new parameters
+        self._log_values = None
+        self._log_values_obs = None
+        super().update_parameters(dp)
+
     def reset(self):
         self._sampler.reset()
+        self._chain_stats = None
         super().reset()
 
     def _get_mc_superop_stats(self, op):
         samples_r = self._samples.reshape((-1, self._samples.shape[-1]))
+        log_vals_r = (
+            self._log_values.reshape(-1) if self._log_values is not None else None
+        )
 
-        loc = _local_values(op, self._machine, samples_r).reshape(
+        loc = _local_values(op, self._machine, samples_r, log_vals=log_vals_r).reshape(
             self._samples.shape[0:2]
         )
 
@@ -303,8 +333,13 @@ class SteadyState(AbstractVariationalDriver):
             self.sweep_diagonal()
 
         samples_r = self._samples_obs.reshape((-1, self._samples_obs.shape[-1]))
+        log_vals_r = (
+            self._log_values_obs.reshape(-1)
+            if self._log_values_obs is not None
+            else None
+        )
 
-        loc = _local_values(op, self._machine, samples_r).reshape(
+        loc = _local_values(op, self._machine, samples_r, log_vals=log_vals_r).reshape(
             self._samples_obs.shape[0:2]
         )
 
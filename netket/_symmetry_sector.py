@@ -0,0 +1,270 @@
+# Copyright 2020 The Simons Foundation, Inc. - All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as _np
+from numba import jit
+from scipy.sparse import coo_matrix as _coo_matrix
+
+
+class SymmetrySector:
+    r"""A symmetry-adapted basis of the states transforming according to a
+    one-dimensional representation of a group of permutations of the sites,
+    optionally combined with the spin-flip symmetry.
+
+    Every basis state is labelled by a representative configuration :math:`a`,
+    the one with the smallest index in its orbit under the group, and is given
+    by :math:`|\hat a\rangle \propto \sum_g \chi(g)^* T_g|a\rangle`, where
+    :math:`(T_g a)_i = a_{p_g(i)}` for the permutation :math:`p_g`. Orbits whose
+    symmetric combination vanishes do not belong to the sector.
+
+    Operators commuting with the symmetries are block-diagonal in the sectors,
+    such that every sector can be diagonalized independently with a cost
+    reduced by the order of the group. Constraints of the Hilbert space, such
+    as a fixed total magnetization, are preserved.
+    """
+
+    def __init__(
+        self, hilbert, symmetries, characters=None, spin_flip=None, chunk_size=2 ** 16
+    ):
+        r"""
+        Constructs the symmetry-adapted basis of a sector.
+
+        Args:
+            hilbert: The indexable Hilbert space.
+            symmetries: A list of permutations of the sites, forming a group, for
+                example the automorphisms of a graph or its translations.
+            characters: The characters :math:`\chi(g)` of the one-dimensional
+                representation of the group defining the sector, one for every
+                permutation. If None, the sector of the symmetric states is used.
+            spin_flip: If +1 or -1, the group is extended with the spin-flip
+                symmetry, reversing the order of the local states on every site,
+                and the sector is restricted to the states of the given parity.
+            chunk_size (int): The number of configurations processed at once.
+
+        Examples:
+            Sector with momentum :math:`2\pi/8` of a chain of 8 spins.
+
+            >>> import numpy as np
+            >>> import netket as nk
+            >>> hi = nk.hilbert.Spin(s=0.5, N=8, total_sz=0)
+            >>> translations = [np.roll(np.arange(8), t) for t in range(8)]
+            >>> chars = np.exp(2j * np.pi * np.arange(8) / 8)
+            >>> sector = nk.exact.SymmetrySector(hi, translations, chars)
+            >>> print(sector.n_states)
+            8
+        """
+        if not hilbert.is_indexable:
+            raise ValueError("SymmetrySector requires an indexable Hilbert space.")
+
+        local_size = hilbert.local_size
+        if hilbert.size * _np.log2(local_size) >= 63:
+            raise ValueError("The Hilbert space is too large to be symmetrized.")
+
+        perms = _np.asarray(symmetries, dtype=_np.intp)
+        if perms.ndim != 2 or perms.shape[1] != hilbert.size:
+            raise ValueError("Expected a list of permutations of the sites.")
+
+        if characters is None:
+            characters = _np.ones(perms.shape[0])
+        characters = _np.asarray(characters, dtype=_np.complex128)
+        if characters.shape != (perms.shape[0],):
+            raise ValueError("Expected one character for every permutation.")
+
+        flips = _np.zeros(perms.shape[0], dtype=_np.bool_)
+
+        if spin_flip is not None:
+            if spin_flip not in (1, -1):
+                raise ValueError("spin_flip must be either +1 or -1.")
+
+            perms = _np.concatenate([perms, perms])
+            flips = _np.concatenate([flips, _np.ones_like(flips)])
+            characters = _np.concatenate([characters, spin_flip * characters])
+
+        self._hilbert = hilbert
+        self._perms = perms
+        self._flips = flips
+        self._characters = characters
+        self._chunk_size = chunk_size
+
+        # Representatives of the orbits belonging to the sector
+        numbers = []
+        indices = []
+        norms = []
+        for low in range(0, hilbert.n_states, chunk_size):
+            high = min(low + chunk_size, hilbert.n_states)
+            x = hilbert.numbers_to_states(_np.arange(low, high))
+            idx = hilbert.states_to_local_indices(x)
+
+            rep, _, own, stab = self._representatives(idx)
+
+            is_rep = (rep == own) & (_np.abs(stab) > 1.0e-8)
+            numbers.append(own[is_rep])
+            indices.append(idx[is_rep])
+            norms.append(stab[is_rep].real)
+
+        numbers = _np.concatenate(numbers)
+        order = _np.argsort(numbers)
+
+        self._numbers = numbers[order]
+        self._indices = _np.concatenate(indices)[order]
+        self._norms = _np.concatenate(norms)[order]
+
+    @property
+    def hilbert(self):
+        r"""AbstractHilbert: The Hilbert space containing the sector."""
+        return self._hilbert
+
+    @property
+    def n_states(self):
+        r"""int: The dimension of the sector."""
+        return self._numbers.size
+
+    @property
+    def group_order(self):
+        r"""int: The number of elements of the symmetry group."""
+        return self._perms.shape[0]
+
+    @property
+    def representatives(self):
+        r"""numpy.ndarray: The representative configurations of the basis states."""
+        return self._hilbert.local_indices_to_states(self._indices)
+
+    def _representatives(self, idx):
+        batch_size = idx.shape[0]
+        rep = _np.empty(batch_size, dtype=_np.int64)
+        group_index = _np.empty(batch_size, dtype=_np.intp)
+        own = _np.empty(batch_size, dtype=_np.int64)
+        stab = _np.empty(batch_size, dtype=_np.complex128)
+
+        self._representatives_kernel(
+            idx,
+            self._perms,
+            self._flips,
+            self._characters,
+            self._hilbert.local_size,
+            rep,
+            group_index,
+            own,
+            stab,
+        )
+        return rep, group_index, own, stab
+
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def _representatives_kernel(
+        idx, perms, flips, characters, local_size, rep, group_index, own, stab
+    ):
+        # Configurations are compared through their index in the unconstrained
+        # Hilbert space, the last site being the least significant one
+        n_sites = idx.shape[1]
+        for b in range(idx.shape[0]):
+            own_b = 0
+            for j in range(n_sites):
+                own_b = own_b * local_size + idx[b, j]
+
+            rep_b = 0
+            g_b = -1
+            stab_b = 0.0j
+            for g in range(perms.shape[0]):
+                number = 0
+                for j in range(n_sites):
+                    k = idx[b, perms[g, j]]
+                    if flips[g]:
+                        k = local_size - 1 - k
+                    number = number * local_size + k
+
+                if g_b < 0 or number < rep_b:
+                    rep_b = number
+                    g_b = g
+                if number == own_b:
+                    stab_b += _np.conj(characters[g])
+
+            rep[b] = rep_b
+            group_index[b] = g_b
+            own[b] = own_b
+            stab[b] = stab_b
+
+    def project(self, operator):
+        r"""Returns the matrix of an operator commuting with the symmetries, in
+        the symmetry-adapted basis of the sector.
+
+        Args:
+            operator: The operator acting on the Hilbert space of the sector.
+
+        Returns:
+            scipy.sparse.csr_matrix: The sparse matrix of the operator in the sector.
+        """
+        n = self.n_states
+        rows = []
+        cols = []
+        vals = []
+
+        sections = _np.empty(min(self._chunk_size, n), dtype=_np.int64)
+        for low in range(0, n, self._chunk_size):
+            high = min(low + self._chunk_size, n)
+            x = self._hilbert.local_indices_to_states(self._indices[low:high])
+
+            x_prime, mels = operator.get_conn_flattened(x, sections[: high - low])
+            rep, g, _, _ = self._representatives(
+                self._hilbert.states_to_local_indices(x_prime)
+            )
+
+            row = _np.repeat(
+                _np.arange(low, high), _np.diff(sections[: high - low], prepend=0)
+            )
+
+            # Connected configurations whose orbit is not in the sector do not
+            # contribute
+            col = _np.minimum(_np.searchsorted(self._numbers, rep), n - 1)
+            valid = self._numbers[col] == rep
+            row, col, g, mels = row[valid], col[valid], g[valid], mels[valid]
+
+            rows.append(row)
+            cols.append(col)
+            vals.append(
+                mels
+                * self._characters[g]
+                * _np.sqrt(self._norms[col] / self._norms[row])
+            )
+
+        return _coo_matrix(
+            (_np.concatenate(vals), (_np.concatenate(rows), _np.concatenate(cols))),
+            shape=(n, n),
+        ).tocsr()
+
+    def to_full(self, v):
+        r"""Expands a vector of the sector in the basis of the full Hilbert space.
+
+        Args:
+            v: The components of the vector in the symmetry-adapted basis.
+
+        Returns:
+            numpy.ndarray: The components of the vector in the basis of the Hilbert space.
+        """
+        hilb = self._hilbert
+        out = _np.zeros(hilb.n_states, dtype=_np.complex128)
+
+        coeff = _np.asarray(v) / _np.sqrt(self.group_order * self._norms)
+        for g in range(self.group_order):
+            idx = self._indices[:, self._perms[g]]
+            if self._flips[g]:
+                idx = hilb.local_size - 1 - idx
+
+            numbers = hilb.states_to_numbers(hilb.local_indices_to_states(idx))
+            _np.add.at(out, numbers, _np.conj(self._characters[g]) * coeff)
+
+        return out
+
+    def __repr__(self):
+        return f"SymmetrySector(hilbert={self._hilbert}, n_states={self.n_states}, group_order={self.group_order})"
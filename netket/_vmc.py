@@ -1,15 +1,24 @@
 import math
+import time
+
+import numpy as _np
 
 import netket as _nk
 
 from .operator import local_values as _local_values
+from .hilbert._compact_states import _machine_input
 from netket.stats import (
     statistics as _statistics,
     mean as _mean,
     sum_inplace as _sum_inplace,
 )
 
-from netket.vmc_common import info, tree_map
+from netket.vmc_common import (
+    info,
+    tree_map,
+    adaptive_n_discard,
+    tuned_sweep_size,
+)
 from netket.abstract_variational_driver import AbstractVariationalDriver
 
 
@@ -26,6 +35,10 @@ class Vmc(AbstractVariationalDriver):
         n_samples,
         n_discard=None,
         sr=None,
+        persistent_chains=False,
+        tune_sweep_size=False,
+        pipeline_depth=0,
+        chunk_size=None,
     ):
         """
         Initializes the driver class.
@@ -43,6 +56,24 @@ class Vmc(AbstractVariationalDriver):
             sr (SR, optional): Determines whether and how stochastic reconfiguration
                 is applied to the bare energy gradient before performing applying
                 the optimizer. If this parameter is not passed or None, SR is not used.
+            persistent_chains (bool, optional): If True, after the first step the number
+                of discarded sweeps is adapted to the autocorrelation time and R_hat
+                of the energy measured at the previous step, with n_discard as upper bound.
+                Markov chains are always carried over between steps.
+            tune_sweep_size (bool, optional): If True, the sweep_size of the sampler is
+                adjusted at every step to maximize the number of effective samples per
+                second, from the autocorrelation time of the energy and the measured
+                time spent sampling and computing the local energies. The sweep_size
+                is bounded by 10 times the number of degrees of freedom. It cannot be
+                used together with pipeline_depth > 0, since the two times are then
+                overlapping and cannot be measured separately.
+            pipeline_depth (int, optional): If positive, the local energies are computed
+                by a background thread while the sampler keeps producing samples, with
+                at most pipeline_depth batches of samples waiting to be processed.
+                If 0 (default), sampling and local energies are computed one after the other.
+            chunk_size (int, optional): If given, the local energies are computed in chunks
+                of at most chunk_size samples, bounding the memory used to store the
+                connected configurations. Defaults to None, processing all samples at once.
 
         Example:
             Optimizing a 1D wavefunction with Variational Monte Carlo.
@@ -76,6 +107,28 @@ class Vmc(AbstractVariationalDriver):
 
         self.n_samples = n_samples
         self.n_discard = n_discard
+        self.persistent_chains = persistent_chains
+
+        if tune_sweep_size and not hasattr(sampler, "sweep_size"):
+            raise ValueError("The sampler does not have a sweep_size to tune.")
+
+        self.tune_sweep_size = tune_sweep_size
+
+        if pipeline_depth < 0:
+            raise ValueError("Expected a non-negative integer for pipeline_depth ")
+
+        if tune_sweep_size and pipeline_depth > 0:
+            raise ValueError("The sweep_size cannot be tuned when pipelining.")
+
+        self.pipeline_depth = pipeline_depth
+
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Expected a positive integer for chunk_size ")
+
+        self.chunk_size = chunk_size
+        self._max_sweep_size = 10 * self._machine.input_size
+
+        self._chain_stats = None
 
         self._dp = None
 
@@ -106,6 +159,7 @@ class Vmc(AbstractVariationalDriver):
         self._n_samples = int(self._n_samples_node * self._batch_size * self.n_nodes)
 
         self._samples = None
+        self._log_values = None
 
         self._grads = None
         self._jac = None
@@ -137,20 +191,36 @@ class Vmc(AbstractVariationalDriver):
         self._sampler.reset()
 
         # Burnout phase
-        self._sampler.generate_samples(self._n_discard)
+        n_discard = self._n_discard
+        if self.persistent_chains:
+            n_discard = adaptive_n_discard(self._chain_stats, n_discard)
 
-        # Generate samples and store them
-        self._samples = self._sampler.generate_samples(
-            self._n_samples_node, samples=self._samples
-        )
+        self._sampler.generate_samples(n_discard)
+
+        time_start = time.perf_counter()
+
+        if self.pipeline_depth > 0:
+            # Generate samples while computing the local energy estimator
+            eloc, self._loss_stats = self._get_pipelined_mc_stats(self._ham)
+            time_samples = time.perf_counter()
+
+        else:
+            # Generate samples and store them, together with the log-values
+            # computed by the sampler
+            self._samples, self._log_values = self._sampler.generate_samples(
+                self._n_samples_node, samples=self._samples, return_log_values=True
+            )
+            time_samples = time.perf_counter()
+
+            # Compute the local energy estimator and average Energy
+            eloc, self._loss_stats = self._get_mc_stats(self._ham)
 
-        # Compute the local energy estimator and average Energy
-        eloc, self._loss_stats = self._get_mc_stats(self._ham)
+        self._chain_stats = self._loss_stats
 
         # Center the local energy
         eloc -= _mean(eloc)
 
-        samples_r = self._samples.reshape((-1, self._samples.shape[-1]))
+        samples_r = _machine_input(self._samples.reshape((-1, self._samples.shape[-1])))
         eloc_r = eloc.reshape(-1, 1)
 
         # Perform update
@@ -195,6 +265,28 @@ class Vmc(AbstractVariationalDriver):
             else:
                 self._dp = self._grads
 
+        if self.tune_sweep_size and self.pipeline_depth == 0:
+            time_end = time.perf_counter()
+            sweep_size = self._sampler.sweep_size
+
+            # The timings are averaged over the MPI processes, such that all
+            # of them choose the same sweep size
+            times = _np.array(
+                [
+                    (time_samples - time_start) / (self._n_samples_node * sweep_size),
+                    (time_end - time_samples) / self._n_samples_node,
+                ]
+            )
+            time_per_move, time_per_sample = _sum_inplace(times) / self.n_nodes
+
+            self._sampler.sweep_size = tuned_sweep_size(
+                self._loss_stats,
+                sweep_size,
+                time_per_move,
+                time_per_sample,
+                self._max_sweep_size,
+            )
+
         return self._dp
 
     @property
@@ -214,18 +306,67 @@ class Vmc(AbstractVariationalDriver):
             )
         return self._get_mc_stats(obs)[1]
 
+    def update_parameters(self, dp):
+        # The stored log-values are not valid for the new parameters
+        self._log_values = None
+        super().update_parameters(dp)
+
     def reset(self):
         self._sampler.reset()
+        self._chain_stats = None
         super().reset()
 
     def _get_mc_stats(self, op):
 
         samples_r = self._samples.reshape((-1, self._samples.shape[-1]))
-
-        loc = _local_values(op, self._machine, samples_r).reshape(
-            self._samples.shape[0:2]
+        log_vals_r = (
+            self._log_values.reshape(-1) if self._log_values is not None else None
         )
 
+        loc = _local_values(
+            op,
+            self._machine,
+            samples_r,
+            log_vals=log_vals_r,
+            chunk_size=self.chunk_size,
+        ).reshape(self._samples.shape[0:2])
+
+        # notice that loc.T is passed to statistics, since that function assumes
+        # that the first index is the batch index.
+        return loc, _statistics(loc.T)
+
+    def _get_pipelined_mc_stats(self, op):
+        def consumer(samples, log_values):
+            if log_values is None:
+                log_values = self._machine.log_val(_machine_input(samples))
+
+            loc = _local_values(
+                op,
+                self._machine,
+                samples,
+                log_vals=log_values,
+                chunk_size=self.chunk_size,
+            )
+            return samples, log_values, loc
+
+        shape = (self._n_samples_node,) + self._sampler.sample_shape
+        if self._samples is None or self._samples.shape != shape:
+            self._samples = _np.empty(shape, dtype=self._sampler.sample_dtype)
+
+        self._log_values = _np.empty(shape[0:2], dtype=_np.complex128)
+        loc = _np.empty(shape[0:2], dtype=_np.complex128)
+
+        for i, (samples, log_values, loc_i) in enumerate(
+            self._sampler.samples(
+                self._n_samples_node,
+                consumer=consumer,
+                max_in_flight=self.pipeline_depth,
+            )
+        ):
+            self._samples[i] = samples
+            self._log_values[i] = log_values
+            loc[i] = loc_i
+
         # notice that loc.T is passed to statistics, since that function assumes
         # that the first index is the batch index.
         return loc, _statistics(loc.T)
@@ -102,7 +102,7 @@ class AbstractVariationalDriver(abc.ABC):
         Concrete drivers should also call super().reset() to ensure that the step
         count is set to 0.
         """
-        self.step_count = 0
+        self._step_count = 0
         pass
 
     @abc.abstractmethod
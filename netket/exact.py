@@ -20,6 +20,7 @@ from scipy.sparse.linalg import LinearOperator, bicgstab
 from . import _core
 from .operator import AbstractOperator
 from ._exact_dynamics import PyExactTimePropagation
+from ._symmetry_sector import SymmetrySector
 
 
 def lanczos_ed(
@@ -29,6 +30,7 @@ def lanczos_ed(
     compute_eigenvectors: bool = False,
     matrix_free: bool = False,
     scipy_args: dict = None,
+    sector: SymmetrySector = None,
 ):
     r"""Computes `first_n` smallest eigenvalues and, optionally, eigenvectors
     of a Hermitian operator using `scipy.sparse.linalg.eigsh`.
@@ -43,6 +45,8 @@ def lanczos_ed(
             Otherwise, the operator is first converted to a sparse matrix.
         scipy_args: Additional keyword arguments passed to `scipy.sparse.linalg.eigvalsh`.
             See the Scipy documentation for further information.
+        sector: If given, the operator is diagonalized in this symmetry sector, and the
+            eigenvectors are expressed in its symmetry-adapted basis.
 
     Returns:
         Either `w` or the tuple `(w, v)` depending on whether
@@ -72,10 +76,16 @@ def lanczos_ed(
     actual_scipy_args["k"] = k
     actual_scipy_args["return_eigenvectors"] = compute_eigenvectors
 
-    result = eigsh(
-        operator.to_linear_operator() if matrix_free else operator.to_sparse(),
-        **actual_scipy_args,
-    )
+    if sector is not None:
+        if matrix_free:
+            raise ValueError("matrix_free is not supported within a symmetry sector.")
+        matrix = sector.project(operator)
+    elif matrix_free:
+        matrix = operator.to_linear_operator()
+    else:
+        matrix = operator.to_sparse()
+
+    result = eigsh(matrix, **actual_scipy_args)
     if not compute_eigenvectors:
         # The sort order of eigenvalues returned by scipy changes based on
         # `return_eigenvalues`. Therefore we invert the order here so that the
@@ -85,7 +95,12 @@ def lanczos_ed(
         return result
 
 
-def full_ed(operator: AbstractOperator, *, compute_eigenvectors: bool = False):
+def full_ed(
+    operator: AbstractOperator,
+    *,
+    compute_eigenvectors: bool = False,
+    sector: SymmetrySector = None,
+):
     r"""Computes all eigenvalues and, optionally, eigenvectors
     of a Hermitian operator by full diagonalization.
 
@@ -93,6 +108,8 @@ def full_ed(operator: AbstractOperator, *, compute_eigenvectors: bool = False):
         operator: NetKet operator to diagonalize.
         compute_eigenvectors: Whether or not to return the eigenvectors
             of the operator.
+        sector: If given, the operator is diagonalized in this symmetry sector, and the
+            eigenvectors are expressed in its symmetry-adapted basis.
 
     Returns:
         Either `w` or the tuple `(w, v)` depending on whether
@@ -115,7 +132,10 @@ def full_ed(operator: AbstractOperator, *, compute_eigenvectors: bool = False):
     """
     from numpy.linalg import eigh, eigvalsh
 
-    dense_op = operator.to_dense()
+    if sector is not None:
+        dense_op = sector.project(operator).toarray()
+    else:
+        dense_op = operator.to_dense()
 
     if compute_eigenvectors:
         return eigh(dense_op)
@@ -89,8 +89,44 @@ class Grid(NetworkX):
         newnames = {old: new for new, old in enumerate(graph.nodes)}
         graph = _nx.relabel_nodes(graph, newnames)
 
+        # Coordinates of the sites, the first one running along the last
+        # direction of length
+        self._coords = _np.asarray(list(newnames.keys())).reshape(len(newnames), -1)
+
         super().__init__(graph)
 
+    def translations(self):
+        r"""Returns the permutations of the sites given by the translations of
+        a periodic grid. Contrary to the automorphisms, they do not include
+        rotations and reflections, such that machines symmetric under
+        translations only, such as `RbmSpinSymm`, can be evaluated with fast
+        Fourier transforms.
+
+        Returns:
+            numpy.ndarray: A matrix of shape (n_nodes, n_nodes), whose rows are
+            the permutations of the sites.
+
+        Examples:
+            >>> import netket
+            >>> g=netket.graph.Grid(length=[4, 3], pbc=True)
+            >>> print(g.translations().shape)
+            (12, 12)
+        """
+        pbc = self.pbc if isinstance(self.pbc, list) else [self.pbc] * len(self.length)
+        if not all(pbc):
+            raise ValueError("Translations require periodic boundary conditions.")
+
+        dims = _np.asarray(self.length[::-1])
+        index = {tuple(c): i for i, c in enumerate(self._coords)}
+
+        return _np.asarray(
+            [
+                [index[tuple((c + t) % dims)] for c in self._coords]
+                for t in self._coords
+            ],
+            dtype=_np.intp,
+        )
+
     def __repr__(self):
         return "Grid(length={}, pbc={})".format(self.length, self.pbc)
 
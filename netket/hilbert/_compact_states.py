@@ -0,0 +1,44 @@
+import numpy as _np
+from numba import jit
+
+
+def _machine_input(x):
+    # Configurations stored in a compact integer type are only converted to
+    # floats when given to the machine
+    return x if x.dtype == _np.float64 else x.astype(_np.float64)
+
+
+@jit(nopython=True)
+def _states_to_local_indices_kernel(states, local_states, out):
+    for i in range(states.shape[0]):
+        for j in range(states.shape[1]):
+            out[i, j] = _np.searchsorted(local_states, states[i, j])
+    return out
+
+
+@jit(nopython=True)
+def _local_indices_to_states_kernel(indices, local_states, out):
+    for i in range(indices.shape[0]):
+        for j in range(indices.shape[1]):
+            out[i, j] = local_states[indices[i, j]]
+    return out
+
+
+@jit(nopython=True)
+def _pack_states_kernel(states, up_state, out):
+    # Site j is stored in bit j % 64 of the word j // 64
+    out.fill(0)
+    for i in range(states.shape[0]):
+        for j in range(states.shape[1]):
+            if states[i, j] == up_state:
+                out[i, j // 64] |= _np.uint64(1) << _np.uint64(j % 64)
+    return out
+
+
+@jit(nopython=True)
+def _unpack_states_kernel(words, local_states, out):
+    for i in range(out.shape[0]):
+        for j in range(out.shape[1]):
+            bit = (words[i, j // 64] >> _np.uint64(j % 64)) & _np.uint64(1)
+            out[i, j] = local_states[1] if bit else local_states[0]
+    return out
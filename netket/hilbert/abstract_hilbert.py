@@ -4,6 +4,12 @@ import numpy as _np
 from typing import List, Tuple, Optional, Generator
 
 from .._core import deprecated
+from ._compact_states import (
+    _states_to_local_indices_kernel,
+    _local_indices_to_states_kernel,
+    _pack_states_kernel,
+    _unpack_states_kernel,
+)
 
 
 """int: Maximum number of states that can be indexed"""
@@ -43,6 +49,107 @@ class AbstractHilbert(abc.ABC):
         r"""list[float]: A list of discreet local quantum numbers."""
         raise NotImplementedError()
 
+    @property
+    def compact_dtype(self):
+        r"""numpy.dtype: The smallest integer type storing the local quantum numbers
+        exactly, or float64 if they are not integers.
+
+        The samplers store their samples in this type, and the operators return
+        connected configurations of the same type as their input.
+        Configurations are converted to float64 only when they are given to
+        the machine."""
+        local_states = _np.asarray(self.local_states)
+        if not _np.array_equal(local_states, _np.round(local_states)):
+            return _np.dtype(_np.float64)
+
+        for dtype in _np.int8, _np.int16, _np.int32:
+            info = _np.iinfo(dtype)
+            if info.min <= local_states.min() and local_states.max() <= info.max:
+                return _np.dtype(dtype)
+
+        return _np.dtype(_np.float64)
+
+    def states_to_local_indices(self, states, out=None):
+        r"""Returns the indices of the local quantum numbers in the sorted `local_states`,
+        which use a single byte per site when the local dimension is smaller than 128.
+
+        Args:
+            states: Batch of states, with shape (batch_size, hilbert.size).
+            out: Array of integers with the same shape as states.
+                 If None, memory is allocated.
+
+        Returns:
+            numpy.ndarray: The indices of the local quantum numbers.
+        """
+        if out is None:
+            dtype = _np.int8 if self.local_size <= _np.iinfo(_np.int8).max else _np.intp
+            out = _np.empty(states.shape, dtype=dtype)
+
+        return _states_to_local_indices_kernel(
+            _np.asarray(states),
+            _np.sort(_np.asarray(self.local_states, dtype=_np.float64)),
+            out,
+        )
+
+    def local_indices_to_states(self, indices, out=None):
+        r"""Inverse of `states_to_local_indices`.
+
+        Args:
+            indices: Batch of indices of the local quantum numbers.
+            out: Array of quantum numbers with the same shape as indices.
+                 If None, memory is allocated.
+
+        Returns:
+            numpy.ndarray: The quantum numbers.
+        """
+        if out is None:
+            out = _np.empty(indices.shape)
+
+        return _local_indices_to_states_kernel(
+            indices, _np.sort(_np.asarray(self.local_states, dtype=_np.float64)), out
+        )
+
+    def pack_states(self, states, out=None):
+        r"""Packs a batch of states of a two-level system into words of 64 bits,
+        one bit per site, the bit being set if the quantum number is `local_states[1]`.
+
+        Args:
+            states: Batch of states, with shape (batch_size, hilbert.size).
+            out: Array of uint64 with shape (batch_size, ceil(hilbert.size / 64)).
+                 If None, memory is allocated.
+
+        Returns:
+            numpy.ndarray: The packed states.
+        """
+        if self.local_size != 2:
+            raise ValueError("Only states of two-level systems can be packed.")
+
+        if out is None:
+            out = _np.empty((states.shape[0], -(-self.size // 64)), dtype=_np.uint64)
+
+        local_states = _np.sort(_np.asarray(self.local_states, dtype=_np.float64))
+        return _pack_states_kernel(_np.asarray(states), local_states[1], out)
+
+    def unpack_states(self, words, out=None):
+        r"""Inverse of `pack_states`.
+
+        Args:
+            words: Batch of packed states, as returned by `pack_states`.
+            out: Array of quantum numbers with shape (batch_size, hilbert.size).
+                 If None, memory is allocated.
+
+        Returns:
+            numpy.ndarray: The quantum numbers.
+        """
+        if self.local_size != 2:
+            raise ValueError("Only states of two-level systems can be packed.")
+
+        if out is None:
+            out = _np.empty((words.shape[0], self.size))
+
+        local_states = _np.sort(_np.asarray(self.local_states, dtype=_np.float64))
+        return _unpack_states_kernel(words, local_states, out)
+
     def numbers_to_states(self, numbers, out=None):
         r"""Returns the quantum numbers corresponding to the n-th basis state
         for input n. n is an array of integer indices such that numbers[k]=Index(states[k]).
@@ -7,6 +7,7 @@ from ..utils import jax_available, torch_available
 
 if jax_available:
     from .jax import Jax, JaxRbm, MPSPeriodic, JaxRbmSpinPhase
+    from .jax import JaxAutoregressive, JaxAutoregressiveDense
     from .jax import DenseReal, SumLayer, LogCoshLayer
 
 if torch_available:
@@ -75,6 +75,22 @@ def outdtype_iscomplex(forward_fn, pars, v):
     return jnp.issubdtype(outdtype(forward_fn, pars, v), jnp.complexfloating)
 
 
+def single_precision(forward_fn):
+    """
+    Wraps forward_fn such that it is evaluated with the parameters and the
+    inputs cast to single precision, returning its output in double precision.
+    """
+
+    def _to_single(x):
+        return x.astype(jnp.complex64 if jnp.iscomplexobj(x) else jnp.float32)
+
+    def forward_single(pars, x):
+        out = forward_fn(tree_map(_to_single, pars), _to_single(x))
+        return out.astype(jnp.complex128 if jnp.iscomplexobj(out) else jnp.float64)
+
+    return forward_single
+
+
 # _grad_CC, _RR and _RC are the batched gradient functions for machines going
 # from R -> C, R->R and R->C. Ditto for vjp
 # Thee reason why R->C is more complicated is that it splits the calculation
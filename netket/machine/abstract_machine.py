@@ -5,6 +5,9 @@ import numpy as _np
 class AbstractMachine(abc.ABC):
     """Abstract class for NetKet machines"""
 
+    # Whether the machine can be evaluated in single precision
+    _supports_single_precision = False
+
     def __init__(self, hilbert, dtype=complex):
         super().__init__()
         self.hilbert = hilbert
@@ -13,6 +16,7 @@ class AbstractMachine(abc.ABC):
             raise TypeError("dtype must be either float or complex")
 
         self._dtype = dtype
+        self._precision = "double"
 
     @abc.abstractmethod
     def log_val(self, x, out=None):
@@ -65,9 +69,17 @@ class AbstractMachine(abc.ABC):
 
         elif x.ndim == 2:
 
+            if not return_jacobian:
+                # conj(J)^T vec is computed as conj(J^T conj(vec))
+                out_t = self._jacobian_transpose_dot(x, vec.conjugate(), out)
+                if out_t is not None:
+                    return _np.conjugate(out_t, out=out_t) if conjugate else out_t
+
             jacobian = self.der_log(x)
 
-            if conjugate:
+            if jacobian.dtype == _np.complex64:
+                out = self._single_precision_vjp(jacobian, vec, out, conjugate)
+            elif conjugate:
                 out = _np.dot(jacobian.transpose().conjugate(), vec, out)
             else:
                 out = _np.dot(jacobian.transpose(), vec.conjugate(), out)
@@ -81,6 +93,40 @@ class AbstractMachine(abc.ABC):
     ):
         raise NotImplementedError
 
+    @staticmethod
+    def _single_precision_vjp(jacobian, vec, out, conjugate, chunk_size=1024):
+        # Reduces a single-precision jacobian over the samples in double
+        # precision, upcasting one block of samples at a time
+        if out is None:
+            out = _np.empty(jacobian.shape[1], dtype=_np.complex128)
+        out.fill(0.0)
+
+        for low in range(0, jacobian.shape[0], chunk_size):
+            jac_block = jacobian[low : low + chunk_size].astype(_np.complex128)
+            vec_block = vec[low : low + chunk_size]
+            if conjugate:
+                out += _np.dot(vec_block, jac_block.conjugate())
+            else:
+                out += _np.dot(vec_block.conjugate(), jac_block)
+
+        return out
+
+    def _jacobian_transpose_dot(self, x, vec, out=None):
+        r"""Computes the product :math:`J^T v` between the transposed Jacobian
+        of the logarithm of the wavefunction for a batch of visible configurations
+        `x` and a vector `vec`, without storing the Jacobian. Machines not
+        implementing it return None, and the Jacobian is computed with `der_log`.
+
+        Args:
+            x: A matrix of `float64` of shape `(*, self.n_visible)`.
+            vec: A `complex128` vector of length `x.shape[0]`.
+            out: Destination vector of `complex128` and length `self.n_par`.
+
+        Returns:
+            `out`, or None if not implemented.
+        """
+        return None
+
     def der_log(self, x, out=None):
         r"""Computes the gradient of the logarithm of the wavefunction for a
         batch of visible configurations `x` and stores the result into `out`.
@@ -95,6 +141,59 @@ class AbstractMachine(abc.ABC):
         """
         raise NotImplementedError
 
+    @property
+    def has_fast_update(self):
+        r"""Whether the machine implements the lookup-table protocol
+        (`init_lookup`, `log_val_diff` and `update_lookup`) used to compute
+        efficiently the change of `log_val` under local moves."""
+        return False
+
+    def init_lookup(self, x, out=None):
+        r"""Computes the lookup table for a batch of visible configurations `x`.
+        The lookup table is only valid for the parameters the machine had when
+        it was initialized.
+
+        Args:
+            x: A matrix of `float64` of shape `(*, self.n_visible)`.
+            out: Destination array for the lookup table, as returned by
+                a previous call to this method.
+
+        Returns:
+            The lookup table, an array whose first dimension is `x.shape[0]`.
+        """
+        raise NotImplementedError
+
+    def log_val_diff(self, lookup, sites, deltas, out=None):
+        r"""Computes the difference :math:`\log\Psi(x^\prime) - \log\Psi(x)`
+        where :math:`x^\prime` is obtained from the configurations :math:`x`
+        stored in the `lookup` table by changing the quantum numbers on a few sites.
+
+        Args:
+            lookup: The lookup table of the configurations :math:`x`.
+            sites: A matrix of integers of shape `(x.shape[0], n_changes)` with the
+                indices of the changed sites. Negative entries are ignored.
+            deltas: A matrix of `float64` of the same shape as `sites` containing
+                the change of the local quantum numbers, :math:`x^\prime_i - x_i`.
+            out: Destination vector of `complex128`.
+
+        Returns:
+            `out`
+        """
+        raise NotImplementedError
+
+    def update_lookup(self, lookup, sites, deltas, mask):
+        r"""Updates in-place the lookup table after the local moves described by
+        `sites` and `deltas` (see `log_val_diff`) have been applied to the
+        configurations for which `mask` is True.
+
+        Args:
+            lookup: The lookup table to update.
+            sites: A matrix of integers with the indices of the changed sites.
+            deltas: A matrix of `float64` with the changes of the local quantum numbers.
+            mask: A boolean vector selecting the rows to update.
+        """
+        raise NotImplementedError
+
     def to_array(self, normalize=True, batch_size=512):
         r"""
         Returns a numpy array representation of the machine.
@@ -159,6 +258,38 @@ class AbstractMachine(abc.ABC):
     def has_complex_parameters(self):
         return self._dtype is complex
 
+    @property
+    def precision(self):
+        r"""str: The floating-point precision of the forward and backward passes,
+        either "double" (the default) or "single". In single precision the
+        products with the parameters are computed in `float32`/`complex64` and
+        the log-derivatives are returned as `complex64`, while `log_val` and
+        the sums over the samples are still computed in double precision.
+        Setting "single" raises a ValueError for machines that only support
+        double precision."""
+        return self._precision
+
+    @precision.setter
+    def precision(self, precision):
+        if precision != "single" and precision != "double":
+            raise ValueError("precision must be either 'single' or 'double'")
+        if precision == "single" and not self._supports_single_precision:
+            raise ValueError(
+                "{} does not support single precision".format(type(self).__name__)
+            )
+        self._precision = precision
+
+    @property
+    def _complex_dtype(self):
+        # The dtype of the log-derivatives in the current precision
+        return _np.complex64 if self.precision == "single" else _np.complex128
+
+    def _to_precision(self, a):
+        # Casts an array of float64 or complex128 to the current precision
+        if self.precision == "single":
+            return a.astype(_np.complex64 if _np.iscomplexobj(a) else _np.float32)
+        return a
+
     @property
     def n_par(self):
         r"""The number of variational parameters in the machine."""
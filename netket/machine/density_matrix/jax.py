@@ -14,6 +14,7 @@
 
 import jax
 import jax.numpy as jnp
+import numpy as _np
 from jax import random
 
 from .abstract_density_matrix import AbstractDensityMatrix
@@ -22,7 +23,9 @@ from functools import partial
 
 
 class Jax(JaxPure, AbstractDensityMatrix):
-    def __init__(self, hilbert, module, dtype=complex):
+    _supports_single_precision = False
+
+    def __init__(self, hilbert, module, dtype=complex, batch_buckets=None):
         """
         Wraps a stax network (which is a tuple of `init_fn` and `predict_fn`)
         so that it can be used as a NetKet density matrix.
@@ -34,9 +37,11 @@ class Jax(JaxPure, AbstractDensityMatrix):
                 `jax.experimental.stax` for more info.
             dtype: either complex or float, is the type used for the weights.
                 In both cases the module must have a single output.
+            batch_buckets: An optional list of batch sizes to which the inputs
+                are padded. See `netket.machine.Jax`.
         """
         AbstractDensityMatrix.__init__(self, hilbert, dtype)
-        JaxPure.__init__(self, hilbert, module, dtype)
+        JaxPure.__init__(self, hilbert, module, dtype, batch_buckets=batch_buckets)
 
         assert self.input_size == self.hilbert.size * 2
 
@@ -50,7 +55,8 @@ class Jax(JaxPure, AbstractDensityMatrix):
         return x
 
     def log_val(self, xr, xc=None, out=None):
-        x = self._dminput(xr, xc)
+        # Stacked on the host, as the batch size changes from call to call
+        x = xr if xc is None else _np.hstack((xr, xc))
 
         return JaxPure.log_val(self, x, out=out)
 
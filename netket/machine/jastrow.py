@@ -33,6 +33,8 @@ class Jastrow(AbstractMachine):
     The weights can be taken to be complex-valued (default option) or real-valued.
     """
 
+    _supports_single_precision = True
+
     def __init__(
         self,
         hilbert,
@@ -100,6 +102,12 @@ class Jastrow(AbstractMachine):
         # The symmetric part of J is stored in a 1d array
         self._J = _np.zeros(n_sym, dtype=self._npdtype)
 
+        # Dense symmetric copy of J, built when first needed
+        self._J_full = None
+
+        # Single-precision copies of J and a, built when first needed
+        self._single_weights = None
+
         # Visible bias
         self._a = _np.empty(n, dtype=self._npdtype) if use_visible_bias else None
 
@@ -125,12 +133,14 @@ class Jastrow(AbstractMachine):
             A complex number when `x` is a vector and vector when `x` is a
             matrix.
         """
-        x = x.astype(dtype=self._npdtype)
+        x = self._to_precision(x.astype(dtype=self._npdtype))
+        J, a = self._precision_weights()
 
-        return self._log_val_kernel(x, out, self._J, self._a, self._Smap)
+        # The terms are accumulated in out, of complex128
+        return self._log_val_kernel(x, out, J, a, self._Smap)
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _log_val_kernel(x, out, J, a, Smap):
         if out is None:
             out = _np.empty(x.shape[0], dtype=_np.complex128)
@@ -146,6 +156,108 @@ class Jastrow(AbstractMachine):
 
         return out
 
+    @property
+    def has_fast_update(self):
+        return True
+
+    def init_lookup(self, x, out=None):
+        r"""Computes the lookup table for a batch of visible configurations `x`.
+        For the Jastrow machine the lookup table contains the local fields
+        :math:`h_i = \sum_{j} J_{ij} x_j`.
+
+        Args:
+            x: A matrix of `float64` of shape `(*, self.n_visible)`.
+            out: Destination matrix of shape `x.shape`.
+
+        Returns:
+            `out`
+        """
+        if out is None or out.shape != x.shape:
+            out = _np.empty(x.shape, dtype=self._npdtype)
+
+        return _np.dot(x.astype(dtype=self._npdtype), self._dense_weights(), out=out)
+
+    def log_val_diff(self, lookup, sites, deltas, out=None):
+        r"""Computes the difference :math:`\log\Psi(x^\prime) - \log\Psi(x)`
+        under the local moves described by `sites` and `deltas`, in
+        :math:`O(n_{changes}^2)` operations.
+
+        Args:
+            lookup: The lookup table of the configurations :math:`x`.
+            sites: A matrix of integers with the indices of the changed sites.
+            deltas: A matrix of `float64` with the changes of the local quantum numbers.
+            out: Destination vector of `complex128`.
+
+        Returns:
+            `out`
+        """
+        if out is None:
+            out = _np.empty(lookup.shape[0], dtype=_np.complex128)
+
+        return self._log_val_diff_kernel(
+            lookup, sites, deltas, self._dense_weights(), self._a, out
+        )
+
+    def update_lookup(self, lookup, sites, deltas, mask):
+        r"""Updates in-place the local fields stored in `lookup`
+        for the configurations selected by `mask`.
+
+        Args:
+            lookup: The lookup table to update.
+            sites: A matrix of integers with the indices of the changed sites.
+            deltas: A matrix of `float64` with the changes of the local quantum numbers.
+            mask: A boolean vector selecting the rows to update.
+        """
+        self._update_lookup_kernel(lookup, sites, deltas, mask, self._dense_weights())
+
+    def _precision_weights(self):
+        # J and a in the precision of the machine, the single-precision copies
+        # are rebuilt after the parameters are set
+        if self.precision == "double":
+            return self._J, self._a
+        if self._single_weights is None:
+            a = self._to_precision(self._a) if self._a is not None else None
+            self._single_weights = (self._to_precision(self._J), a)
+        return self._single_weights
+
+    def _dense_weights(self):
+        # The dense symmetric J, rebuilt after the parameters are set
+        if self._J_full is None:
+            self._J_full = self._J[self._Smap]
+            _np.fill_diagonal(self._J_full, 0.0)
+        return self._J_full
+
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def _log_val_diff_kernel(lookup, sites, deltas, J, a, out):
+        for b in range(lookup.shape[0]):
+            out[b] = 0.0
+            for k in range(sites.shape[1]):
+                sk = sites[b, k]
+                if sk < 0:
+                    continue
+
+                out[b] += deltas[b, k] * lookup[b, sk]
+                if a is not None:
+                    out[b] += a[sk] * deltas[b, k]
+
+                for l in range(k + 1, sites.shape[1]):
+                    sl = sites[b, l]
+                    if sl >= 0:
+                        out[b] += deltas[b, k] * J[sk, sl] * deltas[b, l]
+
+        return out
+
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def _update_lookup_kernel(lookup, sites, deltas, mask, J):
+        for b in range(lookup.shape[0]):
+            if mask[b]:
+                for k in range(sites.shape[1]):
+                    s = sites[b, k]
+                    if s >= 0:
+                        lookup[b] += J[s] * deltas[b, k]
+
     def der_log(self, x, out=None):
         r"""Computes the gradient of the logarithm of the wavefunction for a
         batch of visible configurations `x` and stores the result into `out`.
@@ -160,16 +272,16 @@ class Jastrow(AbstractMachine):
         """
         x = x.astype(dtype=self._npdtype)
 
+        if out is None:
+            out = _np.empty((x.shape[0], self._npar), dtype=self._complex_dtype)
+
         return self._der_log_kernel(x, out, self._a, self._J, self._npar, self._Smap)
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _der_log_kernel(x, out, a, J, n_par, Smap):
         batch_size = x.shape[0]
 
-        if out is None:
-            out = _np.empty((batch_size, n_par), dtype=_np.complex128)
-
         out.fill(0.0)
 
         n = x.shape[1]
@@ -187,6 +299,28 @@ class Jastrow(AbstractMachine):
 
         return out
 
+    def _jacobian_transpose_dot(self, x, vec, out=None):
+        if out is None:
+            out = _np.empty(self._npar, dtype=_np.complex128)
+
+        x = _np.asarray(x, dtype=_np.float64)
+        n = x.shape[1]
+
+        if self._a is not None:
+            out[0:n] = vec.dot(x)
+            k = n
+        else:
+            k = 0
+
+        # Correlations of every pair of sites, weighted by vec
+        corr = x.T.dot(vec.reshape(-1, 1) * x)
+
+        out[k:] = 0.0
+        i, j = _np.triu_indices(n, 1)
+        _np.add.at(out[k:], self._Smap[i, j], corr[i, j])
+
+        return out
+
     @property
     def state_dict(self):
         r"""A dictionary containing the parameters of this machine"""
@@ -211,6 +345,12 @@ class Jastrow(AbstractMachine):
 
         return od
 
+    @AbstractMachine.parameters.setter
+    def parameters(self, p):
+        AbstractMachine.parameters.fset(self, p)
+        self._J_full = None
+        self._single_weights = None
+
     @staticmethod
     @jit(nopython=True)
     def _gen_symm(am):
@@ -25,15 +25,27 @@ from jax import random
 from netket.random import randint as _randint
 from jax.tree_util import tree_flatten, tree_unflatten, tree_map, tree_leaves
 
-from ._jax_utils import forward_apply, tree_size, grad as nk_grad, vjp as nk_vjp
+from ._jax_utils import (
+    forward_apply,
+    single_precision,
+    tree_size,
+    grad as nk_grad,
+    vjp as nk_vjp,
+)
 
 
 class Jax(AbstractMachine):
-    def __init__(self, hilbert, module, dtype=complex):
+    _supports_single_precision = True
+
+    def __init__(self, hilbert, module, dtype=complex, batch_buckets=None):
         """
         Wraps a stax network (which is a tuple of `init_fn` and `predict_fn`)
         so that it can be used as a NetKet machine.
 
+        Batches passed to `log_val` and `vector_jacobian_prod` are padded to a
+        small set of bucket sizes, such that the network is compiled only once
+        per bucket rather than once per batch size.
+
         Args:
             hilbert: Hilbert space on which the state is defined. Should be a
                 subclass of `netket.hilbert.Hilbert`.
@@ -41,14 +53,28 @@ class Jax(AbstractMachine):
                 jax.experimental.stax` for more info.
             dtype: either complex or float, is the type used for the weights.
                 In both cases the network must have a single output.
+            batch_buckets: An optional list of batch sizes to which the inputs
+                are padded. If None, the inputs are padded to the next power
+                of two. Batches larger than the largest bucket are padded to
+                the next power of two.
         """
         super().__init__(hilbert=hilbert, dtype=dtype)
 
-        self._npdtype = _np.complex128 if dtype is complex else _np.float64
+        if batch_buckets is not None:
+            batch_buckets = _np.unique(_np.asarray(batch_buckets, dtype=_np.int64))
+            if batch_buckets.size == 0 or batch_buckets[0] < 1:
+                raise ValueError("Expected a list of positive batch sizes.")
+        self._batch_buckets = batch_buckets
 
-        self._init_fn, self._forward_fn_nj = module
+        # Shapes for which the jitted functions have been compiled
+        self._compiled_shapes = set()
+        self._compile_count = 0
+        self._cache_hits = 0
+
+        self._npdtype = _np.complex128 if dtype is complex else _np.float64
 
-        self._forward_fn = lambda pars, x: forward_apply(pars, self._forward_fn_nj, x)
+        self._init_fn, self._module_fn_nj = module
+        self._set_forward_fn()
 
         self.jax_init_parameters()
 
@@ -107,23 +133,89 @@ class Jax(AbstractMachine):
         else:
             return p
 
+    def _set_forward_fn(self):
+        # The forward pass used by the machine, the samplers and the operators,
+        # evaluated in the precision of the machine
+        if self.precision == "single":
+            self._forward_fn_nj = single_precision(self._module_fn_nj)
+        else:
+            self._forward_fn_nj = self._module_fn_nj
+
+        forward_fn_nj = self._forward_fn_nj
+        self._forward_fn = lambda pars, x: forward_apply(pars, forward_fn_nj, x)
+
     @property
     def n_par(self):
         r"""The number of variational parameters in the machine."""
         return self._npar
 
+    @AbstractMachine.precision.setter
+    def precision(self, precision):
+        AbstractMachine.precision.fset(self, precision)
+        self._set_forward_fn()
+
+    @property
+    def batch_buckets(self):
+        r"""The batch sizes to which the inputs are padded, or None if they are
+        padded to powers of two."""
+        return self._batch_buckets
+
+    @property
+    def compile_count(self):
+        r"""int: The number of distinct padded shapes on which the jitted
+        functions have been called, each requiring a compilation."""
+        return self._compile_count
+
+    @property
+    def cache_hits(self):
+        r"""int: The number of calls reusing an already compiled shape."""
+        return self._cache_hits
+
+    def _bucket_size(self, n):
+        if self._batch_buckets is not None:
+            k = _np.searchsorted(self._batch_buckets, n)
+            if k < self._batch_buckets.size:
+                return int(self._batch_buckets[k])
+
+        return 1 << max(n - 1, 0).bit_length()
+
+    def _pad_batch(self, name, x, *static):
+        # Repeats the last row of x up to the bucket size, such that padded
+        # rows are valid configurations
+        x = _np.asarray(x)
+        n = x.shape[0]
+        size = self._bucket_size(n)
+
+        if size > n and n > 0:
+            x = _np.concatenate(
+                (x, _np.broadcast_to(x[-1:], (size - n,) + x.shape[1:]))
+            )
+
+        # The jitted functions take the forward pass as a static argument, so
+        # they are compiled again when the precision changes it
+        key = (name, self._forward_fn_nj, x.shape, x.dtype) + static
+        if key in self._compiled_shapes:
+            self._cache_hits += 1
+        else:
+            self._compiled_shapes.add(key)
+            self._compile_count += 1
+
+        return x, n
+
     def log_val(self, x, out=None):
         if x.ndim != 2:
             raise RuntimeError("Invalid input shape, expected a 2d array")
 
+        x, n = self._pad_batch("log_val", x)
+
+        # Slicing on the host does not trigger a compilation for every size
+        log_val = _np.asarray(forward_apply(self._params, self._forward_fn_nj, x))
+        log_val = log_val.reshape(x.shape[0])[:n]
+
         if out is None:
-            out = forward_apply(self._params, self._forward_fn_nj, x).reshape(
-                x.shape[0],
-            )
+            out = log_val
         else:
-            out[:] = forward_apply(self._params, self._forward_fn_nj, x).reshape(
-                x.shape[0],
-            )
+            out[:] = log_val
         return out
 
     @property
@@ -157,6 +249,15 @@ class Jax(AbstractMachine):
              `out` only or (out,jacobian) if return_jacobian is True
         """
         if not return_jacobian:
+            x, n = self._pad_batch("vjp", x, _np.asarray(vec).dtype, conjugate)
+
+            # Padded rows have zero weight
+            vec = _np.asarray(vec)
+            if x.shape[0] > n:
+                vec = _np.concatenate(
+                    (vec, _np.zeros((x.shape[0] - n,) + vec.shape[1:], vec.dtype))
+                )
+
             return nk_vjp(self._params, self._forward_fn_nj, x, vec, conjugate)
 
         else:
@@ -494,3 +595,144 @@ def JaxRbmSpinPhase(hilbert, alpha, dtype=float):
         ),
         dtype=dtype,
     )
+
+
+class JaxAutoregressive(Jax):
+    def __init__(self, hilbert, module, dtype=float):
+        r"""
+        Wraps an autoregressive stax-like network so that it can be used as a
+        NetKet machine. The wave function must be normalized and factorize into
+        conditional amplitudes of every site given the previous ones,
+
+        .. math:: |\Psi(s_1,\dots s_N)|^2 = \prod_i p(s_i|s_{i-1},\dots s_1),
+
+        such that it can be sampled exactly, site by site, by
+        `netket.sampler.AutoregressiveSampler`.
+
+        Args:
+            hilbert: Hilbert space on which the state is defined. Should be a
+                subclass of `netket.hilbert.Hilbert`.
+            module: A tuple `(init_fn, predict_fn, init_cache_fn, conditional_fn,
+                update_cache_fn)`. The first two are as for `netket.machine.Jax`,
+                while the others are used to sample the network:
+                `init_cache_fn(params, batch_size)` returns the partial
+                activations of a batch of empty configurations,
+                `conditional_fn(params, cache, i)` returns the normalized
+                log-probabilities of the local states of site `i`, with shape
+                `(batch_size, hilbert.local_size)`, and
+                `update_cache_fn(params, cache, i, s)` returns the partial
+                activations after setting site `i` to the local states of
+                indices `s`.
+            dtype: the type used for the weights, only float is supported
+                because the conditional probabilities must be real.
+        """
+        if dtype is not float:
+            raise TypeError("Autoregressive machines only support real weights")
+
+        if (
+            not hilbert.is_discrete
+            or not hilbert.is_finite
+            or getattr(hilbert, "_has_constraint", False)
+        ):
+            raise ValueError(
+                "Autoregressive machines require a finite, discrete Hilbert space "
+                "without constraints"
+            )
+
+        (
+            init_fn,
+            predict_fn,
+            self._init_cache_fn,
+            self._conditional_fn,
+            self._update_cache_fn,
+        ) = module
+
+        super().__init__(hilbert, (init_fn, predict_fn), dtype=dtype)
+
+    @property
+    def jax_conditionals(self):
+        r"""The functions `(init_cache_fn, conditional_fn, update_cache_fn)`
+        used to sample the conditional probabilities site by site."""
+        return self._init_cache_fn, self._conditional_fn, self._update_cache_fn
+
+
+def AutoregressiveDenseLayer(
+    hilbert, n_hidden, W_init=glorot_normal(), b_init=normal()
+):
+    r"""
+    Layer constructor of a masked autoencoder (MADE) with one hidden layer of
+    `n_hidden` units, returning the conditional amplitudes
+
+    .. math:: \log\Psi(s) = \sum_i \frac{1}{2}\log p(s_i|s_{<i}) + i\phi(s_i|s_{<i}),
+
+    where the normalized probabilities :math:`p` and the phases :math:`\phi` are
+    computed from hidden units that only see the sites before :math:`i`.
+    """
+    N = hilbert.size
+    local_states = jnp.asarray(hilbert.local_states)
+    n_local = local_states.size
+
+    # Hidden unit k only sees the sites j < degree[k] and only feeds the
+    # conditionals of the sites i >= degree[k]
+    degree = 1 + _np.arange(n_hidden) % max(N - 1, 1)
+    mask_in = jnp.asarray(_np.arange(N)[:, None] < degree[None, :], dtype=float)
+    mask_out = jnp.asarray(degree[:, None] <= _np.arange(N)[None, :], dtype=float)
+
+    def init_fun(rng, input_shape):
+        k1, k2, k3, k4, k5, k6 = random.split(rng, 6)
+        W1 = W_init(k1, (N * n_local, n_hidden)).reshape(N, n_local, n_hidden)
+        b1 = b_init(k2, (n_hidden,))
+        W2 = W_init(k3, (n_hidden, N * n_local)).reshape(n_hidden, N, n_local)
+        b2 = b_init(k4, (N, n_local))
+        Wp = W_init(k5, (n_hidden, N * n_local)).reshape(n_hidden, N, n_local)
+        bp = b_init(k6, (N, n_local))
+        return (-1,), (W1, b1, W2, b2, Wp, bp)
+
+    def apply_fun(params, inputs, **kwargs):
+        W1, b1, W2, b2, Wp, bp = params
+
+        one_hot = (inputs[..., None] == local_states).astype(W1.dtype)
+
+        h = jnp.tanh(jnp.einsum("bil,ilh->bh", one_hot, W1 * mask_in[:, None, :]) + b1)
+
+        logits = jnp.einsum("bh,hil->bil", h, W2 * mask_out[:, :, None]) + b2
+        phase = jnp.einsum("bh,hil->bil", h, Wp * mask_out[:, :, None]) + bp
+
+        log_psi = 0.5 * jax.nn.log_softmax(logits, axis=-1) + 1.0j * phase
+        return jnp.sum(one_hot * log_psi, axis=(1, 2))
+
+    def init_cache_fun(params, batch_size):
+        W1, b1, W2, b2, Wp, bp = params
+        return jnp.broadcast_to(b1, (batch_size, n_hidden))
+
+    def conditional_fun(params, cache, i):
+        W1, b1, W2, b2, Wp, bp = params
+
+        h = jnp.tanh(cache)
+        logits = jnp.dot(h, W2[:, i, :] * mask_out[:, i].reshape(-1, 1)) + b2[i]
+        return jax.nn.log_softmax(logits, axis=-1)
+
+    def update_cache_fun(params, cache, i, s):
+        W1, b1, W2, b2, Wp, bp = params
+        return cache + (W1[i] * mask_in[i])[s]
+
+    return init_fun, apply_fun, init_cache_fun, conditional_fun, update_cache_fun
+
+
+def JaxAutoregressiveDense(hilbert, alpha=1):
+    r"""
+    Constructs an autoregressive machine with one masked hidden layer of
+    `alpha * hilbert.size` units, which can be sampled exactly with
+    `netket.sampler.AutoregressiveSampler`.
+
+        Args:
+            hilbert: Hilbert space on which the state is defined. Should be a
+                subclass of `netket.hilbert.Hilbert`.
+            alpha (int): Density of the hidden units.
+
+        returns:
+            Jax machine of the autoregressive network.
+    """
+    return JaxAutoregressive(
+        hilbert, AutoregressiveDenseLayer(hilbert, alpha * hilbert.size), dtype=float
+    )
@@ -37,6 +37,23 @@ def _log_cosh_sum(x, out, add_factor=None):
     return out
 
 
+@jit(nopython=True, fastmath=True)
+def _log_cosh_sum_1d(x):
+    x = x * _np.sign(x.real)
+    return _np.sum(x - _np.log(2.0) + _np.log(1.0 + _np.exp(-2.0 * x)))
+
+
+def _grid_shapes(n, max_dim=3):
+    # The shapes of the grids of n sites in up to max_dim dimensions, with
+    # sides of length at least 2
+    shapes = [(n,)]
+    if max_dim > 1:
+        for d in range(2, n):
+            if n % d == 0:
+                shapes += [(d,) + s for s in _grid_shapes(n // d, max_dim - 1)]
+    return shapes
+
+
 class RbmSpin(AbstractMachine):
     r"""
     A fully connected Restricted Boltzmann Machine (RBM). This type of
@@ -51,6 +68,8 @@ class RbmSpin(AbstractMachine):
     The weights can be taken to be complex-valued (default option) or real-valued.
     """
 
+    _supports_single_precision = True
+
     def __init__(
         self,
         hilbert,
@@ -136,6 +155,17 @@ class RbmSpin(AbstractMachine):
                 self._a, self._b, self._w, self._as, self._bs, self._ws, self._autom
             )
 
+        # Single-precision copies of W and of the symmetrization matrix, built
+        # when first needed
+        self._w_single = None
+        self._der_mat_symm_single = None
+
+        # For the translations of a periodic grid the activations are circular
+        # correlations, computed with fast Fourier transforms
+        self._translations = (
+            None if self._autom is None else self._find_translations(self._autom)
+        )
+
     @property
     def n_par(self):
         r"""The number of variational parameters in the machine."""
@@ -156,10 +186,19 @@ class RbmSpin(AbstractMachine):
         """
         x = x.astype(dtype=self._npdtype)
 
+        if self._translations is not None or self.precision == "single":
+            if out is None:
+                out = _np.empty(x.shape[0], dtype=_np.complex128)
+            # The sum over the hidden units is done in double precision
+            _log_cosh_sum(_np.asarray(self._theta(x), dtype=self._npdtype), out)
+            if self._a is not None:
+                out += x.dot(self._a)
+            return out
+
         return self._log_val_kernel(x, out, self._w, self._a, self._b, self._r)
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _log_val_kernel(x, out, W, a, b, r):
 
         if x.ndim != 2:
@@ -178,6 +217,94 @@ class RbmSpin(AbstractMachine):
 
         return out
 
+    @property
+    def has_fast_update(self):
+        return True
+
+    def init_lookup(self, x, out=None):
+        r"""Computes the lookup table for a batch of visible configurations `x`.
+        For the RBM the first `n_hidden` columns of the lookup table contain the
+        hidden-unit activations :math:`\theta_j = \sum_i W_{ij} x_i + b_j`, and
+        the last column contains :math:`\sum_j \log\cosh\theta_j`.
+
+        Args:
+            x: A matrix of `float64` of shape `(*, self.n_visible)`.
+            out: Destination matrix of shape `(x.shape[0], self.n_hidden + 1)`.
+
+        Returns:
+            `out`
+        """
+        if out is None or out.shape != (x.shape[0], self.n_hidden + 1):
+            out = _np.empty((x.shape[0], self.n_hidden + 1), dtype=_np.complex128)
+
+        theta = self._theta(x.astype(dtype=self._npdtype))
+
+        out[:, :-1] = theta
+        _log_cosh_sum(theta, out[:, -1])
+
+        return out
+
+    def log_val_diff(self, lookup, sites, deltas, out=None):
+        r"""Computes the difference :math:`\log\Psi(x^\prime) - \log\Psi(x)`
+        under the local moves described by `sites` and `deltas`, in
+        :math:`O(n_{changes} \times n_{hidden})` operations.
+
+        Args:
+            lookup: The lookup table of the configurations :math:`x`.
+            sites: A matrix of integers with the indices of the changed sites.
+            deltas: A matrix of `float64` with the changes of the local quantum numbers.
+            out: Destination vector of `complex128`.
+
+        Returns:
+            `out`
+        """
+        if out is None:
+            out = _np.empty(lookup.shape[0], dtype=_np.complex128)
+
+        return self._log_val_diff_kernel(lookup, sites, deltas, self._w, self._a, out)
+
+    def update_lookup(self, lookup, sites, deltas, mask):
+        r"""Updates in-place the lookup table for the configurations selected by `mask`.
+
+        Args:
+            lookup: The lookup table to update.
+            sites: A matrix of integers with the indices of the changed sites.
+            deltas: A matrix of `float64` with the changes of the local quantum numbers.
+            mask: A boolean vector selecting the rows to update.
+        """
+        self._update_lookup_kernel(lookup, sites, deltas, mask, self._w)
+
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def _log_val_diff_kernel(lookup, sites, deltas, W, a, out):
+        n_hidden = lookup.shape[1] - 1
+        theta = _np.empty(n_hidden, dtype=lookup.dtype)
+        for i in range(lookup.shape[0]):
+            theta[:] = lookup[i, :n_hidden]
+            out[i] = -lookup[i, n_hidden]
+            for k in range(sites.shape[1]):
+                s = sites[i, k]
+                if s >= 0:
+                    theta += W[s] * deltas[i, k]
+                    if a is not None:
+                        out[i] += a[s] * deltas[i, k]
+
+            out[i] += _log_cosh_sum_1d(theta)
+
+        return out
+
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def _update_lookup_kernel(lookup, sites, deltas, mask, W):
+        n_hidden = lookup.shape[1] - 1
+        for i in range(lookup.shape[0]):
+            if mask[i]:
+                for k in range(sites.shape[1]):
+                    s = sites[i, k]
+                    if s >= 0:
+                        lookup[i, :n_hidden] += W[s] * deltas[i, k]
+                lookup[i, n_hidden] = _log_cosh_sum_1d(lookup[i, :n_hidden])
+
     def der_log(self, x, out=None):
         r"""Computes the gradient of the logarithm of the wavefunction for a
         batch of visible configurations `x` and stores the result into `out`.
@@ -192,11 +319,15 @@ class RbmSpin(AbstractMachine):
         """
         if self._autom is None:
             return self._bare_der_log(x, out)
+        elif self._translations is not None:
+            if out is None:
+                out = _np.empty((x.shape[0], self._n_par), dtype=self._complex_dtype)
+            return self._translation_der_log(x, out)
         else:
             self._outb = self._bare_der_log(x)
             if out is None:
-                out = _np.empty((x.shape[0], self._n_par), dtype=_np.complex128)
-            return _np.matmul(self._outb, self._der_mat_symm, out=out)
+                out = _np.empty((x.shape[0], self._n_par), dtype=self._complex_dtype)
+            return _np.matmul(self._outb, self._precision_der_mat_symm(), out=out)
 
     def _bare_der_log(self, x, out=None):
 
@@ -204,7 +335,7 @@ class RbmSpin(AbstractMachine):
             raise RuntimeError("Invalid input shape, expected a 2d array")
 
         if out is None:
-            out = _np.empty((x.shape[0], self._n_bare_par), dtype=_np.complex128)
+            out = _np.empty((x.shape[0], self._n_bare_par), dtype=self._complex_dtype)
 
         batch_size = x.shape[0]
         n_visible = x.shape[1]
@@ -214,11 +345,7 @@ class RbmSpin(AbstractMachine):
             out[:, i : i + n_visible] = x
             i += n_visible
 
-        r = self._r
-        r = _np.dot(x, self._w)
-        if self._b is not None:
-            r += self._b
-        r = _np.tanh(r)
+        r = _np.tanh(self._theta(x))
 
         if self._b is not None:
             out[:, i : i + self.n_hidden] = r
@@ -226,7 +353,141 @@ class RbmSpin(AbstractMachine):
 
         t = out[:, i : i + self._w.size]
         t.shape = (batch_size, self._w.shape[0], self._w.shape[1])
-        _np.einsum("ij,il->ijl", x, r, out=t)
+        _np.einsum("ij,il->ijl", self._to_precision(x), r, out=t)
+
+        return out
+
+    def _jacobian_transpose_dot(self, x, vec, out=None):
+        if self._autom is None:
+            return self._bare_jacobian_transpose_dot(x, vec, out)
+
+        if out is None:
+            out = _np.empty(self._n_par, dtype=_np.complex128)
+
+        if self._translations is not None:
+            return self._translation_der_log(x, out, vec)
+
+        out[:] = self._der_mat_symm.T.dot(self._bare_jacobian_transpose_dot(x, vec))
+        return out
+
+    def _precision_w(self):
+        # W in the precision of the machine, the single-precision copy is
+        # rebuilt after the parameters are set
+        if self.precision == "double":
+            return self._w
+        if self._w_single is None:
+            self._w_single = self._to_precision(self._w)
+        return self._w_single
+
+    def _precision_der_mat_symm(self):
+        if self.precision == "double":
+            return self._der_mat_symm
+        if self._der_mat_symm_single is None:
+            self._der_mat_symm_single = self._to_precision(self._der_mat_symm)
+        return self._der_mat_symm_single
+
+    def _theta(self, x):
+        # Activations of the hidden units, x.dot(W) + b, in the precision of the
+        # machine unless computed with fast Fourier transforms
+        if self._translations is None:
+            theta = self._to_precision(x).dot(self._precision_w())
+        else:
+            _, order = self._translations
+            _, corr = self._correlations(x)
+            theta = corr[:, :, order].reshape(x.shape[0], -1)
+            if self._dtype is float:
+                theta = theta.real
+
+        if self._b is not None:
+            theta += self._b
+        return theta
+
+    def _correlations(self, x):
+        # corr[b, f, t] is the sum over the sites c of x[b, c] * ws[c + t, f],
+        # for every translation t of the grid
+        shape, _ = self._translations
+        axes = tuple(range(-len(shape), 0))
+
+        x_k = _np.fft.fftn(_np.real(x).reshape((x.shape[0],) + shape), axes=axes)
+        w_k = _np.fft.fftn(self._ws.T.reshape((-1,) + shape), axes=axes)
+
+        corr = _np.fft.ifftn(x_k.conj()[:, None] * w_k[None], axes=axes)
+        return x_k, corr.reshape(x.shape[0], w_k.shape[0], -1)
+
+    def _translation_der_log(self, x, out, vec=None):
+        # Derivatives with respect to the symmetric parameters, or their
+        # product with vec if given. The derivative with respect to ws[k, f] is
+        # the circular convolution of tanh(theta[f]) with x at site k.
+        x = _np.asarray(x, dtype=_np.float64)
+        shape, order = self._translations
+        axes = tuple(range(-len(shape), 0))
+        batch_size, n_visible = x.shape
+        alpha = self._ws.shape[1]
+
+        x_k, corr = self._correlations(x)
+        theta = corr[:, :, order]
+        if self._dtype is float:
+            theta = theta.real
+        if self._b is not None:
+            theta += self._bs[:, None]
+        tau = _np.tanh(theta)
+
+        # tanh(theta) arranged on the grid of the translations
+        tau_grid = _np.empty_like(tau)
+        tau_grid[:, :, order] = tau
+        tau_k = _np.fft.fftn(tau_grid.reshape((batch_size, alpha) + shape), axes=axes)
+
+        if vec is None:
+            conv_k = tau_k * x_k[:, None]
+            grads = (x.sum(axis=1), tau.sum(axis=2))
+        else:
+            conv_k = _np.tensordot(vec, tau_k * x_k[:, None], axes=1)
+            grads = (vec.dot(x.sum(axis=1)), vec.dot(tau.sum(axis=2)))
+
+        conv = _np.fft.ifftn(conv_k, axes=axes)
+        conv = conv.reshape(conv.shape[: -len(shape)] + (n_visible,))
+
+        i = 0
+        if self._a is not None:
+            out[..., i] = grads[0]
+            i += 1
+
+        if self._b is not None:
+            out[..., i : i + alpha] = grads[1]
+            i += alpha
+
+        # The parameters ws are stored with the sites as the slowest index
+        out[..., i:] = _np.swapaxes(conv, -1, -2).reshape(out[..., i:].shape)
+
+        return out
+
+    def _bare_jacobian_transpose_dot(self, x, vec, out=None):
+        # Same layout as _bare_der_log, contracted with vec by matrix products
+        # rather than through the Jacobian
+        if x.ndim != 2:
+            raise RuntimeError("Invalid input shape, expected a 2d array")
+
+        if out is None:
+            out = _np.empty(self._n_bare_par, dtype=_np.complex128)
+
+        x = _np.asarray(x, dtype=_np.float64)
+        n_visible = x.shape[1]
+
+        i = 0
+        if self._a is not None:
+            out[i : i + n_visible] = vec.dot(x)
+            i += n_visible
+
+        # Only the activations follow the precision of the machine, the sums
+        # over the samples are done in double precision
+        r = _np.tanh(self._theta(x))
+
+        if self._b is not None:
+            out[i : i + self.n_hidden] = vec.dot(r)
+            i += self.n_hidden
+
+        r = vec.reshape(-1, 1) * r
+        out[i : i + self._w.size] = x.T.dot(r).reshape(-1)
 
         return out
 
@@ -291,6 +552,8 @@ class RbmSpin(AbstractMachine):
                 self._a, self._b, self._w, self._as, self._bs, self._ws, self._autom
             )
 
+        self._w_single = None
+
     @staticmethod
     @jit
     def _build_der_mat(use_visible_bias, use_hidden_bias, n_visible, alpha, permtable):
@@ -338,6 +601,36 @@ class RbmSpin(AbstractMachine):
 
         return der_mat_symm.T, n_par
 
+    @staticmethod
+    def _find_translations(permtable):
+        # Returns the shape of the grid and the translation of every permutation
+        # if the permutations are the translations of a periodic grid, the
+        # sites being numbered in row-major order, or None otherwise
+        n_perms, n_sites = permtable.shape
+        if n_perms != n_sites:
+            return None
+
+        perms = {tuple(p): g for g, p in enumerate(permtable)}
+        if len(perms) != n_perms:
+            return None
+
+        for shape in _grid_shapes(n_sites):
+            coords = _np.indices(shape).reshape(len(shape), -1).T
+            order = _np.empty(n_perms, dtype=_np.intp)
+
+            for t in range(n_sites):
+                translated = _np.ravel_multi_index(
+                    ((coords + coords[t]) % shape).T, shape
+                )
+                g = perms.get(tuple(translated))
+                if g is None:
+                    break
+                order[g] = t
+            else:
+                return shape, order
+
+        return None
+
     @staticmethod
     def _get_hidden(automorphisms, hilbert, n_hidden, alpha):
         if (automorphisms is None) or (automorphisms is False):
@@ -641,6 +934,11 @@ class RbmMultiVal(RbmSpin):
         """
         return super().log_val(self._one_hot(x, self._local_states), out)
 
+    @property
+    def has_fast_update(self):
+        # The lookup tables of RbmSpin act on the one-hot encoded input
+        return False
+
     def der_log(self, x, out=None):
         r"""Computes the gradient of the logarithm of the wavefunction for a
         batch of visible configurations `x` and stores the result into `out`.
@@ -655,6 +953,11 @@ class RbmMultiVal(RbmSpin):
         """
         return super().der_log(self._one_hot(x, self._local_states), out)
 
+    def _jacobian_transpose_dot(self, x, vec, out=None):
+        return super()._jacobian_transpose_dot(
+            self._one_hot(x, self._local_states), vec, out
+        )
+
 
 class RbmSpinPhase(AbstractMachine):
     r"""
@@ -669,6 +972,8 @@ class RbmSpinPhase(AbstractMachine):
     for arbitrary local quantum numbers :math:`s_i`.
     """
 
+    _supports_single_precision = True
+
     def __init__(
         self,
         hilbert,
@@ -777,7 +1082,7 @@ class RbmSpinPhase(AbstractMachine):
         n_par_a = self._rbm_a.n_par
 
         if out is None:
-            out = _np.empty((x.shape[0], n_par), dtype=_np.complex128)
+            out = _np.empty((x.shape[0], n_par), dtype=self._complex_dtype)
 
         self._rbm_a.der_log(x, out[:, :n_par_a])
 
@@ -786,6 +1091,28 @@ class RbmSpinPhase(AbstractMachine):
 
         return out
 
+    def _jacobian_transpose_dot(self, x, vec, out=None):
+        n_par_a = self._rbm_a.n_par
+
+        if out is None:
+            out = _np.empty(self._n_par, dtype=_np.complex128)
+
+        self._rbm_a._jacobian_transpose_dot(x, vec, out[:n_par_a])
+
+        self._rbm_p._jacobian_transpose_dot(x, vec, out[n_par_a:])
+        out[n_par_a:] *= 1.0j
+
+        return out
+
+    @property
+    def precision(self):
+        return self._rbm_a.precision
+
+    @precision.setter
+    def precision(self, precision):
+        self._rbm_a.precision = precision
+        self._rbm_p.precision = precision
+
     @property
     def state_dict(self):
         r"""A dictionary containing the parameters of this machine"""
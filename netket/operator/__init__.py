@@ -14,6 +14,7 @@ from ._hamiltonian import Ising, Heisenberg
 from ._abstract_operator import AbstractOperator
 from ._bose_hubbard import BoseHubbard
 from ._pauli_strings import PauliStrings
+from ._cached_operator import CachedOperator
 
 from netket.utils import jax_available
 
@@ -25,3 +26,4 @@ if jax_available:
         local_costs_and_grads_function,
     )
     from ._der_local_values_jax import local_energy_kernel
+    from ._local_values_jax import local_values_jax
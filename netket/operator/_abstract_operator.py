@@ -1,7 +1,29 @@
 import abc
+import threading
+import numba
 import numpy as _np
 from scipy.sparse import csr_matrix as _csr_matrix
-from numba import jit
+from scipy.sparse.linalg import LinearOperator as _LinearOperator
+from numba import jit, prange
+
+# Minimum number of configurations for which the multi-threaded kernels are used
+_parallel_batch_size = 256
+
+
+def _use_parallel_kernel(batch_size):
+    r"""Whether a batch of configurations should be processed with the
+    multi-threaded variant of an operator kernel.
+
+    Parallel kernels are only launched from the main thread, since some of
+    the threading layers of numba cannot be entered concurrently, as it
+    happens when the connected elements are computed by the threads of the
+    samplers or of the drivers.
+    """
+    return (
+        batch_size >= _parallel_batch_size
+        and numba.get_num_threads() > 1
+        and threading.current_thread() is threading.main_thread()
+    )
 
 
 class AbstractOperator(abc.ABC):
@@ -103,31 +125,90 @@ class AbstractOperator(abc.ABC):
         r"""AbstractHilbert: The hilbert space associated to this operator."""
         raise NotImplementedError()
 
-    def to_sparse(self):
+    def to_sparse(self, chunk_size=2 ** 14):
         r"""Returns the sparse matrix representation of the operator. Note that,
         in general, the size of the matrix is exponential in the number of quantum
         numbers, and this operation should thus only be performed for
         low-dimensional Hilbert spaces or sufficiently sparse operators.
 
+        The matrix is built in blocks of rows and cached on the operator, such
+        that it is only computed again after the operator is modified in place.
+
         This method requires an indexable Hilbert space.
 
+        Args:
+            chunk_size (int): The number of rows of the matrix computed at once.
+
         Returns:
             scipy.sparse.csr_matrix: The sparse matrix representation of the operator.
         """
+        # The cached matrix is copied, since it could be modified by the caller
+        return self._cached_sparse(chunk_size).copy()
+
+    def _cached_sparse(self, chunk_size=2 ** 14):
+        sparse = getattr(self, "_sparse", None)
+        if sparse is None:
+            sparse = self._build_sparse(chunk_size)
+            self._sparse = sparse
+        return sparse
+
+    def _invalidate_cache(self):
+        r"""Discards the cached matrix and connection tables of the operator. It
+        must be called by the methods modifying the operator in place."""
+        self._sparse = None
+        self._jax_conn = None
+
+    @property
+    def jax_get_conn_padded(self):
+        r"""A pair `(conn_fn, table)` such that `conn_fn(table, x)` returns the
+        connected elements of a batch of configurations `x`, padded as in
+        `get_conn_padded`, with a number of connected elements fixed by the
+        operator. `conn_fn` can be traced by jax, while `table` is a tuple of
+        arrays with fixed shapes, such that local values can be computed in
+        a single compiled function. None if the operator does not support it.
+        """
+        conn = getattr(self, "_jax_conn", None)
+        if conn is None:
+            conn = self._build_jax_conn()
+            self._jax_conn = conn
+        return conn
+
+    def _build_jax_conn(self):
+        return None
+
+    def _build_sparse(self, chunk_size):
         hilb = self.hilbert
+        n_states = hilb.n_states
 
-        x = hilb.all_states()
+        indptr = _np.zeros(n_states + 1, dtype=_np.int64)
+        indices = _np.empty(0, dtype=_np.int32)
+        data = _np.empty(0, dtype=_np.complex128)
+        nnz = 0
 
-        sections = _np.empty(x.shape[0], dtype=_np.int32)
-        x_prime, mels = self.get_conn_flattened(x, sections)
+        sections = _np.empty(min(chunk_size, n_states), dtype=_np.int64)
+        for low in range(0, n_states, chunk_size):
+            high = min(low + chunk_size, n_states)
+            x = hilb.numbers_to_states(_np.arange(low, high))
 
-        numbers = hilb.states_to_numbers(x_prime)
+            x_prime, mels = self.get_conn_flattened(x, sections[: high - low])
+            n_conn = mels.size
 
-        sections1 = _np.empty(sections.size + 1, dtype=_np.int32)
-        sections1[1:] = sections
-        sections1[0] = 0
+            # The buffers are grown according to the number of elements per row
+            # found so far, such that they are reallocated only a few times
+            if nnz + n_conn > data.size:
+                size = max(nnz + n_conn, int(1.1 * (nnz + n_conn) * n_states / high))
+                indices.resize(size, refcheck=False)
+                data.resize(size, refcheck=False)
 
-        return _csr_matrix((mels, numbers, sections1))
+            indices[nnz : nnz + n_conn] = hilb.states_to_numbers(x_prime)
+            data[nnz : nnz + n_conn] = mels
+            indptr[low + 1 : high + 1] = sections[: high - low] + nnz
+            nnz += n_conn
+
+        indices.resize(nnz, refcheck=False)
+        data.resize(nnz, refcheck=False)
+
+        return _csr_matrix((data, indices, indptr), shape=(n_states, n_states))
 
     def to_dense(self):
         r"""Returns the dense matrix representation of the operator. Note that,
@@ -140,7 +221,7 @@ class AbstractOperator(abc.ABC):
         Returns:
             numpy.ndarray: The dense matrix representation of the operator as a Numpy array.
         """
-        return self.to_sparse().todense().A
+        return self._cached_sparse().toarray()
 
     def apply(self, v):
         return self.to_linear_operator().dot(v)
@@ -148,8 +229,63 @@ class AbstractOperator(abc.ABC):
     def __call__(self, v):
         return self.apply(v)
 
-    def to_linear_operator(self):
-        return self.to_sparse()
+    def to_linear_operator(self, chunk_size=2 ** 14):
+        r"""Returns a matrix-free representation of the operator, whose matrix
+        elements are computed on the fly every time it is applied to a vector.
+        The basis states are enumerated in chunks, such that the memory used
+        does not scale with the number of non-zero matrix elements.
+
+        This method requires an indexable Hilbert space.
+
+        Args:
+            chunk_size (int): The number of basis states whose connected elements
+                are computed at once.
+
+        Returns:
+            scipy.sparse.linalg.LinearOperator: The linear operator.
+        """
+        hilb = self.hilbert
+        n_states = hilb.n_states
+
+        def matvec(v):
+            v = _np.asarray(v).reshape(-1)
+            out = _np.empty(n_states, dtype=_np.result_type(v.dtype, _np.complex128))
+
+            sections = _np.empty(min(chunk_size, n_states), dtype=_np.int64)
+            for low in range(0, n_states, chunk_size):
+                high = min(low + chunk_size, n_states)
+                x = hilb.numbers_to_states(_np.arange(low, high))
+
+                x_prime, mels = self.get_conn_flattened(x, sections[: high - low])
+                numbers = hilb.states_to_numbers(x_prime)
+
+                if _use_parallel_kernel(high - low):
+                    kernel = _matvec_kernel_parallel
+                else:
+                    kernel = _matvec_kernel
+
+                kernel(v, numbers, mels, sections[: high - low], out[low:high])
+
+            return out
+
+        return _LinearOperator(
+            (n_states, n_states), matvec=matvec, dtype=_np.complex128
+        )
 
     def __repr__(self):
         return f"{type(self).__name__}(hilbert={self.hilbert})"
+
+
+def _matvec_impl(v, numbers, mels, sections, out):
+    # Every row only gathers the elements of v, such that the rows are
+    # independent
+    for b in prange(out.shape[0]):
+        acc = 0.0j
+        for k in range(sections[b - 1] if b > 0 else 0, sections[b]):
+            acc += mels[k] * v[numbers[k]]
+        out[b] = acc
+    return out
+
+
+_matvec_kernel = jit(nopython=True, nogil=True)(_matvec_impl)
+_matvec_kernel_parallel = jit(nopython=True, nogil=True, parallel=True)(_matvec_impl)
@@ -52,7 +52,6 @@ class BoseHubbard(AbstractOperator):
         self._edges = _np.asarray(list(graph.edges()))
         self._max_conn = 1 + self._edges.shape[0] * 2
         self._max_mels = _np.empty(self._max_conn, dtype=_np.complex128)
-        self._max_xprime = _np.empty((self._max_conn, self._n_sites))
 
         super().__init__()
 
@@ -83,7 +82,7 @@ class BoseHubbard(AbstractOperator):
 
         """
         mels = self._max_mels
-        x_prime = self._max_xprime
+        x_prime = _np.empty((self._max_conn, self._n_sites), dtype=x.dtype)
 
         mels[0] = 0.0
         x_prime[0] = _np.copy(x)
@@ -104,16 +103,16 @@ class BoseHubbard(AbstractOperator):
             if n_i > 0 and n_j < n_max:
                 mels[c] = -J * sqrt(n_i) * sqrt(n_j + 1)
                 x_prime[c] = _np.copy(x)
-                x_prime[c, i] -= 1.0
-                x_prime[c, j] += 1.0
+                x_prime[c, i] -= 1
+                x_prime[c, j] += 1
                 c += 1
 
             # destroy on j create on i
             if n_j > 0 and n_i < n_max:
                 mels[c] = -J * sqrt(n_j) * sqrt(n_i + 1)
                 x_prime[c] = _np.copy(x)
-                x_prime[c, j] -= 1.0
-                x_prime[c, i] += 1.0
+                x_prime[c, j] -= 1
+                x_prime[c, i] += 1
                 c += 1
 
         mu = self._mu
@@ -124,21 +123,15 @@ class BoseHubbard(AbstractOperator):
             # on-site interaction
             mels[0] += Uh * x[i] * (x[i] - 1.0)
 
-        return _np.copy(x_prime[:c]), _np.copy(mels[:c])
+        return x_prime[:c], _np.copy(mels[:c])
 
     @staticmethod
-    @jit(nopython=True)
-    def _flattened_kernel(
-        x, sections, edges, mels, x_prime, U, V, J, mu, n_max, max_conn
-    ):
+    @jit(nopython=True, nogil=True)
+    def _flattened_kernel(x, sections, edges, mels, x_prime, U, V, J, mu, n_max):
 
         batch_size = x.shape[0]
         n_sites = x.shape[1]
 
-        if mels.size < batch_size * max_conn:
-            mels = _np.empty(batch_size * max_conn, dtype=_np.complex128)
-            x_prime = _np.empty((batch_size * max_conn, n_sites))
-
         sqrt = _m.sqrt
         Uh = 0.5 * U
 
@@ -164,23 +157,23 @@ class BoseHubbard(AbstractOperator):
                 if n_i > 0 and n_j < n_max:
                     mels[odiag_ind] = -J * sqrt(n_i) * sqrt(n_j + 1)
                     x_prime[odiag_ind] = _np.copy(x[b])
-                    x_prime[odiag_ind, i] -= 1.0
-                    x_prime[odiag_ind, j] += 1.0
+                    x_prime[odiag_ind, i] -= 1
+                    x_prime[odiag_ind, j] += 1
                     odiag_ind += 1
 
                 # destroy on j create on i
                 if n_j > 0 and n_i < n_max:
                     mels[odiag_ind] = -J * sqrt(n_j) * sqrt(n_i + 1)
                     x_prime[odiag_ind] = _np.copy(x[b])
-                    x_prime[odiag_ind, j] -= 1.0
-                    x_prime[odiag_ind, i] += 1.0
+                    x_prime[odiag_ind, j] -= 1
+                    x_prime[odiag_ind, i] += 1
                     odiag_ind += 1
 
             diag_ind = odiag_ind
 
             sections[b] = odiag_ind
 
-        return _np.copy(x_prime[:odiag_ind]), _np.copy(mels[:odiag_ind])
+        return x_prime[:odiag_ind], mels[:odiag_ind]
 
     def get_conn_flattened(self, x, sections):
         r"""Finds the connected elements of the Operator. Starting
@@ -203,16 +196,20 @@ class BoseHubbard(AbstractOperator):
             array: An array containing the matrix elements :math:`O(x,x')` associated to each x'.
 
         """
+        # The connected states have the same type as the configurations
+        n_conn = x.shape[0] * self._max_conn
+        x_prime = _np.empty((n_conn, self._n_sites), dtype=x.dtype)
+        mels = _np.empty(n_conn, dtype=_np.complex128)
+
         return self._flattened_kernel(
             x,
             sections,
             self._edges,
-            self._max_mels,
-            self._max_xprime,
+            mels,
+            x_prime,
             self._U,
             self._V,
             self._J,
             self._mu,
             self._n_max,
-            self._max_conn,
         )
@@ -0,0 +1,515 @@
+from threading import Lock
+
+import numpy as _np
+from numba import jit
+
+from ._abstract_operator import AbstractOperator
+
+# Indices of the scalars describing the cache in CachedOperator._state
+_N_ENTRIES, _HEAD, _TAIL, _TOP, _LIVE = range(5)
+
+
+class CachedOperator(AbstractOperator):
+    r"""Wraps an operator, storing the connected elements of the most recently
+    used configurations in a cache of bounded size with least-recently-used
+    eviction.
+
+    Markov chains with a low acceptance rate keep the same configuration for
+    many sweeps, such that the connected elements of these configurations need
+    not be computed again. For discrete Hilbert spaces the configurations are
+    keyed by their local indices packed into 64-bit words, and the connected
+    configurations are stored in the compact integer type of the Hilbert space.
+    Keys are looked up in an open-addressing hash table and the connected
+    elements are stored in flat buffers, such that both the lookup and the
+    gathering of the cached elements are done in compiled kernels. The wrapped
+    operator can be used in place of the original one in `local_values`, in
+    the drivers and in `MetropolisHamiltonian`.
+    """
+
+    def __init__(self, operator, max_size=2 ** 14):
+        r"""
+        Constructs a new ``CachedOperator`` given an operator.
+
+        Args:
+            operator: The operator whose connected elements are cached.
+            max_size (int): The maximum number of configurations stored in the cache.
+
+        Examples:
+            Caches the connected elements of a transverse-field Ising Hamiltonian.
+
+            >>> import netket as nk
+            >>> g = nk.graph.Hypercube(length=20, n_dim=1, pbc=True)
+            >>> hi = nk.hilbert.Spin(s=0.5, N=g.n_nodes)
+            >>> op = nk.operator.CachedOperator(nk.operator.Ising(hi, g, h=1.0))
+            >>> print(op.max_size)
+            16384
+        """
+        if max_size < 1:
+            raise ValueError("Expected a positive integer for max_size ")
+
+        self._operator = operator
+        self._max_size = int(max_size)
+
+        hilbert = operator.hilbert
+        if hilbert.is_discrete and hilbert.is_finite:
+            self._dtype = hilbert.compact_dtype
+            self._local_states = _np.sort(
+                _np.asarray(hilbert.local_states, dtype=_np.float64)
+            )
+            bits = max(int(hilbert.local_size - 1).bit_length(), 1)
+            self._sites_per_word = 64 // bits
+            self._bits = bits
+            n_words = -(-hilbert.size // self._sites_per_word)
+        else:
+            # The keys are the bits of the float64 quantum numbers
+            self._dtype = _np.dtype(_np.float64)
+            self._local_states = None
+            n_words = hilbert.size
+
+        # Hash table of the indices of the entries, with a load factor of at
+        # most 1/2
+        table_size = 1 << (2 * self._max_size - 1).bit_length()
+        self._table = _np.full(table_size, -1, dtype=_np.int64)
+
+        self._entry_keys = _np.empty((self._max_size, n_words), dtype=_np.uint64)
+        self._entry_hash = _np.empty(self._max_size, dtype=_np.uint64)
+        self._prev = _np.empty(self._max_size, dtype=_np.int64)
+        self._next = _np.empty(self._max_size, dtype=_np.int64)
+        self._offset = _np.empty(self._max_size, dtype=_np.int64)
+        self._length = _np.empty(self._max_size, dtype=_np.int64)
+        self._state = _np.array([0, -1, -1, 0, 0], dtype=_np.int64)
+
+        # Flat buffers of the connected elements, allocated at the first miss
+        self._x_buffer = None
+        self._mels_buffer = None
+
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def operator(self):
+        r"""AbstractOperator: The wrapped operator."""
+        return self._operator
+
+    @property
+    def size(self):
+        return self._operator.size
+
+    @property
+    def hilbert(self):
+        return self._operator.hilbert
+
+    @property
+    def max_size(self):
+        r"""int: The maximum number of configurations stored in the cache."""
+        return self._max_size
+
+    @property
+    def hits(self):
+        r"""int: The number of configurations found in the cache."""
+        return self._hits
+
+    @property
+    def misses(self):
+        r"""int: The number of configurations not found in the cache."""
+        return self._misses
+
+    def __len__(self):
+        r"""The number of configurations stored in the cache."""
+        return int(self._state[_N_ENTRIES])
+
+    def __bool__(self):
+        # An operator is true even when its cache is empty
+        return True
+
+    def clear(self):
+        r"""Empties the cache and resets the hit and miss counters."""
+        with self._lock:
+            self._table.fill(-1)
+            self._state[:] = (0, -1, -1, 0, 0)
+            self._hits = 0
+            self._misses = 0
+
+    def _keys(self, x):
+        if self._local_states is None:
+            return _np.ascontiguousarray(x, dtype=_np.float64).view(_np.uint64)
+
+        keys = _np.empty((x.shape[0], self._entry_keys.shape[1]), dtype=_np.uint64)
+        return _pack_keys_kernel(
+            x, self._local_states, self._bits, self._sites_per_word, keys
+        )
+
+    def _reserve(self, n_conn, x_dtype, mels_dtype):
+        # Makes room for n_conn connected elements at the top of the buffers,
+        # compacting the entries and growing the buffers if needed
+        if self._x_buffer is None:
+            capacity = max(2 * n_conn, 1024)
+            self._x_buffer = _np.empty((capacity, self.hilbert.size), dtype=x_dtype)
+            self._mels_buffer = _np.empty(capacity, dtype=mels_dtype)
+            return
+
+        capacity = self._mels_buffer.size
+        if self._state[_TOP] + n_conn <= capacity:
+            return
+
+        capacity = max(capacity, 2 * (int(self._state[_LIVE]) + n_conn))
+        x_buffer = _np.empty((capacity, self.hilbert.size), dtype=x_dtype)
+        mels_buffer = _np.empty(capacity, dtype=self._mels_buffer.dtype)
+        _compact_kernel(
+            self._x_buffer,
+            self._mels_buffer,
+            x_buffer,
+            mels_buffer,
+            self._offset,
+            self._length,
+            self._state,
+        )
+        self._x_buffer = x_buffer
+        self._mels_buffer = mels_buffer
+
+    def get_conn_flattened(self, x, sections, pad=False):
+        r"""Finds the connected elements of the Operator, looking them up in the
+        cache and computing them with the wrapped operator only for the
+        configurations which are not found.
+
+        Args:
+            x (matrix): A matrix of shape (batch_size,hilbert.size) containing
+                        the batch of quantum numbers x.
+            sections (array): An array of size (batch_size) useful to unflatten
+                        the output of this function.
+                        See numpy.split for the meaning of sections.
+            pad (bool): Whether to use zero-valued matrix elements in order to return
+                        all equal sections. Padded elements are not cached.
+
+        Returns:
+            matrix: The connected states x', flattened together in a single matrix.
+            array: An array containing the matrix elements :math:`O(x,x')` associated to each x'.
+        """
+        if pad:
+            return self._operator.get_conn_flattened(x, sections, pad=True)
+
+        x = _np.asarray(x)
+        if x.shape[0] == 0:
+            return self._operator.get_conn_flattened(x, sections)
+
+        keys = self._keys(x)
+        entries = _np.empty(x.shape[0], dtype=_np.int64)
+
+        with self._lock:
+            _lookup_kernel(
+                keys,
+                self._table,
+                self._entry_keys,
+                self._entry_hash,
+                self._prev,
+                self._next,
+                self._state,
+                entries,
+            )
+            hit = entries >= 0
+
+            if hit.all():
+                self._hits += x.shape[0]
+                return self._gather(
+                    self._x_buffer,
+                    self._mels_buffer,
+                    self._offset[entries],
+                    self._length[entries],
+                    x.dtype,
+                    sections,
+                )
+
+            # The connected elements of the hits are copied out of the
+            # buffers, which can be compacted once the lock is released
+            hit_x, hit_mels = None, None
+            if hit.any():
+                hit_x, hit_mels = self._gather(
+                    self._x_buffer,
+                    self._mels_buffer,
+                    self._offset[entries[hit]],
+                    self._length[entries[hit]],
+                    self._dtype,
+                    _np.empty(int(hit.sum()), dtype=_np.int64),
+                )
+
+        # Rows of x not found in the cache, computed once even if repeated
+        missing = _np.flatnonzero(~hit)
+        _, first, inverse = _np.unique(
+            keys[missing], axis=0, return_index=True, return_inverse=True
+        )
+        order = _np.argsort(first)
+        rank = _np.empty_like(order)
+        rank[order] = _np.arange(order.size)
+        unique = missing[first[order]]
+
+        sections_m = _np.empty(unique.size, dtype=_np.int64)
+        x_primes_m, mels_m = self._operator.get_conn_flattened(x[unique], sections_m)
+        x_primes_m = x_primes_m.astype(self._dtype, copy=False)
+
+        # Offsets and lengths of every row in the hits followed by the misses
+        lengths_m = _np.diff(sections_m, prepend=0)
+        offsets_m = sections_m - lengths_m
+        offsets = _np.empty(x.shape[0], dtype=_np.int64)
+        lengths = _np.empty(x.shape[0], dtype=_np.int64)
+        x_primes_all, mels_all = x_primes_m, mels_m
+        if hit_x is not None:
+            lengths[hit] = self._length[entries[hit]]
+            offsets[hit] = _np.cumsum(lengths[hit]) - lengths[hit]
+            x_primes_all = _np.concatenate((hit_x, x_primes_m))
+            mels_all = _np.concatenate((hit_mels, mels_m))
+            offsets_m += hit_x.shape[0]
+        lengths[missing] = lengths_m[rank[inverse]]
+        offsets[missing] = offsets_m[rank[inverse]]
+
+        out = self._gather(x_primes_all, mels_all, offsets, lengths, x.dtype, sections)
+
+        with self._lock:
+            self._misses += unique.size
+            self._hits += x.shape[0] - unique.size
+
+            self._reserve(x_primes_m.shape[0], self._dtype, mels_m.dtype)
+            _insert_kernel(
+                keys[unique],
+                x_primes_m,
+                mels_m,
+                sections_m,
+                self._table,
+                self._entry_keys,
+                self._entry_hash,
+                self._prev,
+                self._next,
+                self._offset,
+                self._length,
+                self._state,
+                self._x_buffer,
+                self._mels_buffer,
+            )
+
+        return out
+
+    def _gather(self, x_buffer, mels_buffer, offsets, lengths, dtype, sections):
+        n_conn = int(lengths.sum())
+        x_primes = _np.empty((n_conn, self.hilbert.size), dtype=dtype)
+        mels = _np.empty(n_conn, dtype=mels_buffer.dtype)
+        _gather_kernel(
+            x_buffer, mels_buffer, offsets, lengths, x_primes, mels, sections
+        )
+        return x_primes, mels
+
+    @property
+    def jax_get_conn_padded(self):
+        return self._operator.jax_get_conn_padded
+
+    def to_sparse(self, chunk_size=2 ** 14):
+        return self._operator.to_sparse(chunk_size)
+
+    def _cached_sparse(self, chunk_size=2 ** 14):
+        return self._operator._cached_sparse(chunk_size)
+
+    def to_dense(self):
+        return self._operator.to_dense()
+
+    def to_linear_operator(self, *args, **kwargs):
+        return self._operator.to_linear_operator(*args, **kwargs)
+
+    def __repr__(self):
+        return f"CachedOperator({self._operator}, max_size={self._max_size})"
+
+
+@jit(nopython=True)
+def _pack_keys_kernel(states, local_states, bits, sites_per_word, out):
+    # Site j is stored in the bits (j % sites_per_word) * bits of the word
+    # j // sites_per_word. The local index is counted without branches, as
+    # the local dimension is small.
+    n_sites = states.shape[1]
+    for i in range(states.shape[0]):
+        for w in range(out.shape[1]):
+            word = _np.uint64(0)
+            for j in range(w * sites_per_word, min((w + 1) * sites_per_word, n_sites)):
+                index = _np.uint64(0)
+                for k in range(1, local_states.size):
+                    index += _np.uint64(local_states[k] <= states[i, j])
+                word |= index << _np.uint64((j - w * sites_per_word) * bits)
+            out[i, w] = word
+    return out
+
+
+@jit(nopython=True)
+def _hash(keys, i):
+    h = _np.uint64(0xCBF29CE484222325)
+    for w in range(keys.shape[1]):
+        h ^= keys[i, w]
+        h *= _np.uint64(0x100000001B3)
+        h ^= h >> _np.uint64(29)
+    return h
+
+
+@jit(nopython=True)
+def _find(table, entry_keys, entry_hash, keys, i, h):
+    # Returns the slot of the key i of keys in the table and its entry, or the
+    # free slot where it would be inserted and -1
+    mask = table.size - 1
+    slot = _np.int64(h & _np.uint64(mask))
+    while True:
+        e = table[slot]
+        if e < 0:
+            return slot, -1
+        if entry_hash[e] == h:
+            same = True
+            for w in range(keys.shape[1]):
+                if entry_keys[e, w] != keys[i, w]:
+                    same = False
+                    break
+            if same:
+                return slot, e
+        slot = (slot + 1) & mask
+
+
+@jit(nopython=True)
+def _remove(table, entry_hash, e):
+    # Removes the entry e from the table, shifting back the entries following
+    # it such that no probe sequence is broken
+    mask = table.size - 1
+    slot = _np.int64(entry_hash[e] & _np.uint64(mask))
+    while table[slot] != e:
+        slot = (slot + 1) & mask
+
+    while True:
+        table[slot] = -1
+        k = slot
+        while True:
+            k = (k + 1) & mask
+            f = table[k]
+            if f < 0:
+                return
+            home = _np.int64(entry_hash[f] & _np.uint64(mask))
+            # f stays if its home slot is cyclically in (slot, k]
+            if slot < k:
+                if slot < home <= k:
+                    continue
+            elif home > slot or home <= k:
+                continue
+            break
+        table[slot] = f
+        slot = k
+
+
+@jit(nopython=True)
+def _unlink(e, prev, next, state):
+    if prev[e] >= 0:
+        next[prev[e]] = next[e]
+    else:
+        state[_HEAD] = next[e]
+    if next[e] >= 0:
+        prev[next[e]] = prev[e]
+    else:
+        state[_TAIL] = prev[e]
+
+
+@jit(nopython=True)
+def _push_front(e, prev, next, state):
+    prev[e] = -1
+    next[e] = state[_HEAD]
+    if state[_HEAD] >= 0:
+        prev[state[_HEAD]] = e
+    else:
+        state[_TAIL] = e
+    state[_HEAD] = e
+
+
+@jit(nopython=True)
+def _lookup_kernel(keys, table, entry_keys, entry_hash, prev, next, state, out):
+    # Finds the entries of the keys, marking them as the most recently used
+    for i in range(keys.shape[0]):
+        _, e = _find(table, entry_keys, entry_hash, keys, i, _hash(keys, i))
+        out[i] = e
+        if e >= 0 and state[_HEAD] != e:
+            _unlink(e, prev, next, state)
+            _push_front(e, prev, next, state)
+    return out
+
+
+@jit(nopython=True)
+def _insert_kernel(
+    keys,
+    x_primes,
+    mels,
+    sections,
+    table,
+    entry_keys,
+    entry_hash,
+    prev,
+    next,
+    offset,
+    length,
+    state,
+    x_buffer,
+    mels_buffer,
+):
+    # Stores the connected elements of the keys at the top of the buffers,
+    # evicting the least recently used entries when the cache is full
+    max_size = entry_keys.shape[0]
+    low = 0
+    for i in range(keys.shape[0]):
+        high = sections[i]
+        h = _hash(keys, i)
+        slot, e = _find(table, entry_keys, entry_hash, keys, i, h)
+        if e >= 0:
+            # Inserted by another thread in the meantime
+            low = high
+            continue
+
+        if state[_N_ENTRIES] < max_size:
+            e = state[_N_ENTRIES]
+            state[_N_ENTRIES] += 1
+        else:
+            e = state[_TAIL]
+            _unlink(e, prev, next, state)
+            _remove(table, entry_hash, e)
+            state[_LIVE] -= length[e]
+            slot, _ = _find(table, entry_keys, entry_hash, keys, i, h)
+
+        for w in range(keys.shape[1]):
+            entry_keys[e, w] = keys[i, w]
+        entry_hash[e] = h
+        table[slot] = e
+
+        top = state[_TOP]
+        for k in range(high - low):
+            for j in range(x_buffer.shape[1]):
+                x_buffer[top + k, j] = x_primes[low + k, j]
+            mels_buffer[top + k] = mels[low + k]
+        offset[e] = top
+        length[e] = high - low
+        state[_TOP] += high - low
+        state[_LIVE] += high - low
+
+        _push_front(e, prev, next, state)
+        low = high
+
+
+@jit(nopython=True)
+def _compact_kernel(x_buffer, mels_buffer, x_out, mels_out, offset, length, state):
+    top = 0
+    for e in range(state[_N_ENTRIES]):
+        for k in range(length[e]):
+            for j in range(x_out.shape[1]):
+                x_out[top + k, j] = x_buffer[offset[e] + k, j]
+            mels_out[top + k] = mels_buffer[offset[e] + k]
+        offset[e] = top
+        top += length[e]
+    state[_TOP] = top
+    state[_LIVE] = top
+
+
+@jit(nopython=True)
+def _gather_kernel(x_buffer, mels_buffer, offsets, lengths, x_out, mels_out, sections):
+    k = 0
+    for i in range(offsets.size):
+        for m in range(offsets[i], offsets[i] + lengths[i]):
+            for j in range(x_out.shape[1]):
+                x_out[k, j] = x_buffer[m, j]
+            mels_out[k] = mels_buffer[m]
+            k += 1
+        sections[i] = k
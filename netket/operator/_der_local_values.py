@@ -2,6 +2,7 @@ import numpy as _np
 from numba import jit
 
 from ._local_liouvillian import LocalLiouvillian as _LocalLiouvillian
+from ._local_values import _machine_input
 
 from netket.utils import jax_available
 
@@ -36,6 +37,7 @@ def _der_local_values_impl(op, machine, v, log_vals, der_log_vals, out, batch_si
     sections = _np.empty(v.shape[0], dtype=_np.int32)
     v_primes, mels = op.get_conn_flattened(v, sections)
 
+    v_primes = _machine_input(v_primes)
     log_val_primes = machine.log_val(v_primes)
 
     # Compute the der_log in small batches and not in one go.
@@ -71,6 +73,7 @@ def _der_local_values_notcentered_impl(op, machine, v, log_vals, out, batch_size
     sections = _np.empty(v.shape[0], dtype=_np.int32)
     v_primes, mels = op.get_conn_flattened(v, sections)
 
+    v_primes = _machine_input(v_primes)
     log_val_primes = machine.log_val(v_primes)
 
     # Compute the der_log in small batches and not in one go.
@@ -96,6 +99,7 @@ def der_local_values(
     out=None,
     center_derivative=True,
     batch_size=64,
+    chunk_size=None,
 ):
     r"""
     Computes the derivative of local values of the operator `op` for all `samples`.
@@ -125,6 +129,13 @@ def der_local_values(
                     When this is true/false it is equivalent to setting :math:`\alpha=\{1 / 2\}`.
                     By default `center_derivative=True`, meaning that it returns the correct
                     derivative of the local values. False is mainly used when dealing with liouvillians.
+                batch_size: The number of connected configurations on which the
+                    log-derivatives of the machine are computed at once.
+                chunk_size: If given, the samples are processed in chunks of at most
+                    chunk_size configurations, such that the memory used to store
+                    the connected configurations and their log-derivatives does not
+                    grow with the number of samples. Defaults to None, processing all
+                    samples at once.
 
             Returns:
                 If samples is given in batches, a numpy ndarray of derivatives of local values
@@ -137,6 +148,7 @@ def der_local_values(
             v,
             log_vals=log_vals,
             center_derivative=center_derivative,
+            chunk_size=chunk_size,
         )
 
     if v.ndim != 2:
@@ -150,18 +162,37 @@ def der_local_values(
         out = _np.empty((v.shape[0], machine.n_par), dtype=_np.complex128)
 
     if log_vals is None:
-        log_vals = machine.log_val(v)
+        log_vals = machine.log_val(_machine_input(v))
 
     if der_log_vals is None and center_derivative is True:
-        der_log_vals = machine.der_log(v)
-
-    if center_derivative is True:
-        _der_local_values_impl(
-            op, machine, v, log_vals, der_log_vals, out, batch_size=batch_size
-        )
-    else:
-        _der_local_values_notcentered_impl(
-            op, machine, v, log_vals, out, batch_size=batch_size
-        )
+        der_log_vals = machine.der_log(_machine_input(v))
+
+    if chunk_size is None:
+        chunk_size = v.shape[0]
+    elif chunk_size < 1:
+        raise ValueError("Expected a positive integer for chunk_size ")
+
+    for low in range(0, v.shape[0], chunk_size):
+        chunk = slice(low, min(low + chunk_size, v.shape[0]))
+
+        if center_derivative is True:
+            _der_local_values_impl(
+                op,
+                machine,
+                v[chunk],
+                log_vals[chunk],
+                der_log_vals[chunk],
+                out[chunk],
+                batch_size=batch_size,
+            )
+        else:
+            _der_local_values_notcentered_impl(
+                op,
+                machine,
+                v[chunk],
+                log_vals[chunk],
+                out[chunk],
+                batch_size=batch_size,
+            )
 
     return out
@@ -6,10 +6,13 @@ from netket.machine._jax_utils import outdtype, outdtype_iscomplex, tree_leaf_is
 from jax import numpy as jnp
 
 from ._local_liouvillian import LocalLiouvillian as _LocalLiouvillian
+from ._local_values import _machine_input
 from ._local_cost_functions import (
     define_local_cost_function,
     local_costs_and_grads_function,
+    _local_costs_and_grads_function,
 )
+from ._local_values_jax import _machine_input_jax
 from ..vmc_common import tree_map
 
 #  Assumes that v is a single state (Vector) and vp is a batch (matrix). pars can be a pytree.
@@ -22,8 +25,39 @@ def local_energy_kernel(logpsi, pars, vp, mel, v):
 # Perform AD through the local values and then vmap.
 # Used to compute the gradient
 # \sum_i mel(i) * exp(vp(i)-v) * ( O_k(vp(i)) - O_k(v) )
+@partial(jax.jit, static_argnums=(0, 1, 2, 3))
+def _padded_costs_and_grads_kernel(
+    conn_fn, local_cost_fun, dtype, logpsi, pars, table, v
+):
+    v_primes, mels = conn_fn(table, v)
+    return _local_costs_and_grads_function(
+        local_cost_fun,
+        dtype,
+        logpsi,
+        pars,
+        _machine_input_jax(v_primes),
+        mels,
+        _machine_input_jax(v),
+    )
+
+
 def _der_local_values_impl(op, machine, v, log_vals):
+    conn = op.jax_get_conn_padded
+    if conn is not None:
+        # The connected elements are found in the same compiled function
+        val, grad = _padded_costs_and_grads_kernel(
+            conn[0],
+            local_energy_kernel,
+            machine._dtype,
+            machine.jax_forward,
+            machine.parameters,
+            conn[1],
+            v,
+        )
+        return grad
+
     v_primes, mels = op.get_conn_padded(_np.asarray(v))
+    v_primes, v = _machine_input(v_primes), _machine_input(_np.asarray(v))
 
     val, grad = local_costs_and_grads_function(
         local_energy_kernel, machine, v_primes, mels, v
@@ -86,8 +120,24 @@ def _local_values_and_grads_notcentered_kernel(logpsi, pars, vp, mel, v):
     return f_vmap(logpsi, pars, vp, mel, v)
 
 
+@partial(jax.jit, static_argnums=(0, 1))
+def _padded_values_and_grads_notcentered_kernel(conn_fn, logpsi, pars, table, v):
+    v_primes, mels = conn_fn(table, v)
+    return _local_values_and_grads_notcentered_kernel(
+        logpsi, pars, _machine_input_jax(v_primes), mels, _machine_input_jax(v)
+    )
+
+
 def _der_local_values_notcentered_impl(op, machine, v, log_vals):
+    conn = op.jax_get_conn_padded
+    if conn is not None:
+        val, grad = _padded_values_and_grads_notcentered_kernel(
+            conn[0], machine.jax_forward, machine.parameters, conn[1], v
+        )
+        return grad
+
     v_primes, mels = op.get_conn_padded(_np.asarray(v))
+    v_primes, v = _machine_input(v_primes), _machine_input(_np.asarray(v))
 
     val, grad = _local_values_and_grads_notcentered_kernel(
         machine.jax_forward, machine.parameters, v_primes, mels, v
@@ -102,6 +152,7 @@ def der_local_values_jax(
     log_vals=None,
     # der_log_vals=None,
     center_derivative=True,
+    chunk_size=None,
 ):
     r"""
     Computes the derivative of local values of the operator `op` for all `samples`.
@@ -125,6 +176,10 @@ def der_local_values_jax(
                     When this is true/false it is equivalent to setting :math:`\alpha=\{1 / 2\}`.
                     By default `center_derivative=True`, meaning that it returns the correct
                     derivative of the local values. False is mainly used when dealing with liouvillians.
+                chunk_size: If given, the samples are processed in chunks of at most
+                    chunk_size configurations, bounding the memory used by the
+                    intermediate quantities. Defaults to None, processing all samples
+                    at once.
 
             Returns:
                 If samples is given in batches, a numpy ndarray of derivatives of local values
@@ -141,16 +196,19 @@ def der_local_values_jax(
         log_vals = machine.log_val(v)
 
     if center_derivative is True:
-        return _der_local_values_impl(
-            op,
-            machine,
-            v,
-            log_vals,
-        )
+        _impl = _der_local_values_impl
     else:
-        return _der_local_values_notcentered_impl(
-            op,
-            machine,
-            v,
-            log_vals,
-        )
+        _impl = _der_local_values_notcentered_impl
+
+    if chunk_size is None or chunk_size >= v.shape[0]:
+        return _impl(op, machine, v, log_vals)
+
+    if chunk_size < 1:
+        raise ValueError("Expected a positive integer for chunk_size ")
+
+    grads = [
+        _impl(op, machine, v[low : low + chunk_size], log_vals[low : low + chunk_size])
+        for low in range(0, v.shape[0], chunk_size)
+    ]
+
+    return jax.tree_util.tree_multimap(lambda *g: jnp.concatenate(g, axis=0), *grads)
@@ -0,0 +1,92 @@
+import jax
+from jax import numpy as jnp
+
+# Functions computing the connected elements of a batch of configurations with
+# jax, as `get_conn_padded`. Every function takes the table of the operator
+# as first argument, a tuple of arrays with fixed shapes, such that the
+# number of connected elements does not depend on the configurations and the
+# whole computation can be traced. Unused entries are copies of x with
+# zero-valued matrix elements.
+
+
+def device_table(table):
+    r"""Copies the arrays of a table to the device once, rather than at
+    every call."""
+    return jax.tree_map(jnp.asarray, table)
+
+
+def _local_indices(local_states, x):
+    # Index of the local state of every site, local_states being sorted
+    return jnp.sum(x[..., None] > local_states, axis=-1)
+
+
+def local_operator_conn_padded(table, x):
+    (
+        local_states,
+        acting_on,
+        weights,
+        constant,
+        diag_mels,
+        n_conns,
+        all_mels,
+        all_x_prime,
+        slot_op,
+        slot_cc,
+        slot_sites,
+        slot_changed,
+    ) = table
+
+    batch_size, n_sites = x.shape
+    n_slots = slot_op.shape[0]
+
+    # Index of the local states of every operator, as in the numba kernel
+    idx = _local_indices(local_states, x)
+    xs_n = jnp.sum(idx[:, acting_on] * weights, axis=-1)
+
+    diag = constant + jnp.sum(diag_mels[jnp.arange(acting_on.shape[0]), xs_n], axis=-1)
+
+    # Every operator has a fixed number of slots, the largest number of
+    # connected elements it can give
+    xs_s = xs_n[:, slot_op]
+    valid = slot_cc < n_conns[slot_op, xs_s]
+
+    mels = jnp.where(valid, all_mels[slot_op, xs_s, slot_cc], 0.0)
+
+    new_states = all_x_prime[slot_op, xs_s, slot_cc]
+    replaced = jnp.einsum("bsa,san->bsn", new_states, slot_sites)
+
+    x_s = jnp.broadcast_to(x[:, None, :], (batch_size, n_slots, n_sites))
+    x_prime = jnp.where(
+        valid[:, :, None] & slot_changed[None], replaced.astype(x.dtype), x_s
+    )
+
+    x_primes = jnp.concatenate((x[:, None, :], x_prime), axis=1)
+    mels = jnp.concatenate((diag[:, None], mels), axis=1)
+    return x_primes, mels
+
+
+def ising_conn_padded(table, x):
+    edges, flips, h, J = table
+
+    diag = J * jnp.sum(x[:, edges[:, 0]] * x[:, edges[:, 1]], axis=-1)
+
+    # The first row of flips keeps x, the others flip one spin each
+    x_primes = (x[:, None, :] * flips).astype(x.dtype)
+    mels = jnp.concatenate(
+        (diag[:, None], jnp.full((x.shape[0], x.shape[1]), -h)), axis=1
+    )
+    return x_primes, mels
+
+
+def pauli_strings_conn_padded(table, x):
+    flip_masks, z_masks, weights, groups, cutoff = table
+
+    # The sign of every string is the parity of the number of up spins in its
+    # Z-mask
+    parity = jnp.remainder(jnp.dot(x.astype(jnp.int32), z_masks.T), 2)
+    signed = (1 - 2 * parity) * weights
+    mels = jnp.dot(signed, groups)
+    mels = jnp.where(jnp.abs(mels) > cutoff, mels, 0.0)
+
+    x_primes = jnp.where(flip_masks[None], 1 - x[:, None, :], x[:, None, :])
+    return x_primes, mels
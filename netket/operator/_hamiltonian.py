@@ -48,7 +48,7 @@ class Ising(AbstractOperator):
         return self._n_sites
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def n_conn(x, out):
         r"""Return the number of states connected to x.
 
@@ -94,12 +94,12 @@ class Ising(AbstractOperator):
         )
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _flattened_kernel(x, sections, edges, h, J):
         n_sites = x.shape[1]
         n_conn = n_sites + 1
 
-        x_prime = _np.empty((x.shape[0] * n_conn, n_sites))
+        x_prime = _np.empty((x.shape[0] * n_conn, n_sites), dtype=x.dtype)
         mels = _np.empty(x.shape[0] * n_conn)
 
         diag_ind = 0
@@ -149,6 +149,16 @@ class Ising(AbstractOperator):
 
         return self._flattened_kernel(x, sections, self._edges, self._h, self._J)
 
+    def _build_jax_conn(self):
+        from ._get_conn_jax import ising_conn_padded, device_table
+
+        n_sites = self._n_sites
+        flips = _np.ones((n_sites + 1, n_sites))
+        flips[1:] -= 2 * _np.eye(n_sites)
+
+        table = (self._edges.reshape(-1, 2), flips, self._h, self._J)
+        return ising_conn_padded, device_table(table)
+
     def __repr__(self):
         return f"Ising(J={self._J}, h={self._h}; dim={self.hilbert.size})"
 
@@ -1,9 +1,8 @@
-from ._abstract_operator import AbstractOperator
+from ._abstract_operator import AbstractOperator, _use_parallel_kernel
 from ..hilbert import DoubledHilbert
 
 import numpy as _np
-from numba import jit
-from numba.typed import List
+from numba import jit, prange
 
 from scipy.sparse.linalg import LinearOperator
 
@@ -17,8 +16,6 @@ class LocalLiouvillian(AbstractOperator):
         self._Hnh = ham
         self._Hnh_dag = ham
         self._hilbert = DoubledHilbert(ham.hilbert)
-        self._max_dissipator_conn_size = 0
-        self._max_conn_size = 0
 
         self._compute_hnh()
         super().__init__()
@@ -45,32 +42,18 @@ class LocalLiouvillian(AbstractOperator):
         return self._jump_ops
 
     def _compute_hnh(self):
+        self._invalidate_cache()
+
         Hnh = 1.0 * self._H
-        max_conn_size = 0
         for L in self._jump_ops:
             Hnh += -0.5j * L.conjugate().transpose() @ L
-            max_conn_size += (L.n_operators * L._max_op_size) ** 2
-
-        self._max_dissipator_conn_size = max_conn_size
 
         self._Hnh = Hnh
         self._Hnh_dag = Hnh.conjugate().transpose()
 
-        max_conn_size = (
-            self._max_dissipator_conn_size + Hnh.n_operators * Hnh._max_op_size
+        self._jump_table = _jump_operators_table(
+            self._jump_ops, _np.asarray(self.hilbert.physical.local_states)
         )
-        self._max_conn_size = max_conn_size
-        self._xprime = _np.empty((max_conn_size, self.hilbert.size))
-        self._xr_prime = _np.empty((max_conn_size, self.hilbert.physical.size))
-        self._xc_prime = _np.empty((max_conn_size, self.hilbert.physical.size))
-        self._xrv = self._xprime[:, 0 : self.hilbert.physical.size]
-        self._xcv = self._xprime[
-            :, self.hilbert.physical.size : 2 * self.hilbert.physical.size
-        ]
-        self._mels = _np.empty(max_conn_size, dtype=_np.complex128)
-
-        self._xprime_f = _np.empty((max_conn_size, self.hilbert.size))
-        self._mels_f = _np.empty(max_conn_size, dtype=_np.complex128)
 
     def add_jump_operator(self, op):
         self._jump_ops.append(op)
@@ -83,121 +66,30 @@ class LocalLiouvillian(AbstractOperator):
         self._compute_hnh()
 
     def get_conn(self, x):
-        n_sites = x.shape[0] // 2
-
-        xr, xc = x[0:n_sites], x[n_sites : 2 * n_sites]
-        i = 0
-
-        xrp, mel_r = self._Hnh_dag.get_conn(xr)
-        self._xrv[i : i + len(mel_r), :] = xrp
-        self._xcv[i : i + len(mel_r), :] = xc
-        self._mels[i : i + len(mel_r)] = mel_r * 1j
-        i = i + len(mel_r)
+        sections = _np.empty(1, dtype=_np.int64)
+        return self.get_conn_flattened(x.reshape((1, -1)), sections)
 
-        xcp, mel_c = self._Hnh.get_conn(xc)
-        self._xrv[i : i + len(mel_c), :] = xr
-        self._xcv[i : i + len(mel_c), :] = xcp
-        self._mels[i : i + len(mel_r)] = mel_c * (-1j)
-        i = i + len(mel_c)
-
-        for L in self._jump_ops:
-            L_xrp, L_mel_r = L.get_conn(xr)
-            L_xcp, L_mel_c = L.get_conn(xc)
-
-            nr = len(L_mel_r)
-            nc = len(L_mel_c)
-            # start filling batches
-            for r in range(nr):
-                self._xrv[i : i + nc, :] = L_xrp[r, :]
-                self._xcv[i : i + nc, :] = L_xcp
-                self._mels[i : i + nc] = _np.conj(L_mel_r[r]) * L_mel_c
-                i = i + nc
-
-        return _np.copy(self._xprime[0:i, :]), _np.copy(self._mels[0:i])
-
-    # pad option pads all sections to have the same (biggest) size.
-    # to avoid using the biggest possible size, we dynamically check what is
-    # the biggest size for the current size...
-    # TODO: investigate if this is worthless
     def get_conn_flattened(self, x, sections, pad=False):
         batch_size = x.shape[0]
         N = x.shape[1] // 2
-        n_jops = len(self.jump_ops)
         assert sections.shape[0] == batch_size
 
         # Separate row and column inputs
         xr, xc = x[:, 0:N], x[:, N : 2 * N]
 
-        # Compute all flattened connections of each term
+        # Compute all flattened connections of the non-hermitian hamiltonian,
+        # while those of the jump operators are computed by the kernel
         sections_r = _np.empty(batch_size, dtype=_np.int64)
         sections_c = _np.empty(batch_size, dtype=_np.int64)
         xr_prime, mels_r = self._Hnh_dag.get_conn_flattened(xr, sections_r)
         xc_prime, mels_c = self._Hnh.get_conn_flattened(xc, sections_c)
 
-        if pad:
-            # if else to accomodate for batches of 1 element, because
-            # sections don't start from 0-index...
-            # TODO: if we ever switch to 0-indexing, remove this.
-            if batch_size > 1:
-                max_conns_r = _np.max(_np.diff(sections_r))
-                max_conns_c = _np.max(_np.diff(sections_c))
-            else:
-                max_conns_r = sections_r[0]
-                max_conns_c = sections_c[0]
-            max_conns_Lrc = 0
-
-        L_xrps = List()
-        L_xcps = List()
-        L_mel_rs = List()
-        L_mel_cs = List()
-        sections_Lr = _np.empty(batch_size * n_jops, dtype=_np.int32)
-        sections_Lc = _np.empty(batch_size * n_jops, dtype=_np.int32)
-        for (i, L) in enumerate(self._jump_ops):
-            L_xrp, L_mel_r = L.get_conn_flattened(
-                xr, sections_Lr[i * batch_size : (i + 1) * batch_size]
-            )
-            L_xcp, L_mel_c = L.get_conn_flattened(
-                xc, sections_Lc[i * batch_size : (i + 1) * batch_size]
-            )
-
-            L_xrps.append(L_xrp)
-            L_xcps.append(L_xcp)
-            L_mel_rs.append(L_mel_r)
-            L_mel_cs.append(L_mel_c)
-
-            if pad:
-                if batch_size > 1:
-                    max_lr = _np.max(
-                        _np.diff(sections_Lr[i * batch_size : (i + 1) * batch_size])
-                    )
-                    max_lc = _np.max(
-                        _np.diff(sections_Lc[i * batch_size : (i + 1) * batch_size])
-                    )
-                else:
-                    max_lr = sections_Lr[i * batch_size]
-                    max_lc = sections_Lc[i * batch_size]
-
-                max_conns_Lrc += max_lr * max_lc
-
-        # compose everything again
-        if self._xprime.shape[0] < self._max_conn_size * batch_size:
-            # refcheck=False because otherwise this errors when testing
-            self._xprime_f.resize(
-                self._max_conn_size * batch_size, self.hilbert.size, refcheck=False
-            )
-            self._mels_f.resize(self._max_conn_size * batch_size, refcheck=False)
-
-        if pad:
-            pad = max_conns_Lrc + max_conns_r + max_conns_c
+        if _use_parallel_kernel(batch_size):
+            kernel = _get_conn_flattened_kernel_parallel
         else:
-            pad = 0
+            kernel = _get_conn_flattened_kernel
 
-        self._xprime_f[:] = 0
-        self._mels_f[:] = 0
-
-        return self._get_conn_flattened_kernel(
-            self._xprime_f,
-            self._mels_f,
+        return kernel(
             sections,
             xr,
             xc,
@@ -207,103 +99,16 @@ class LocalLiouvillian(AbstractOperator):
             mels_r,
             xc_prime,
             mels_c,
-            L_xrps,
-            L_xcps,
-            L_mel_rs,
-            L_mel_cs,
-            sections_Lr,
-            sections_Lc,
-            n_jops,
-            batch_size,
-            N,
+            *self._jump_table,
             pad,
         )
 
-    @staticmethod
-    @jit(nopython=True)
-    def _get_conn_flattened_kernel(
-        xs,
-        mels,
-        sections,
-        xr,
-        xc,
-        sections_r,
-        sections_c,
-        xr_prime,
-        mels_r,
-        xc_prime,
-        mels_c,
-        L_xrps,
-        L_xcps,
-        L_mel_rs,
-        L_mel_cs,
-        sections_Lr,
-        sections_Lc,
-        n_jops,
-        batch_size,
-        N,
-        pad,
-    ):
-        sec = 0
-        off = 0
-
-        n_hr_i = 0
-        n_hc_i = 0
-
-        n_Lr_is = _np.zeros(n_jops, dtype=_np.int32)
-        n_Lc_is = _np.zeros(n_jops, dtype=_np.int32)
-
-        for i in range(batch_size):
-            off_i = off
-            n_hr_f = sections_r[i]
-            n_hr = n_hr_f - n_hr_i
-            xs[off : off + n_hr, 0:N] = xr_prime[n_hr_i:n_hr_f, :]
-            xs[off : off + n_hr, N : 2 * N] = xc[i, :]
-            mels[off : off + n_hr] = 1j * mels_r[n_hr_i:n_hr_f]
-            off += n_hr
-            n_hr_i = n_hr_f
-
-            n_hc_f = sections_c[i]
-            n_hc = n_hc_f - n_hc_i
-            xs[off : off + n_hc, N : 2 * N] = xc_prime[n_hc_i:n_hc_f, :]
-            xs[off : off + n_hc, 0:N] = xr[i, :]
-            mels[off : off + n_hc] = -1j * mels_c[n_hc_i:n_hc_f]
-            off += n_hc
-            n_hc_i = n_hc_f
-
-            for j in range(n_jops):
-                L_xrp, L_mel_r = L_xrps[j], L_mel_rs[j]
-                L_xcp, L_mel_c = L_xcps[j], L_mel_cs[j]
-                n_Lr_f = sections_Lr[j * batch_size + i]
-                n_Lc_f = sections_Lc[j * batch_size + i]
-                n_Lr_i = n_Lr_is[j]
-                n_Lc_i = n_Lc_is[j]
-
-                n_Lr = n_Lr_f - n_Lr_is[j]
-                n_Lc = n_Lc_f - n_Lc_is[j]
-                # start filling batches
-                for r in range(n_Lr):
-                    xs[off : off + n_Lc, 0:N] = L_xrp[n_Lr_i + r, :]
-                    xs[off : off + n_Lc, N : 2 * N] = L_xcp[n_Lc_i:n_Lc_f, :]
-                    mels[off : off + n_Lc] = (
-                        _np.conj(L_mel_r[n_Lr_i + r]) * L_mel_c[n_Lc_i:n_Lc_f]
-                    )
-                    off = off + n_Lc
-
-                n_Lr_is[j] = n_Lr_f
-                n_Lc_is[j] = n_Lc_f
-
-            if pad != 0:
-                n_entries = off - off_i
-                mels[off : off + n_entries] = 0
-                off = (i + 1) * pad
-
-            sections[i] = off
-
-        return _np.copy(xs[0:off, :]), _np.copy(mels[0:off])
-
     def to_linear_operator(
-        self, *, sparse: bool = True, append_trace: bool = False
+        self,
+        chunk_size: int = 2 ** 14,
+        *,
+        sparse: bool = True,
+        append_trace: bool = False,
     ) -> LinearOperator:
         r"""Returns a lazy scipy linear_operator representation of the Lindblad Super-Operator.
 
@@ -311,6 +116,8 @@ class LocalLiouvillian(AbstractOperator):
         vectorised density matrices as input.
 
         Args:
+            chunk_size: Accepted for compatibility with AbstractOperator.to_linear_operator
+                and ignored, as the product is computed from the hamiltonian and jump operators.
             sparse: If True internally uses sparse matrices for the hamiltonian and jump operators,
                 dense otherwise (default=True)
             append_trace: If True (default=False) the resulting operator has size M**2 + 1, and the last
@@ -376,3 +183,235 @@ class LocalLiouvillian(AbstractOperator):
         L = LinearOperator((op_size, op_size), matvec=matvec, dtype=iHnh.dtype)
 
         return L
+
+
+def _jump_operators_table(jump_ops, local_states):
+    r"""Merges the tables of the local operators in jump_ops into a single
+    table, the terms of the j-th jump operator being those in the range
+    jump_start[j]:jump_start[j+1]."""
+    n_jops = len(jump_ops)
+
+    max_op_size = max([L._max_op_size for L in jump_ops], default=0)
+    max_acting_size = max([L._max_acting_size for L in jump_ops], default=0)
+
+    jump_start = _np.zeros(n_jops + 1, dtype=_np.intp)
+    jump_start[1:] = _np.cumsum([L.n_operators for L in jump_ops])
+    n_terms = jump_start[-1]
+
+    jump_constant = _np.array([L.constant for L in jump_ops], dtype=_np.complex128)
+
+    acting_on = _np.zeros((n_terms, max_acting_size), dtype=_np.intp)
+    acting_size = _np.zeros(n_terms, dtype=_np.intp)
+    diag_mels = _np.zeros((n_terms, max_op_size), dtype=_np.complex128)
+    n_conns = _np.zeros((n_terms, max_op_size), dtype=_np.intp)
+    mels = _np.zeros((n_terms, max_op_size, max_op_size), dtype=_np.complex128)
+    x_prime = _np.zeros((n_terms, max_op_size, max_op_size, max_acting_size))
+
+    for j, L in enumerate(jump_ops):
+        terms = slice(jump_start[j], jump_start[j + 1])
+        op_size, acting_size_L = L._max_op_size, L._max_acting_size
+
+        acting_on[terms, :acting_size_L] = L._acting_on
+        acting_size[terms] = L._acting_size
+        diag_mels[terms, :op_size] = L._diag_mels
+        n_conns[terms, :op_size] = L._n_conns
+        mels[terms, :op_size, :op_size] = L._mels
+        x_prime[terms, :op_size, :op_size, :acting_size_L] = L._x_prime
+
+    basis = local_states.size ** _np.arange(max_acting_size, dtype=_np.int64)
+
+    return (
+        local_states,
+        basis,
+        jump_start,
+        jump_constant,
+        acting_on,
+        acting_size,
+        diag_mels,
+        n_conns,
+        mels,
+        x_prime,
+    )
+
+
+@jit(nopython=True, nogil=True)
+def _local_index(x, acting_on, acting_size, local_states, basis):
+    xs_n = 0
+    for k in range(acting_size):
+        xs_n += (
+            _np.searchsorted(local_states, x[acting_on[acting_size - k - 1]]) * basis[k]
+        )
+    return xs_n
+
+
+def _get_conn_flattened_impl(
+    sections,
+    xr,
+    xc,
+    sections_r,
+    sections_c,
+    xr_prime,
+    mels_r,
+    xc_prime,
+    mels_c,
+    local_states,
+    basis,
+    jump_start,
+    jump_constant,
+    acting_on,
+    acting_size,
+    diag_mels,
+    n_conns,
+    all_mels,
+    all_x_prime,
+    pad,
+):
+    batch_size = xr.shape[0]
+    N = xr.shape[1]
+    n_jops = jump_start.shape[0] - 1
+    n_terms = acting_size.shape[0]
+
+    # Local indices and diagonal elements of the jump operators, on the rows
+    # and on the columns of the density matrix
+    xs_r = _np.empty((batch_size, n_terms), dtype=_np.intp)
+    xs_c = _np.empty((batch_size, n_terms), dtype=_np.intp)
+    diag_r = _np.empty((batch_size, n_jops), dtype=_np.complex128)
+    diag_c = _np.empty((batch_size, n_jops), dtype=_np.complex128)
+
+    offsets = _np.empty(batch_size + 1, dtype=_np.intp)
+
+    # First pass: counting the connected elements of every configuration
+    for i in prange(batch_size):
+        n_hr = sections_r[i] - (sections_r[i - 1] if i > 0 else 0)
+        n_hc = sections_c[i] - (sections_c[i - 1] if i > 0 else 0)
+        n_conn = n_hr + n_hc
+
+        for j in range(n_jops):
+            d_r = jump_constant[j]
+            d_c = jump_constant[j]
+            n_Lr = 0
+            n_Lc = 0
+            for t in range(jump_start[j], jump_start[j + 1]):
+                xs_r[i, t] = _local_index(
+                    xr[i], acting_on[t], acting_size[t], local_states, basis
+                )
+                xs_c[i, t] = _local_index(
+                    xc[i], acting_on[t], acting_size[t], local_states, basis
+                )
+                d_r += diag_mels[t, xs_r[i, t]]
+                d_c += diag_mels[t, xs_c[i, t]]
+                n_Lr += n_conns[t, xs_r[i, t]]
+                n_Lc += n_conns[t, xs_c[i, t]]
+
+            diag_r[i, j] = d_r
+            diag_c[i, j] = d_c
+
+            # Vanishing diagonal elements are skipped
+            n_Lr += d_r != 0
+            n_Lc += d_c != 0
+            n_conn += n_Lr * n_Lc
+
+        offsets[i + 1] = n_conn
+
+    max_conn = 0
+    if pad:
+        for i in range(batch_size):
+            max_conn = max(offsets[i + 1], max_conn)
+
+    offsets[0] = 0
+    for i in range(batch_size):
+        if pad:
+            offsets[i + 1] = offsets[i] + max_conn
+        else:
+            offsets[i + 1] += offsets[i]
+        sections[i] = offsets[i + 1]
+
+    n_tot = offsets[batch_size]
+
+    xs = _np.empty((n_tot, 2 * N), dtype=xr.dtype)
+    mels = _np.empty(n_tot, dtype=_np.complex128)
+
+    # Second pass: every configuration fills its own slice of the output
+    for i in prange(batch_size):
+        off = offsets[i]
+
+        n_hr_i = sections_r[i - 1] if i > 0 else 0
+        n_hr_f = sections_r[i]
+        n_hr = n_hr_f - n_hr_i
+        xs[off : off + n_hr, 0:N] = xr_prime[n_hr_i:n_hr_f, :]
+        xs[off : off + n_hr, N : 2 * N] = xc[i, :]
+        mels[off : off + n_hr] = 1j * mels_r[n_hr_i:n_hr_f]
+        off += n_hr
+
+        n_hc_i = sections_c[i - 1] if i > 0 else 0
+        n_hc_f = sections_c[i]
+        n_hc = n_hc_f - n_hc_i
+        xs[off : off + n_hc, N : 2 * N] = xc_prime[n_hc_i:n_hc_f, :]
+        xs[off : off + n_hc, 0:N] = xr[i, :]
+        mels[off : off + n_hc] = -1j * mels_c[n_hc_i:n_hc_f]
+        off += n_hc
+
+        # Kronecker product of the connections of every jump operator on the
+        # rows and on the columns, the term t0 - 1 standing for the diagonal
+        for j in range(n_jops):
+            t0 = jump_start[j]
+            t1 = jump_start[j + 1]
+
+            for tr in range(t0 - 1, t1):
+                if tr < t0:
+                    n_cr = 1 if diag_r[i, j] != 0 else 0
+                else:
+                    n_cr = n_conns[tr, xs_r[i, tr]]
+
+                for cr in range(n_cr):
+                    if tr < t0:
+                        mel_r = _np.conj(diag_r[i, j])
+                    else:
+                        mel_r = _np.conj(all_mels[tr, xs_r[i, tr], cr])
+
+                    for tc in range(t0 - 1, t1):
+                        if tc < t0:
+                            n_cc = 1 if diag_c[i, j] != 0 else 0
+                        else:
+                            n_cc = n_conns[tc, xs_c[i, tc]]
+
+                        for cc in range(n_cc):
+                            if tc < t0:
+                                mel_c = diag_c[i, j]
+                            else:
+                                mel_c = all_mels[tc, xs_c[i, tc], cc]
+
+                            xs[off, 0:N] = xr[i]
+                            xs[off, N : 2 * N] = xc[i]
+
+                            if tr >= t0:
+                                for k in range(acting_size[tr]):
+                                    xs[off, acting_on[tr, k]] = all_x_prime[
+                                        tr, xs_r[i, tr], cr, k
+                                    ]
+                            if tc >= t0:
+                                for k in range(acting_size[tc]):
+                                    xs[off, N + acting_on[tc, k]] = all_x_prime[
+                                        tc, xs_c[i, tc], cc, k
+                                    ]
+
+                            mels[off] = mel_r * mel_c
+                            off += 1
+
+        # Padding elements are zero
+        if pad:
+            off_f = offsets[i + 1]
+            mels[off:off_f] = 0.0j
+            for k in range(off, off_f):
+                xs[k, 0:N] = xr[i]
+                xs[k, N : 2 * N] = xc[i]
+
+    return xs, mels
+
+
+# The kernel is compiled both as a serial and as a multi-threaded function,
+# the latter being used for large batches
+_get_conn_flattened_kernel = jit(nopython=True, nogil=True)(_get_conn_flattened_impl)
+_get_conn_flattened_kernel_parallel = jit(nopython=True, nogil=True, parallel=True)(
+    _get_conn_flattened_impl
+)
@@ -1,7 +1,7 @@
-from ._abstract_operator import AbstractOperator
+from ._abstract_operator import AbstractOperator, _use_parallel_kernel
 
 import numpy as _np
-from numba import jit
+from numba import jit, prange
 import numbers
 
 
@@ -100,6 +100,7 @@ class LocalOperator(AbstractOperator):
     def mel_cutoff(self, mel_cutoff):
         self._mel_cutoff = mel_cutoff
         assert self.mel_cutoff >= 0
+        self._invalidate_cache()
 
     @property
     def constant(self):
@@ -129,10 +130,14 @@ class LocalOperator(AbstractOperator):
                 self._add_operator(operator, acting_on)
 
             self._constant += other._constant
+            self._invalidate_cache()
 
             return self
         if isinstance(other, numbers.Number):
             self._constant += other
+            self._invalidate_cache()
+
+            return self
 
         raise NotImplementedError()
 
@@ -176,6 +181,8 @@ class LocalOperator(AbstractOperator):
         for op in self._operators:
             op *= other
 
+        self._invalidate_cache()
+
         return self
 
     def __imatmul__(self, other):
@@ -295,6 +302,8 @@ class LocalOperator(AbstractOperator):
         return operators
 
     def _add_operator(self, operator, acting_on):
+        self._invalidate_cache()
+
         acting_on = _np.asarray(acting_on, dtype=_np.intp)
 
         if _np.unique(acting_on).size != acting_on.size:
@@ -523,7 +532,7 @@ class LocalOperator(AbstractOperator):
 
         """
 
-        return self._get_conn_flattened_kernel(
+        return _get_conn_flattened_kernel(
             x.reshape((1, -1)),
             _np.ones(1),
             self._local_states,
@@ -560,7 +569,12 @@ class LocalOperator(AbstractOperator):
 
         """
 
-        return self._get_conn_flattened_kernel(
+        if _use_parallel_kernel(x.shape[0]):
+            kernel = _get_conn_flattened_kernel_parallel
+        else:
+            kernel = _get_conn_flattened_kernel
+
+        return kernel(
             x,
             sections,
             self._local_states,
@@ -575,100 +589,6 @@ class LocalOperator(AbstractOperator):
             pad,
         )
 
-    @staticmethod
-    @jit(nopython=True)
-    def _get_conn_flattened_kernel(
-        x,
-        sections,
-        local_states,
-        basis,
-        constant,
-        diag_mels,
-        n_conns,
-        all_mels,
-        all_x_prime,
-        acting_on,
-        acting_size,
-        pad=False,
-    ):
-        batch_size = x.shape[0]
-        n_sites = x.shape[1]
-
-        assert sections.shape[0] == batch_size
-
-        n_operators = n_conns.shape[0]
-        xs_n = _np.empty((batch_size, n_operators), dtype=_np.intp)
-
-        tot_conn = 0
-        max_conn = 0
-
-        for b in range(batch_size):
-            # diagonal element
-            conn_b = 1
-
-            # counting the off-diagonal elements
-            for i in range(n_operators):
-                acting_size_i = acting_size[i]
-
-                xs_n[b, i] = 0
-                x_b = x[b]
-                x_i = x_b[acting_on[i, :acting_size_i]]
-                for k in range(acting_size_i):
-                    xs_n[b, i] += (
-                        _np.searchsorted(local_states, x_i[acting_size_i - k - 1])
-                        * basis[k]
-                    )
-
-                conn_b += n_conns[i, xs_n[b, i]]
-
-            tot_conn += conn_b
-            sections[b] = tot_conn
-
-            if pad:
-                max_conn = max(conn_b, max_conn)
-
-        if pad:
-            tot_conn = batch_size * max_conn
-
-        x_prime = _np.empty((tot_conn, n_sites))
-        mels = _np.empty(tot_conn, dtype=_np.complex128)
-
-        c = 0
-        for b in range(batch_size):
-            c_diag = c
-            mels[c_diag] = constant
-            x_batch = x[b]
-            x_prime[c_diag] = _np.copy(x_batch)
-            c += 1
-            for i in range(n_operators):
-
-                # Diagonal part
-                mels[c_diag] += diag_mels[i, xs_n[b, i]]
-                n_conn_i = n_conns[i, xs_n[b, i]]
-
-                if n_conn_i > 0:
-                    sites = acting_on[i]
-                    acting_size_i = acting_size[i]
-
-                    for cc in range(n_conn_i):
-                        mels[c + cc] = all_mels[i, xs_n[b, i], cc]
-                        x_prime[c + cc] = _np.copy(x_batch)
-
-                        for k in range(acting_size_i):
-                            x_prime[c + cc, sites[k]] = all_x_prime[
-                                i, xs_n[b, i], cc, k
-                            ]
-                    c += n_conn_i
-
-            if pad:
-                delta_conn = max_conn - (c - c_diag)
-                mels[c : c + delta_conn].fill(0.0j)
-                x_prime[c : c + delta_conn, :] = _np.copy(x_batch)
-                c += delta_conn
-                sections[b] = c
-
-        return x_prime, mels
-
     def get_conn_filtered(self, x, sections, filters):
         r"""Finds the connected elements of the Operator using only a subset of operators. Starting
         from a given quantum number x, it finds all other quantum numbers x' such
@@ -693,7 +613,12 @@ class LocalOperator(AbstractOperator):
 
         """
 
-        return self._get_conn_filtered_kernel(
+        if _use_parallel_kernel(x.shape[0]):
+            kernel = _get_conn_filtered_kernel_parallel
+        else:
+            kernel = _get_conn_filtered_kernel
+
+        return kernel(
             x,
             sections,
             self._local_states,
@@ -708,67 +633,132 @@ class LocalOperator(AbstractOperator):
             filters,
         )
 
-    @staticmethod
-    @jit(nopython=True)
-    def _get_conn_filtered_kernel(
-        x,
-        sections,
-        local_states,
-        basis,
-        constant,
-        diag_mels,
-        n_conns,
-        all_mels,
-        all_x_prime,
-        acting_on,
-        acting_size,
-        filters,
-    ):
+    def _build_jax_conn(self):
+        from ._get_conn_jax import local_operator_conn_padded, device_table
 
-        batch_size = x.shape[0]
-        n_sites = x.shape[1]
+        n_sites = self.hilbert.size
+        acting_size = self._acting_size
+        max_acting = self._acting_on.shape[1]
 
-        assert filters.shape[0] == batch_size and sections.shape[0] == batch_size
+        # Padded sites have zero weight in the index of the local states
+        k = _np.arange(max_acting)
+        valid = k[None, :] < acting_size[:, None]
+        acting_on = _np.where(valid, self._acting_on, 0)
+        weights = _np.where(
+            valid, self._basis[_np.clip(acting_size[:, None] - 1 - k, 0, None)], 0
+        )
 
-        n_operators = n_conns.shape[0]
-        xs_n = _np.empty((batch_size, n_operators), dtype=_np.intp)
+        # Every operator gets as many slots as its largest number of connected
+        # elements
+        n_slots = (
+            self._n_conns.max(axis=1)
+            if self._n_operators > 0
+            else _np.zeros(0, dtype=_np.intp)
+        )
+        slot_op = _np.repeat(_np.arange(self._n_operators), n_slots)
+        slot_cc = _np.concatenate([_np.arange(n) for n in n_slots] + [slot_op[:0]])
 
-        tot_conn = 0
+        slot_sites = (
+            acting_on[slot_op][:, :, None] == _np.arange(n_sites)[None, None, :]
+        ) & valid[slot_op][:, :, None]
 
-        for b in range(batch_size):
-            # diagonal element
-            tot_conn += 1
+        table = (
+            self._local_states,
+            acting_on,
+            weights,
+            self._constant,
+            self._diag_mels,
+            self._n_conns,
+            self._mels,
+            self._x_prime,
+            slot_op,
+            slot_cc,
+            slot_sites.astype(self._x_prime.dtype),
+            slot_sites.any(axis=1),
+        )
+        return local_operator_conn_padded, device_table(table)
+
+    def __repr__(self):
+        ao = self._acting_on
+        acting_str = f"acting_on={ao.tolist()}"
+        if len(acting_str) > 55:
+            acting_str = f"#acting_on={ao.shape[0]}"
+        return f"{type(self).__name__}(dim={self.hilbert.size}, local_dim={ao.shape[1]}, {acting_str})"
 
-            # counting the off-diagonal elements
-            i = filters[b]
 
-            assert i < n_operators and i >= 0
+def _get_conn_flattened_impl(
+    x,
+    sections,
+    local_states,
+    basis,
+    constant,
+    diag_mels,
+    n_conns,
+    all_mels,
+    all_x_prime,
+    acting_on,
+    acting_size,
+    pad=False,
+):
+    batch_size = x.shape[0]
+    n_sites = x.shape[1]
+
+    assert sections.shape[0] == batch_size
+
+    n_operators = n_conns.shape[0]
+    xs_n = _np.empty((batch_size, n_operators), dtype=_np.intp)
+    offsets = _np.empty(batch_size + 1, dtype=_np.intp)
+
+    # First pass: counting the connected elements of every configuration
+    for b in prange(batch_size):
+        # diagonal element
+        conn_b = 1
+
+        # counting the off-diagonal elements
+        x_b = x[b]
+        for i in range(n_operators):
             acting_size_i = acting_size[i]
 
-            xs_n[b, i] = 0
-            x_b = x[b]
+            xs_n_bi = 0
             x_i = x_b[acting_on[i, :acting_size_i]]
             for k in range(acting_size_i):
-                xs_n[b, i] += (
+                xs_n_bi += (
                     _np.searchsorted(local_states, x_i[acting_size_i - k - 1])
                     * basis[k]
                 )
+            xs_n[b, i] = xs_n_bi
 
-            tot_conn += n_conns[i, xs_n[b, i]]
-            sections[b] = tot_conn
+            conn_b += n_conns[i, xs_n_bi]
 
-        x_prime = _np.empty((tot_conn, n_sites))
-        mels = _np.empty(tot_conn, dtype=_np.complex128)
+        offsets[b + 1] = conn_b
 
-        c = 0
+    max_conn = 0
+    if pad:
         for b in range(batch_size):
-            c_diag = c
-            mels[c_diag] = constant
-            x_batch = x[b]
-            x_prime[c_diag] = _np.copy(x_batch)
-            c += 1
+            max_conn = max(offsets[b + 1], max_conn)
+
+    offsets[0] = 0
+    for b in range(batch_size):
+        if pad:
+            offsets[b + 1] = offsets[b] + max_conn
+        else:
+            offsets[b + 1] += offsets[b]
+        sections[b] = offsets[b + 1]
+
+    tot_conn = offsets[batch_size]
+
+    x_prime = _np.empty((tot_conn, n_sites), dtype=x.dtype)
+    mels = _np.empty(tot_conn, dtype=_np.complex128)
+
+    # Second pass: every configuration fills its own slice of the output
+    for b in prange(batch_size):
+        c_diag = offsets[b]
+        mels[c_diag] = constant
+        x_batch = x[b]
+        x_prime[c_diag] = x_batch
+        c = c_diag + 1
+        for i in range(n_operators):
 
-            i = filters[b]
             # Diagonal part
             mels[c_diag] += diag_mels[i, xs_n[b, i]]
             n_conn_i = n_conns[i, xs_n[b, i]]
@@ -779,17 +769,109 @@ class LocalOperator(AbstractOperator):
 
                 for cc in range(n_conn_i):
                     mels[c + cc] = all_mels[i, xs_n[b, i], cc]
-                    x_prime[c + cc] = _np.copy(x_batch)
+                    x_prime[c + cc] = x_batch
 
                     for k in range(acting_size_i):
                         x_prime[c + cc, sites[k]] = all_x_prime[i, xs_n[b, i], cc, k]
                 c += n_conn_i
 
-        return x_prime, mels
+        if pad:
+            c_end = offsets[b + 1]
+            mels[c:c_end] = 0.0j
+            for cc in range(c, c_end):
+                x_prime[cc] = x_batch
+
+    return x_prime, mels
+
+
+def _get_conn_filtered_impl(
+    x,
+    sections,
+    local_states,
+    basis,
+    constant,
+    diag_mels,
+    n_conns,
+    all_mels,
+    all_x_prime,
+    acting_on,
+    acting_size,
+    filters,
+):
+
+    batch_size = x.shape[0]
+    n_sites = x.shape[1]
+
+    assert filters.shape[0] == batch_size and sections.shape[0] == batch_size
+
+    n_operators = n_conns.shape[0]
+    xs_n = _np.empty(batch_size, dtype=_np.intp)
+    offsets = _np.empty(batch_size + 1, dtype=_np.intp)
+
+    # First pass: counting the connected elements of every configuration
+    for b in prange(batch_size):
+        # counting the off-diagonal elements
+        i = filters[b]
+
+        assert i < n_operators and i >= 0
+        acting_size_i = acting_size[i]
+
+        xs_n_b = 0
+        x_b = x[b]
+        x_i = x_b[acting_on[i, :acting_size_i]]
+        for k in range(acting_size_i):
+            xs_n_b += (
+                _np.searchsorted(local_states, x_i[acting_size_i - k - 1]) * basis[k]
+            )
+        xs_n[b] = xs_n_b
 
-    def __repr__(self):
-        ao = self._acting_on
-        acting_str = f"acting_on={ao.tolist()}"
-        if len(acting_str) > 55:
-            acting_str = f"#acting_on={ao.shape[0]}"
-        return f"{type(self).__name__}(dim={self.hilbert.size}, local_dim={ao.shape[1]}, {acting_str})"
+        # diagonal element and off-diagonal elements
+        offsets[b + 1] = 1 + n_conns[i, xs_n_b]
+
+    offsets[0] = 0
+    for b in range(batch_size):
+        offsets[b + 1] += offsets[b]
+        sections[b] = offsets[b + 1]
+
+    tot_conn = offsets[batch_size]
+
+    x_prime = _np.empty((tot_conn, n_sites), dtype=x.dtype)
+    mels = _np.empty(tot_conn, dtype=_np.complex128)
+
+    # Second pass: every configuration fills its own slice of the output
+    for b in prange(batch_size):
+        c_diag = offsets[b]
+        x_batch = x[b]
+        x_prime[c_diag] = x_batch
+        c = c_diag + 1
+
+        i = filters[b]
+        # Diagonal part
+        mels[c_diag] = constant + diag_mels[i, xs_n[b]]
+        n_conn_i = n_conns[i, xs_n[b]]
+
+        if n_conn_i > 0:
+            sites = acting_on[i]
+            acting_size_i = acting_size[i]
+
+            for cc in range(n_conn_i):
+                mels[c + cc] = all_mels[i, xs_n[b], cc]
+                x_prime[c + cc] = x_batch
+
+                for k in range(acting_size_i):
+                    x_prime[c + cc, sites[k]] = all_x_prime[i, xs_n[b], cc, k]
+
+    return x_prime, mels
+
+
+# Every kernel is compiled both as a serial and as a multi-threaded function,
+# the latter being used for large batches (see _use_parallel_kernel)
+_get_conn_flattened_kernel = jit(nopython=True, nogil=True)(_get_conn_flattened_impl)
+_get_conn_flattened_kernel_parallel = jit(nopython=True, nogil=True, parallel=True)(
+    _get_conn_flattened_impl
+)
+
+_get_conn_filtered_kernel = jit(nopython=True, nogil=True)(_get_conn_filtered_impl)
+_get_conn_filtered_kernel_parallel = jit(nopython=True, nogil=True, parallel=True)(
+    _get_conn_filtered_impl
+)
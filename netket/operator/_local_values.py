@@ -6,6 +6,19 @@ from netket.machine.density_matrix.abstract_density_matrix import (
     AbstractDensityMatrix as DensityMatrix,
 )
 
+from netket.hilbert._compact_states import _machine_input
+from netket.utils import jax_available
+
+if jax_available:
+    from netket.machine import Jax as _Jax
+    from ._local_values_jax import local_values_jax
+else:
+
+    class MockJaxMachine:
+        pass
+
+    _Jax = MockJaxMachine
+
 
 @jit(nopython=True)
 def _local_values_kernel(log_vals, log_val_primes, mels, sections, out):
@@ -17,17 +30,103 @@ def _local_values_kernel(log_vals, log_val_primes, mels, sections, out):
         low_range = s
 
 
+@jit(nopython=True)
+def _unique_conn_kernel(v, v_primes, sections):
+    # Finds the rows of v_primes which must be evaluated by the machine.
+    # inverse[k] is the position of v_primes[k] among the unique rows, or
+    # -1 if v_primes[k] is the configuration v[i] it is connected to.
+    n_rows = v_primes.shape[0]
+    n_sites = v_primes.shape[1]
+
+    inverse = _np.empty(n_rows, dtype=_np.int64)
+    unique = _np.empty(n_rows, dtype=_np.int64)
+    n_unique = 0
+
+    first_with_hash = dict()
+
+    low_range = 0
+    for i, s in enumerate(sections):
+        for k in range(low_range, s):
+            is_diag = True
+            for j in range(n_sites):
+                if v_primes[k, j] != v[i, j]:
+                    is_diag = False
+                    break
+
+            if is_diag:
+                inverse[k] = -1
+                continue
+
+            h = 0
+            for j in range(n_sites):
+                h = h * 1000003 ^ hash(v_primes[k, j])
+
+            if h in first_with_hash:
+                u = first_with_hash[h]
+                is_equal = True
+                for j in range(n_sites):
+                    if v_primes[k, j] != v_primes[unique[u], j]:
+                        is_equal = False
+                        break
+
+                # On hash collisions the row is just evaluated again
+                if is_equal:
+                    inverse[k] = u
+                    continue
+            else:
+                first_with_hash[h] = n_unique
+
+            unique[n_unique] = k
+            inverse[k] = n_unique
+            n_unique += 1
+
+        low_range = s
+
+    return unique[:n_unique], inverse
+
+
+@jit(nopython=True)
+def _scatter_log_vals_kernel(log_vals, log_val_unique, inverse, sections, out):
+    low_range = 0
+    for i, s in enumerate(sections):
+        for k in range(low_range, s):
+            if inverse[k] < 0:
+                out[k] = log_vals[i]
+            else:
+                out[k] = log_val_unique[inverse[k]]
+        low_range = s
+
+    return out
+
+
 def _local_values_impl(op, machine, v, log_vals, out):
 
     sections = _np.empty(v.shape[0], dtype=_np.int32)
-    v_primes, mels = op.get_conn_flattened(_np.asarray(v), sections)
+    v_np = _np.asarray(v)
+    v_primes, mels = op.get_conn_flattened(v_np, sections)
 
-    log_val_primes = machine.log_val(v_primes)
+    log_vals = _np.asarray(log_vals, dtype=_np.complex128)
 
-    _local_values_kernel(
-        _np.asarray(log_vals), _np.asarray(log_val_primes), mels, sections, out
+    # The machine is only evaluated on the distinct connected configurations,
+    # the log-values of the diagonal entries being already known
+    unique, inverse = _unique_conn_kernel(v_np, v_primes, sections)
+
+    log_val_primes = _np.empty(v_primes.shape[0], dtype=_np.complex128)
+    if unique.size > 0:
+        log_val_unique = _np.asarray(machine.log_val(_machine_input(v_primes[unique])))
+    else:
+        log_val_unique = log_val_primes[:0]
+
+    _scatter_log_vals_kernel(
+        log_vals,
+        log_val_unique.astype(_np.complex128),
+        inverse,
+        sections,
+        log_val_primes,
     )
 
+    _local_values_kernel(log_vals, log_val_primes, mels, sections, out)
+
 
 @jit(nopython=True)
 def _op_op_unpack_kernel(v, sections, vold):
@@ -49,20 +148,22 @@ def _local_values_op_op_impl(op, machine, v, log_vals, out):
     vold = _np.empty((sections[-1], v.shape[1]))
     _op_op_unpack_kernel(v_np, sections, vold)
 
-    log_val_primes = machine.log_val(v_primes, vold)
+    log_val_primes = machine.log_val(_machine_input(v_primes), vold)
 
     _local_values_kernel(
         _np.asarray(log_vals), _np.asarray(log_val_primes), mels, sections, out
     )
 
 
-def local_values(op, machine, v, log_vals=None, out=None):
+def local_values(op, machine, v, log_vals=None, out=None, chunk_size=None):
     r"""
     Computes local values of the operator `op` for all `samples`.
 
     The local value is defined as
     .. math:: O_{\mathrm{loc}}(x) = \langle x | O | \Psi \rangle / \langle x | \Psi \rangle
 
+    For jax machines and operators supporting `jax_get_conn_padded`, the local
+    values are computed in a single compiled function, see `local_values_jax`.
 
             Args:
                 op: Hermitian operator.
@@ -76,6 +177,10 @@ def local_values(op, machine, v, log_vals=None, out=None):
                 out: A scalar or a numpy array of local values of the operator.
                     If not given, it is allocated from scratch and then returned.
                     Defaults to None.
+                chunk_size: If given, the samples are processed in chunks of at most
+                    chunk_size configurations, such that the memory used to store
+                    the connected configurations does not grow with the number of
+                    samples. Defaults to None, processing all samples at once.
 
             Returns:
                 If samples is given in batches, a numpy array of local values
@@ -89,11 +194,24 @@ def local_values(op, machine, v, log_vals=None, out=None):
     if v.ndim != 2:
         raise RuntimeError("Invalid input shape, expected a 2d array")
 
+    if (
+        isinstance(machine, _Jax)
+        and not is_op_times_op
+        and op.jax_get_conn_padded is not None
+    ):
+        loc_vals = local_values_jax(
+            op, machine, v, log_vals=log_vals, chunk_size=chunk_size
+        )
+        if out is None:
+            return _np.asarray(loc_vals, dtype=_np.complex128)
+        out[:] = loc_vals
+        return out
+
     if log_vals is None:
         if not is_op_times_op:
-            log_vals = machine.log_val(v)
+            log_vals = machine.log_val(_machine_input(v))
         else:
-            log_vals = machine.log_val(v, v)
+            log_vals = machine.log_val(_machine_input(v), _machine_input(v))
 
     if not is_op_times_op:
         _impl = _local_values_impl
@@ -107,6 +225,14 @@ def local_values(op, machine, v, log_vals=None, out=None):
     if out is None:
         out = _np.empty(v.shape[0], dtype=_np.complex128)
 
-    _impl(op, machine, v, log_vals, out)
+    if chunk_size is None or chunk_size >= v.shape[0]:
+        _impl(op, machine, v, log_vals, out)
+    else:
+        if chunk_size < 1:
+            raise ValueError("Expected a positive integer for chunk_size ")
+
+        for low in range(0, v.shape[0], chunk_size):
+            high = min(low + chunk_size, v.shape[0])
+            _impl(op, machine, v[low:high], log_vals[low:high], out[low:high])
 
     return out
@@ -0,0 +1,89 @@
+import jax
+from functools import partial
+
+from jax import numpy as jnp
+
+
+def _machine_input_jax(x):
+    # Configurations stored in a compact integer type are only converted to
+    # floats when given to the machine
+    return x.astype(jnp.float64)
+
+
+@partial(jax.jit, static_argnums=(0, 1))
+def _local_values_jax_kernel(conn_fn, logpsi, pars, table, v, log_vals):
+    v_primes, mels = conn_fn(table, v)
+    batch_size, n_conn, n_sites = v_primes.shape
+
+    log_val_primes = logpsi(
+        pars, _machine_input_jax(v_primes.reshape(-1, n_sites))
+    ).reshape(batch_size, n_conn)
+    log_vals = log_vals.reshape(batch_size, 1)
+
+    return jnp.sum(mels * jnp.exp(log_val_primes - log_vals), axis=1)
+
+
+@partial(jax.jit, static_argnums=(0, 1))
+def _local_values_jax_kernel_nolog(conn_fn, logpsi, pars, table, v):
+    log_vals = logpsi(pars, _machine_input_jax(v))
+    return _local_values_jax_kernel(conn_fn, logpsi, pars, table, v, log_vals)
+
+
+def local_values_jax(op, machine, v, log_vals=None, chunk_size=None):
+    r"""
+    Computes local values of the operator `op` for all `samples` with a jax
+    machine, finding the connected elements, evaluating the machine and
+    reducing them in a single compiled function. The operator must support
+    `jax_get_conn_padded`.
+
+            Args:
+                op: Hermitian operator.
+                v: A numpy or jax array containing a batch of visible
+                    configurations :math:`V = v_1,\dots v_M`.
+                    Each row of the matrix corresponds to a visible configuration.
+                machine: A jax machine :math:`\Psi`.
+                log_vals: A numpy or jax array containing the values :math:`\log\Psi(V)`.
+                    If not given, they are computed together with the local values.
+                    Defaults to None.
+                chunk_size: If given, the samples are processed in chunks of at most
+                    chunk_size configurations. Defaults to None, processing all
+                    samples at once.
+
+            Returns:
+                A jax array of local values of the operator.
+    """
+    if v.ndim != 2:
+        raise RuntimeError("Invalid input shape, expected a 2d array")
+
+    conn = op.jax_get_conn_padded
+    if conn is None:
+        raise TypeError(f"{op} does not support jax_get_conn_padded")
+    conn_fn, table = conn
+
+    def _impl(v, log_vals):
+        if log_vals is None:
+            return _local_values_jax_kernel_nolog(
+                conn_fn, machine.jax_forward, machine.parameters, table, v
+            )
+        return _local_values_jax_kernel(
+            conn_fn, machine.jax_forward, machine.parameters, table, v, log_vals
+        )
+
+    if log_vals is not None:
+        log_vals = jnp.asarray(log_vals).reshape(-1)
+
+    if chunk_size is None or chunk_size >= v.shape[0]:
+        return _impl(v, log_vals)
+
+    if chunk_size < 1:
+        raise ValueError("Expected a positive integer for chunk_size ")
+
+    return jnp.concatenate(
+        [
+            _impl(
+                v[low : low + chunk_size],
+                None if log_vals is None else log_vals[low : low + chunk_size],
+            )
+            for low in range(0, v.shape[0], chunk_size)
+        ]
+    )
@@ -7,7 +7,13 @@ import re
 
 
 class PauliStrings(AbstractOperator):
-    """A Hamiltonian consisiting of the sum of products of Pauli operators."""
+    """A Hamiltonian consisiting of the sum of products of Pauli operators.
+
+    The strings are grouped by the qubits they flip, each group giving a
+    single connected configuration, and the qubits acted upon by Z and Y
+    operators are stored as bitmasks packed in 64-bit words. The sign of
+    every string is thus given by the parity of a few word operations.
+    """
 
     def __init__(self, operators, weights, cutoff=1.0e-10):
         """
@@ -74,8 +80,6 @@ class PauliStrings(AbstractOperator):
             else:
                 acting[key] = [k]
 
-        _n_z_check_max = 0
-
         for i, op in enumerate(operators):
             b_to_change = []
             b_z_check = []
@@ -95,44 +99,42 @@ class PauliStrings(AbstractOperator):
             if len(z_ops):
                 b_z_check += z_ops
 
-            _n_z_check_max = max(_n_z_check_max, len(b_z_check))
             append(b_to_change, (b_weights, b_z_check))
 
-        # now group together operators with same final state
+        # now group together operators with same final state, i.e. with the same
+        # X-mask. The strings of each group are stored contiguously, the group
+        # i being given by the strings group_start[i]:group_start[i+1].
         n_operators = len(acting)
-        _n_op_max = max(
-            list(map(lambda x: len(x), list(acting.values()))), default=n_operators
-        )
+        n_strings = sum(len(values) for values in acting.values())
+        n_words = -(-_n_qubits // 64)
 
         # unpacking the dictionary into fixed-size arrays
         _sites = _np.empty((n_operators, _n_qubits), dtype=_np.intp)
         _ns = _np.empty((n_operators), dtype=_np.intp)
-        _n_op = _np.empty(n_operators, dtype=_np.intp)
-        _weights = _np.empty((n_operators, _n_op_max), dtype=_np.complex128)
-        _nz_check = _np.empty((n_operators, _n_op_max), dtype=_np.intp)
-        _z_check = _np.empty((n_operators, _n_op_max, _n_z_check_max), dtype=_np.intp)
+        _group_start = _np.zeros(n_operators + 1, dtype=_np.intp)
+        _weights = _np.empty(n_strings, dtype=_np.complex128)
+        _z_masks = _np.zeros((n_strings, n_words), dtype=_np.uint64)
 
+        k = 0
         for i, act in enumerate(acting.items()):
             sites = act[0]
             nsi = len(sites)
             _sites[i, :nsi] = sites
             _ns[i] = nsi
-            values = act[1]
-            _n_op[i] = len(values)
-            for j in range(_n_op[i]):
-                _weights[i, j] = values[j][0]
-                _nz_check[i, j] = len(values[j][1])
-                _z_check[i, j, : _nz_check[i, j]] = values[j][1]
+            for weight, z_check in act[1]:
+                _weights[k] = weight
+                # Site j is stored in bit j % 64 of the word j // 64
+                for site in z_check:
+                    _z_masks[k, site // 64] |= _np.uint64(1) << _np.uint64(site % 64)
+                k += 1
+            _group_start[i + 1] = k
 
         self._sites = _sites
         self._ns = _ns
-        self._n_op = _n_op
+        self._group_start = _group_start
         self._weights = _weights
-        self._nz_check = _nz_check
-        self._z_check = _z_check
+        self._z_masks = _z_masks
 
-        self._x_prime_max = _np.empty((n_operators, _n_qubits))
-        self._mels_max = _np.empty((n_operators), dtype=_np.complex128)
         self._n_operators = n_operators
 
         super().__init__()
@@ -163,57 +165,47 @@ class PauliStrings(AbstractOperator):
             array: An array containing the matrix elements :math:`O(x,x')` associated to each x'.
 
         """
-        return self._flattened_kernel(
-            _np.atleast_2d(x),
-            self._x_prime_max,
-            _np.ones(1),
-            self._mels_max,
-            self._sites,
-            self._ns,
-            self._n_op,
-            self._weights,
-            self._nz_check,
-            self._z_check,
-            self._cutoff,
-            self._n_operators,
-        )
+        return self.get_conn_flattened(_np.atleast_2d(x), _np.ones(1))
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _flattened_kernel(
         x,
-        x_prime,
+        words,
         sections,
-        mels,
         sites,
         ns,
-        n_op,
+        group_start,
         weights,
-        nz_check,
-        z_check,
+        z_masks,
         cutoff,
-        max_conn,
     ):
+        n_groups = sites.shape[0]
+        n_words = words.shape[1]
 
-        x_prime = _np.empty((x.shape[0] * max_conn, x_prime.shape[1]))
-        mels = _np.empty((x.shape[0] * max_conn), dtype=_np.complex128)
+        x_prime = _np.empty((x.shape[0] * n_groups, x.shape[1]), dtype=x.dtype)
+        mels = _np.empty((x.shape[0] * n_groups), dtype=_np.complex128)
 
         n_c = 0
         for b in range(x.shape[0]):
             xb = x[b]
-            for i in range(sites.shape[0]):
-                mel = 0.0
-                for j in range(n_op[i]):
-                    if nz_check[i, j] > 0:
-                        to_check = z_check[i, j, : nz_check[i, j]]
-                        n_z = _np.count_nonzero(xb[to_check] == 1)
+            wb = words[b]
+            for i in range(n_groups):
+                mel = 0.0j
+                for j in range(group_start[i], group_start[i + 1]):
+                    # The sign is the parity of the number of up spins in the
+                    # Z-mask of the string
+                    v = _np.uint64(0)
+                    for w in range(n_words):
+                        v ^= wb[w] & z_masks[j, w]
+
+                    if _parity(v):
+                        mel -= weights[j]
                     else:
-                        n_z = 0
-
-                    mel += weights[i, j] * (-1.0) ** n_z
+                        mel += weights[j]
 
                 if abs(mel) > cutoff:
-                    x_prime[n_c] = _np.copy(xb)
+                    x_prime[n_c] = xb
                     for site in sites[i, : ns[i]]:
                         x_prime[n_c, site] = 1 - x_prime[n_c, site]
                     mels[n_c] = mel
@@ -245,15 +237,53 @@ class PauliStrings(AbstractOperator):
 
         return self._flattened_kernel(
             x,
-            self._x_prime_max,
+            self._hilbert.pack_states(x),
             sections,
-            self._mels_max,
             self._sites,
             self._ns,
-            self._n_op,
+            self._group_start,
+            self._weights,
+            self._z_masks,
+            self._cutoff,
+        )
+
+    def _build_jax_conn(self):
+        from ._get_conn_jax import pauli_strings_conn_padded, device_table
+
+        n_qubits = self._n_qubits
+        n_groups = self._n_operators
+
+        flip_masks = _np.zeros((n_groups, n_qubits), dtype=_np.bool_)
+        for i in range(n_groups):
+            flip_masks[i, self._sites[i, : self._ns[i]]] = True
+
+        # Unpacked Z-masks, and the group of every string
+        sites = _np.arange(n_qubits)
+        z_masks = (
+            self._z_masks[:, sites // 64] >> (sites % 64).astype(_np.uint64)
+        ) & _np.uint64(1)
+
+        groups = _np.zeros((self._weights.size, n_groups), dtype=_np.complex128)
+        for i in range(n_groups):
+            groups[self._group_start[i] : self._group_start[i + 1], i] = 1.0
+
+        table = (
+            flip_masks,
+            z_masks.astype(_np.int32),
             self._weights,
-            self._nz_check,
-            self._z_check,
+            groups,
             self._cutoff,
-            self._n_operators,
         )
+        return pauli_strings_conn_padded, device_table(table)
+
+
+@jit(nopython=True)
+def _parity(v):
+    # Parity of the number of set bits of the unsigned 64-bit integer v
+    v ^= v >> _np.uint64(32)
+    v ^= v >> _np.uint64(16)
+    v ^= v >> _np.uint64(8)
+    v ^= v >> _np.uint64(4)
+    v ^= v >> _np.uint64(2)
+    v ^= v >> _np.uint64(1)
+    return v & _np.uint64(1)
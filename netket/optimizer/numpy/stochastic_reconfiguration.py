@@ -11,6 +11,18 @@ from netket.utils import (
     n_nodes as _n_nodes,
 )
 
+# Number of samples whose single-precision log-derivatives are upcast to
+# double precision at once
+_UPCAST_CHUNK_SIZE = 1024
+
+
+def _double_precision_chunks(oks):
+    # Yields blocks of rows of single-precision log-derivatives upcast to
+    # double precision, such that oks is never copied as a whole
+    dtype = _np.promote_types(oks.dtype, _np.float64)
+    for low in range(0, oks.shape[0], _UPCAST_CHUNK_SIZE):
+        yield oks[low : low + _UPCAST_CHUNK_SIZE].astype(dtype)
+
 
 class SR:
     r"""
@@ -126,7 +138,9 @@ class SR:
             out: Output array for the update ẋ.
         """
 
-        oks -= _mean(oks, axis=0)
+        # Log-derivatives computed in single precision are kept in single
+        # precision and reduced with double-precision accumulators
+        oks -= _mean(oks, axis=0, dtype=_np.promote_types(oks.dtype, _np.float64))
 
         if self.has_complex_parameters is None:
             raise ValueError(
@@ -159,7 +173,7 @@ class SR:
 
                 self._x0 = out
             else:
-                self._S = _np.matmul(oks.conj().T, oks, self._S)
+                self._S = self._covariance(oks)
                 self._S = _sum_inplace(self._S)
                 self._S /= float(n_samp)
 
@@ -197,7 +211,7 @@ class SR:
                     raise RuntimeError("SR sparse solver did not converge.")
                 self._x0 = out.real
             else:
-                self._S = _np.matmul(oks.conj().T, oks, self._S)
+                self._S = self._covariance(oks)
                 self._S /= float(n_samp)
 
                 self._apply_preconditioning(grad)
@@ -290,30 +304,51 @@ class SR:
         rep += ", has_complex_parameters=" + str(self._has_complex_parameters) + ")"
         return rep
 
+    def _covariance(self, oks):
+        # Computes conj(oks)^T oks, accumulating in double precision
+        if oks.dtype == _np.promote_types(oks.dtype, _np.float64):
+            return _np.matmul(oks.conj().T, oks, self._S)
+
+        S = None
+        for oks_block in _double_precision_chunks(oks):
+            S_block = _np.matmul(oks_block.conj().T, oks_block)
+            if S is None:
+                S = S_block
+            else:
+                S += S_block
+        return S
+
     def _linear_operator(self, oks, n_samp):
         n_par = oks.shape[1]
         shift = self._diag_shift
-        oks_conj = oks.conjugate()
+
+        if oks.dtype == _np.promote_types(oks.dtype, _np.float64):
+            oks_conj = oks.conjugate()
+
+            def oks_dot(v):
+                v_tilde = _np.matmul(oks, v, self._v_tilde) / float(n_samp)
+                return _np.matmul(v_tilde, oks_conj, self._res_t)
+
+        else:
+
+            def oks_dot(v):
+                res = _np.zeros(n_par, dtype=_np.complex128)
+                for oks_block in _double_precision_chunks(oks):
+                    v_tilde = _np.matmul(oks_block, v) / float(n_samp)
+                    res += _np.matmul(v_tilde, oks_block.conj())
+                return res
 
         if self._has_complex_parameters:
 
             def matvec(v):
-                v_tilde = self._v_tilde
-                res = self._res_t
-
-                v_tilde = _np.matmul(oks, v, v_tilde) / float(n_samp)
-                res = _np.matmul(v_tilde, oks_conj, res)
+                res = oks_dot(v)
                 res = _sum_inplace(res) + shift * v
                 return res
 
         else:
 
             def matvec(v):
-                v_tilde = self._v_tilde
-                res = self._res_t
-
-                v_tilde = _np.matmul(oks, v, v_tilde) / float(n_samp)
-                res = _np.matmul(v_tilde, oks_conj, res)
+                res = oks_dot(v)
                 res = _sum_inplace(res) + shift * v
 
                 return res.real
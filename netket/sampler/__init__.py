@@ -13,3 +13,4 @@ from ..utils import jax_available
 
 if jax_available:
     from . import jax
+    from .jax import AutoregressiveSampler
@@ -1,5 +1,9 @@
 import abc
 import numpy as _np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from netket.hilbert._compact_states import _machine_input
 
 
 class AbstractSampler(abc.ABC):
@@ -35,25 +39,122 @@ class AbstractSampler(abc.ABC):
 
         self.sample_shape = (self.sample_size, self._input_size)
 
+        # Samples are stored in the compact type of the local quantum numbers,
+        # and converted to floats only when given to the machine
+        hilbert = machine.hilbert
+        if hilbert.is_discrete and hilbert.is_finite:
+            self.sample_dtype = hilbert.compact_dtype
+        else:
+            self.sample_dtype = _np.dtype(_np.float64)
+
     @machine_pow.setter
     def machine_pow(self, m_power):
         raise NotImplementedError
 
-    def samples(self, n_max, init_random=False):
+    def samples(
+        self, n_max, init_random=False, consumer=None, n_workers=1, max_in_flight=2
+    ):
+        r"""
+        Returns a generator over `n_max` batches of samples, after resetting the sampler.
+
+        If a `consumer` is given, every batch of samples is processed by a pool of
+        `n_workers` threads while the sampler keeps producing the next ones, and the
+        results of the consumer are yielded in order instead of the samples.
+        At most `max_in_flight` batches are waiting to be processed at any time,
+        bounding the memory used by the pipeline.
+
+        Args:
+            n_max (int): The number of batches of samples.
+            init_random (bool): If True, the state of the sampler is initialized at random.
+            consumer (callable, optional): A function `consumer(samples, log_values)`
+                called on a copy of every batch of samples and of the corresponding
+                log-values of the machine (None if the sampler does not track them).
+            n_workers (int): The number of threads executing the consumer.
+            max_in_flight (int): The largest number of batches being processed by
+                the consumer at the same time.
+        """
 
         self.reset(init_random)
 
-        n = 0
-        while n < n_max:
-            yield self.__next__()
-            n += 1
+        if consumer is None:
+            n = 0
+            while n < n_max:
+                yield self.__next__()
+                n += 1
+            return
+
+        if max_in_flight < 1:
+            raise ValueError("Expected a positive integer for max_in_flight ")
+
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            in_flight = deque()
+
+            for n in range(n_max):
+                samples = _np.array(self.__next__())
+                log_values = self.log_values
+                if log_values is not None:
+                    log_values = _np.array(log_values)
+
+                in_flight.append(pool.submit(consumer, samples, log_values))
+
+                if len(in_flight) >= max_in_flight:
+                    yield in_flight.popleft().result()
 
-    def generate_samples(self, n_samples, init_random=False, samples=None):
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    @property
+    def log_values(self):
+        r"""The log-values of the machine on the configurations returned by the
+        last call to `__next__`, or None if the sampler does not keep track of them."""
+        return None
+
+    def generate_samples(
+        self, n_samples, init_random=False, samples=None, return_log_values=False
+    ):
+        r"""
+        Generates `n_samples` batches of samples, after resetting the sampler.
+
+        Args:
+            n_samples (int): The number of batches of samples.
+            init_random (bool): If True, the state of the sampler is initialized at random.
+            samples (optional): Destination array of shape `(n_samples,) + self.sample_shape`
+                and type `self.sample_dtype`.
+            return_log_values (bool): If True, the log-values of the machine on the
+                samples are also returned. They are taken from the sampler when
+                available, and computed otherwise.
+
+        Returns:
+            The samples, or the tuple `(samples, log_values)` if `return_log_values`
+            is True, where `log_values` has shape `samples.shape[0:2]`.
+        """
         self.reset(init_random)
 
         if samples is None:
-            samples = _np.empty((n_samples, self.sample_shape[0], self.sample_shape[1]))
+            samples = _np.empty(
+                (n_samples, self.sample_shape[0], self.sample_shape[1]),
+                dtype=self.sample_dtype,
+            )
+
+        if return_log_values:
+            log_values = _np.empty(samples.shape[0:2], dtype=_np.complex128)
 
         for i in range(n_samples):
             samples[i] = self.__next__()
+
+            if return_log_values:
+                log_values_i = self.log_values
+                if log_values_i is None:
+                    log_values_i = self.machine.log_val(_machine_input(samples[i]))
+                log_values[i] = log_values_i
+
+        if return_log_values:
+            return samples, log_values
+        return samples
+
+    def _no_samples(self, return_log_values=False):
+        # The result of generate_samples when no samples are requested
+        samples = _np.empty((0,) + tuple(self.sample_shape), dtype=self.sample_dtype)
+        if return_log_values:
+            return samples, _np.empty((0, self.sample_shape[0]), dtype=_np.complex128)
         return samples
@@ -88,6 +88,8 @@ def CustomSamplerPt(
       move_weights: For each :math:`i`, the probability to pick one of
                the move operators (must sum to one).
       n_replicas: The number of replicas used for parallel tempering.
+      n_chains: The number of independent sets of replicas, each one returning
+                one sample per sweep. Defaults to 1.
       sweep_size: The number of exchanges that compose a single sweep.
                   If None, sweep_size is equal to the number of degrees of freedom (n_visible).
     """
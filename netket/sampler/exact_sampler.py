@@ -1,8 +1,10 @@
 import numpy as _np
+from numba import jit
 from .abstract_sampler import AbstractSampler
 from ..machine.density_matrix import AbstractDensityMatrix
 from ..hilbert import DoubledHilbert
-import netket.random
+from ..hilbert._compact_states import _machine_input
+from netket import random as _random
 
 
 class ExactSampler(AbstractSampler):
@@ -13,9 +15,15 @@ class ExactSampler(AbstractSampler):
     exponential cost with the number of degrees of freedom, and cannot be used
     for large systems, where Metropolis-based sampling are instead a viable
     option.
+
+    The distribution is stored as a Walker alias table, such that every sample
+    is drawn in constant time. The table is only rebuilt when the parameters of
+    the machine change. It takes 12 bytes per basis state, a `float64`
+    probability and an `int32` alias, and 4 more bytes per state are used
+    while it is built.
     """
 
-    def __init__(self, machine, sample_size=16):
+    def __init__(self, machine, sample_size=16, chunk_size=2 ** 16):
         r"""
         Constructs a new ``ExactSampler`` given a machine.
 
@@ -26,38 +34,131 @@ class ExactSampler(AbstractSampler):
                      $$F(X)$$, is arbitrary, by default $$F(X)=|X|^2$$.
 
             sample_size: The number of independent samples to be generated at each invocation of __next__.
+            chunk_size: The number of basis states on which the machine is evaluated at once
+                        when building the distribution, bounding the memory used
+                        to store the quantum numbers.
         """
         super().__init__(machine, sample_size)
         if isinstance(machine, AbstractDensityMatrix):
             self.hilbert = DoubledHilbert(machine.hilbert)
         else:
             self.hilbert = machine.hilbert
+
+        self.chunk_size = chunk_size
+
         self._machine_pow = 2.0
+        self._parameters = None
         self.reset()
 
     def reset(self, init_random=False):
-        self._prob = _np.absolute(self.machine.to_array()) ** self.machine_pow
-        self._prob /= self._prob.sum()
+        parameters = _np.array(self.machine.numpy_flatten(self.machine.parameters))
+
+        if self._parameters is None or not _np.array_equal(
+            parameters, self._parameters
+        ):
+            self._build_table()
+            self._parameters = parameters
+
+    def _build_table(self):
+        n_states = self.hilbert.n_states
+
+        # Unnormalized log-probabilities, computed chunk by chunk. The table
+        # is built in double precision, as the round-off errors of Vose's
+        # algorithm accumulate over the states. Indexable Hilbert spaces have
+        # less than 2^31 states, such that int32 indices can be used.
+        prob = _np.empty(n_states, dtype=_np.float64)
+        for low in range(0, n_states, self.chunk_size):
+            high = min(low + self.chunk_size, n_states)
+            states = self.hilbert.numbers_to_states(_np.arange(low, high))
+            log_vals = self.machine.log_val(states)
+            prob[low:high] = self.machine_pow * _np.asarray(log_vals).real
+
+        prob -= prob.max()
+        _np.exp(prob, out=prob)
+        prob *= n_states / prob.sum()
+
+        self._alias = _np.empty(n_states, dtype=_np.int32)
+        self._build_alias_kernel(prob, self._alias, _np.empty_like(self._alias))
+        self._prob = prob
+
+    @staticmethod
+    @jit(nopython=True)
+    def _build_alias_kernel(prob, alias, work):
+        # Vose's algorithm. On input prob has mean 1, on output prob[i] is the
+        # probability to accept i rather than alias[i]. The stacks of the
+        # states with probabilities smaller and larger than 1 are stored at
+        # the two ends of work, as they never hold more than n states together.
+        n = prob.size
+
+        n_small = 0
+        n_large = 0
+        for i in range(n):
+            alias[i] = i
+            if prob[i] < 1.0:
+                work[n_small] = i
+                n_small += 1
+            else:
+                n_large += 1
+                work[n - n_large] = i
+
+        while n_small > 0 and n_large > 0:
+            n_small -= 1
+            s = work[n_small]
+            l = work[n - n_large]
+
+            alias[s] = l
+            prob[l] = (prob[l] + prob[s]) - 1.0
+
+            if prob[l] < 1.0:
+                n_large -= 1
+                work[n_small] = l
+                n_small += 1
+
+        # Only round-off errors are left
+        for k in range(n_large):
+            prob[work[n - 1 - k]] = 1.0
+        for k in range(n_small):
+            prob[work[k]] = 1.0
+
+    @staticmethod
+    @jit(nopython=True)
+    def _sample_kernel(prob, alias, out):
+        n = prob.size
+        for k in range(out.size):
+            i = min(int(_random.uniform(0.0, 1.0) * n), n - 1)
+            if _random.uniform(0.0, 1.0) < prob[i]:
+                out[k] = i
+            else:
+                out[k] = alias[i]
+        return out
+
+    def _sample_numbers(self, n_samples):
+        numbers = _np.empty(n_samples, dtype=_np.int64)
+        return self._sample_kernel(self._prob, self._alias, numbers)
 
     def __next__(self):
-        numbers = netket.random.choice(
-            self._prob.size, size=self.sample_shape[0], replace=True, p=self._prob
-        )
+        numbers = self._sample_numbers(self.sample_shape[0])
         return self.hilbert.numbers_to_states(numbers)
 
-    def generate_samples(self, n_samples, init_random=False, samples=None):
+    def generate_samples(
+        self, n_samples, init_random=False, samples=None, return_log_values=False
+    ):
 
         if samples is None:
-            samples = _np.zeros((n_samples, self.sample_shape[0], self.sample_shape[1]))
-
-        numbers = netket.random.choice(
-            self._prob.size,
-            size=self.sample_shape[0] * n_samples,
-            replace=True,
-            p=self._prob,
-        )
+            samples = _np.empty(
+                (n_samples, self.sample_shape[0], self.sample_shape[1]),
+                dtype=self.sample_dtype,
+            )
+
+        numbers = self._sample_numbers(self.sample_shape[0] * n_samples)
         samples[:] = self.hilbert.numbers_to_states(numbers).reshape(samples.shape)
 
+        if return_log_values:
+            log_values = self.machine.log_val(
+                _machine_input(samples.reshape(-1, samples.shape[-1]))
+            ).reshape(samples.shape[0:2])
+            return samples, log_values
+
         return samples
 
     @property
@@ -67,4 +168,5 @@ class ExactSampler(AbstractSampler):
     @machine_pow.setter
     def machine_pow(self, m_power):
         self._machine_pow = m_power
+        self._parameters = None
         self.reset()
@@ -1,6 +1,8 @@
 from ...machine import Jax as JaxMachine
 from ..metropolis_hastings import MetropolisHastings, MetropolisHastingsPt
 from .metropolis_hastings import MetropolisHastings as JaxMetropolisHastings
+from .metropolis_hastings_pt import MetropolisHastingsPt as JaxMetropolisHastingsPt
+from .autoregressive import AutoregressiveSampler
 
 
 @MetropolisHastings.register(JaxMachine)
@@ -10,9 +12,11 @@ def _JaxMetropolisHastings(machine, kernel, n_chains=16, sweep_size=None, rng_ke
 
 @MetropolisHastingsPt.register(JaxMachine)
 def _JaxMetropolisHastingsPt(
-    machine, kernel, n_replicas=32, sweep_size=None, rng_key=None
+    machine, kernel, n_replicas=32, sweep_size=None, n_chains=1, rng_key=None
 ):
-    raise NotImplementedError("Parallel tempering samplers not yet implemented in Jax")
+    return JaxMetropolisHastingsPt(
+        machine, kernel, n_replicas, sweep_size, n_chains, rng_key
+    )
 
 
 # Register Jax kernels here
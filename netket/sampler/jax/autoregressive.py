@@ -0,0 +1,142 @@
+from ..abstract_sampler import AbstractSampler
+from ...machine import JaxAutoregressive
+
+import jax
+from functools import partial
+from netket import random as _random
+
+
+class AutoregressiveSampler(AbstractSampler):
+    r"""
+    This sampler generates i.i.d. samples from $$|\Psi(s)|^2$$ for
+    autoregressive machines, drawing the local quantum numbers one site at a
+    time from the conditional probabilities of the machine.
+
+    Since the samples are independent, there is neither burn-in nor
+    autocorrelation: when used in a driver, `n_discard` can be set to 0.
+    """
+
+    def __init__(self, machine, n_chains=16, rng_key=None):
+        r"""
+        Constructs a new ``AutoregressiveSampler`` given an autoregressive machine.
+
+        Args:
+            machine: A `netket.machine.JaxAutoregressive` machine.
+            n_chains: The number of independent samples generated at each
+                invocation of __next__.
+            rng_key: The jax PRNGKey used to generate the samples. If None, it is
+                seeded from the NetKet random number generator.
+        """
+        if not isinstance(machine, JaxAutoregressive):
+            raise TypeError("AutoregressiveSampler requires an autoregressive machine")
+
+        super().__init__(machine, n_chains)
+
+        self._rng_key = rng_key
+        if rng_key is None:
+            self._rng_key = jax.random.PRNGKey(
+                _random.randint(low=0, high=2 ** 32, size=()).item()
+            )
+
+        self._local_states = jax.numpy.asarray(machine.hilbert.local_states)
+
+        self._machine_pow = 2.0
+        self._log_values = None
+
+    @staticmethod
+    @partial(jax.jit, static_argnums=(0, 1, 2, 3, 4, 5, 6))
+    def _sample_kernel(
+        logpdf,
+        init_cache,
+        conditional,
+        update_cache,
+        n_samples,
+        n_chains,
+        n_sites,
+        params,
+        local_states,
+        rng_key,
+    ):
+        # All the samples are drawn at once, as a single batch
+        batch_size = n_samples * n_chains
+
+        def one_site(i, carry):
+            key, cache, indices = carry
+            key, subkey = jax.random.split(key)
+
+            # Only the partial activations of the sites before i are needed
+            log_prob = conditional(params, cache, i)
+            s = jax.random.categorical(subkey, log_prob, axis=-1)
+
+            indices = jax.ops.index_update(indices, jax.ops.index[:, i], s)
+            cache = update_cache(params, cache, i, s)
+            return key, cache, indices
+
+        keys = jax.random.split(rng_key, 2)
+        indices = jax.numpy.zeros((batch_size, n_sites), dtype=jax.numpy.int32)
+
+        _, _, indices = jax.lax.fori_loop(
+            0, n_sites, one_site, (keys[1], init_cache(params, batch_size), indices)
+        )
+
+        samples = local_states[indices]
+        log_vals = logpdf(params, samples).reshape(-1)
+
+        return (
+            keys[0],
+            samples.reshape(n_samples, n_chains, n_sites),
+            log_vals.reshape(n_samples, n_chains),
+        )
+
+    def reset(self, init_random=False):
+        self._log_values = None
+
+    @property
+    def machine_pow(self):
+        return self._machine_pow
+
+    @machine_pow.setter
+    def machine_pow(self, m_power):
+        if m_power != 2:
+            raise ValueError("AutoregressiveSampler can only sample |Psi(s)|^2")
+        self._machine_pow = m_power
+
+    @property
+    def log_values(self):
+        r"""The log-values of the machine on the last generated samples."""
+        return self._log_values
+
+    def _run(self, n_samples):
+        init_cache, conditional, update_cache = self.machine.jax_conditionals
+
+        self._rng_key, samples, log_values = self._sample_kernel(
+            self.machine._forward_fn_nj,
+            init_cache,
+            conditional,
+            update_cache,
+            n_samples,
+            self.sample_shape[0],
+            self._input_size,
+            self.machine.parameters,
+            self._local_states,
+            self._rng_key,
+        )
+
+        self._log_values = log_values[-1]
+        return samples, log_values
+
+    def generate_samples(
+        self, n_samples, init_random=False, samples=None, return_log_values=False
+    ):
+        if n_samples == 0:
+            return self._no_samples(return_log_values)
+
+        samples, log_values = self._run(n_samples)
+
+        if return_log_values:
+            return samples, log_values
+        return samples
+
+    def __next__(self):
+        samples, _ = self._run(1)
+        return samples[-1]
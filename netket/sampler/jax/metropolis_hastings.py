@@ -42,7 +42,7 @@ class MetropolisHastings(AbstractSampler):
         n_chains = initial_state.shape[0]
 
         def chains_one_step(i, walker):
-            key, state, log_prob = walker
+            key, state, log_val = walker
 
             # 1 to propagate for next iteration, 1 for uniform rng and n_chains for transition kernel
             keys = jax.random.split(key, 2 + n_chains)
@@ -50,40 +50,40 @@ class MetropolisHastings(AbstractSampler):
             proposal = jax.vmap(transition_kernel, in_axes=(0, 0), out_axes=0)(
                 keys[2:], state
             )
-            proposal_log_prob = machine_pow * logpdf(params, proposal).real
+            proposal_log_val = logpdf(params, proposal).reshape(-1)
 
             uniform = jax.random.uniform(keys[1], shape=(n_chains,))
-            do_accept = uniform < jax.numpy.exp(proposal_log_prob - log_prob)
+            do_accept = uniform < jax.numpy.exp(
+                machine_pow * (proposal_log_val.real - log_val.real)
+            )
 
             # do_accept must match ndim of proposal and state (which is 2)
             state = jax.numpy.where(do_accept.reshape(-1, 1), proposal, state)
 
-            log_prob = jax.numpy.where(
-                do_accept.reshape(-1), proposal_log_prob, log_prob
-            )
+            log_val = jax.numpy.where(do_accept.reshape(-1), proposal_log_val, log_val)
 
-            return (keys[0], state, log_prob)
+            return (keys[0], state, log_val)
 
         # Loop over the sweeps
         def chains_one_sweep(walker, i):
-            key, state, log_prob = walker
+            key, state, log_val = walker
             walker = jax.lax.fori_loop(
-                0, sweep_size, chains_one_step, (key, state, log_prob)
+                0, sweep_size, chains_one_step, (key, state, log_val)
             )
-            return walker, walker[1]
+            return walker, (walker[1], walker[2])
 
         keys = jax.random.split(rng_key, 2)
-        initial_log_prob = machine_pow * logpdf(params, initial_state).real
+        initial_log_val = logpdf(params, initial_state).reshape(-1)
 
         # Loop over the samples
-        walker, samples = jax.lax.scan(
+        walker, (samples, log_vals) = jax.lax.scan(
             chains_one_sweep,
-            (keys[1], initial_state, initial_log_prob),
+            (keys[1], initial_state, initial_log_val),
             xs=None,
             length=n_samples,
         )
 
-        return keys[0], samples
+        return keys[0], samples, log_vals
 
     @property
     def n_chains(self):
@@ -124,16 +124,25 @@ class MetropolisHastings(AbstractSampler):
 
             assert self._state.shape == self.sample_shape
 
+        self._log_values = None
+
         self._accepted_samples = 0
         self._total_samples = 0
 
-    def generate_samples(self, n_samples, init_random=False, samples=None):
+    @property
+    def log_values(self):
+        r"""The log-values of the machine on the current state of the chains."""
+        return self._log_values
+
+    def generate_samples(
+        self, n_samples, init_random=False, samples=None, return_log_values=False
+    ):
         if n_samples == 0:
-            return
+            return self._no_samples(return_log_values)
 
         self.reset(init_random)
 
-        self._rng_key, samples = self._metropolis_kernel(
+        self._rng_key, samples, log_values = self._metropolis_kernel(
             self.machine._forward_fn_nj,
             self._transition_kernel,
             n_samples,
@@ -145,10 +154,14 @@ class MetropolisHastings(AbstractSampler):
         )
 
         self._state = samples[-1]
+        self._log_values = log_values[-1]
+
+        if return_log_values:
+            return samples, log_values
         return samples
 
     def __next__(self):
-        self._rng_key, samples = self._metropolis_kernel(
+        self._rng_key, samples, log_values = self._metropolis_kernel(
             self.machine._forward_fn_nj,
             self._transition_kernel,
             1,
@@ -160,4 +173,5 @@ class MetropolisHastings(AbstractSampler):
         )
 
         self._state = samples[-1]
+        self._log_values = log_values[-1]
         return self._state
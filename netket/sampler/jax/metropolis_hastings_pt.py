@@ -0,0 +1,263 @@
+from ..abstract_sampler import AbstractSampler
+
+import jax
+from functools import partial
+from netket import random as _random
+
+
+class MetropolisHastingsPt(AbstractSampler):
+    def __init__(
+        self,
+        machine,
+        kernel,
+        n_replicas=32,
+        sweep_size=None,
+        n_chains=1,
+        rng_key=None,
+    ):
+
+        super().__init__(machine, n_chains)
+
+        self._random_state_kernel = jax.jit(kernel.random_state)
+        self._transition_kernel = jax.jit(kernel.transition)
+
+        self._rng_key = rng_key
+        if rng_key is None:
+            self._rng_key = jax.random.PRNGKey(
+                _random.randint(low=0, high=2 ** 32, size=()).item()
+            )
+
+        self.machine_pow = 2
+
+        self._n_chains = int(n_chains)
+        self.n_replicas = n_replicas
+
+        self.sweep_size = sweep_size
+
+    @staticmethod
+    @partial(jax.jit, static_argnums=(0, 1, 2, 3))
+    def _metropolis_pt_kernel(
+        logpdf,
+        transition_kernel,
+        n_samples,
+        sweep_size,
+        initial_state,
+        initial_beta,
+        initial_beta_pos,
+        params,
+        machine_pow,
+        rng_key,
+    ):
+        # The replicas of all chains are stored contiguously in a matrix of shape
+        # (n_chains * n_replicas, input_size), such that a single forward pass
+        # of the machine evolves all of them at once
+        n_chains, n_replicas = initial_beta.shape
+        n_tot = n_chains * n_replicas
+
+        # Replica-exchange moves pair the replicas (i, i+1) of the same chain,
+        # starting from either the even or the odd ones. If the partner of the
+        # partner of i is not i itself, replica i is left out.
+        slots = jax.numpy.arange(n_replicas)
+
+        def partners(swap_order):
+            forward = ((slots - swap_order.reshape(-1, 1)) % 2) == 0
+            partner = jax.numpy.where(forward, slots + 1, slots - 1) % n_replicas
+            partner_of_partner = jax.numpy.take_along_axis(partner, partner, axis=1)
+            valid = (partner_of_partner == slots) & (partner != slots)
+            return partner, valid
+
+        def chains_one_step(i, walker):
+            key, state, log_val, beta, beta_pos = walker
+
+            # 1 to propagate, 1 for the uniform rng of local moves, 2 for the
+            # replica exchange moves and n_tot for the transition kernel
+            keys = jax.random.split(key, 4 + n_tot)
+
+            # Local moves at fixed temperature
+            proposal = jax.vmap(transition_kernel, in_axes=(0, 0), out_axes=0)(
+                keys[4:], state
+            )
+            proposal_log_val = logpdf(params, proposal).reshape(-1)
+
+            uniform = jax.random.uniform(keys[1], shape=(n_tot,))
+            do_accept = uniform < jax.numpy.exp(
+                machine_pow * beta.reshape(-1) * (proposal_log_val.real - log_val.real)
+            )
+
+            # do_accept must match ndim of proposal and state (which is 2)
+            state = jax.numpy.where(do_accept.reshape(-1, 1), proposal, state)
+            log_val = jax.numpy.where(do_accept, proposal_log_val, log_val)
+
+            # Replica exchange moves, swapping the temperatures of two replicas
+            swap_order = jax.random.randint(
+                keys[2], shape=(n_chains,), minval=0, maxval=2
+            )
+            partner, valid = partners(swap_order)
+
+            log_prob = machine_pow * log_val.real.reshape(n_chains, n_replicas)
+            beta_partner = jax.numpy.take_along_axis(beta, partner, axis=1)
+            log_prob_partner = jax.numpy.take_along_axis(log_prob, partner, axis=1)
+
+            # The two replicas of a pair share the same random number
+            uniform = jax.random.uniform(keys[3], shape=(n_chains, n_replicas))
+            uniform = jax.numpy.take_along_axis(
+                uniform, jax.numpy.minimum(slots, partner), axis=1
+            )
+            do_swap = valid & (
+                uniform
+                < jax.numpy.exp((beta_partner - beta) * (log_prob - log_prob_partner))
+            )
+
+            beta = jax.numpy.where(do_swap, beta_partner, beta)
+
+            # Keep track of the replica at beta=1
+            swap_pos = jax.numpy.take_along_axis(
+                do_swap, beta_pos.reshape(-1, 1), axis=1
+            ).reshape(-1)
+            partner_pos = jax.numpy.take_along_axis(
+                partner, beta_pos.reshape(-1, 1), axis=1
+            ).reshape(-1)
+            beta_pos = jax.numpy.where(swap_pos, partner_pos, beta_pos)
+
+            return (keys[0], state, log_val, beta, beta_pos)
+
+        # Loop over the sweeps
+        def chains_one_sweep(walker, i):
+            walker = jax.lax.fori_loop(0, sweep_size, chains_one_step, walker)
+            key, state, log_val, beta, beta_pos = walker
+
+            # Rows of the replicas at beta=1
+            rows = jax.numpy.arange(n_chains) * n_replicas + beta_pos
+            return walker, (state[rows], log_val[rows])
+
+        keys = jax.random.split(rng_key, 2)
+        initial_log_val = logpdf(params, initial_state).reshape(-1)
+
+        # Loop over the samples
+        walker, (samples, log_vals) = jax.lax.scan(
+            chains_one_sweep,
+            (keys[1], initial_state, initial_log_val, initial_beta, initial_beta_pos),
+            xs=None,
+            length=n_samples,
+        )
+
+        _, state, _, beta, beta_pos = walker
+
+        return keys[0], samples, log_vals, state, beta, beta_pos
+
+    @property
+    def n_chains(self):
+        r"""The number of independent sets of replicas, each one contributing
+        one sample per sweep."""
+        return self._n_chains
+
+    @n_chains.setter
+    def n_chains(self, n_chains):
+        if n_chains < 1:
+            raise ValueError("Expected n_chains>0. ")
+
+        self._n_chains = int(n_chains)
+        self.sample_size = self._n_chains
+        self.sample_shape = (self._n_chains, self._input_size)
+
+        # Reallocates the replicas for the new number of chains
+        self.n_replicas = self._n_replicas
+
+    @property
+    def n_replicas(self):
+        return self._n_replicas
+
+    @n_replicas.setter
+    def n_replicas(self, n_replicas):
+        if n_replicas < 1:
+            raise ValueError("Expected n_replicas>0. ")
+
+        self._n_replicas = int(n_replicas)
+
+        # Linearly spaced inverse temperature, the same for all chains
+        self._beta = jax.numpy.tile(
+            1.0 - jax.numpy.arange(self._n_replicas) / self._n_replicas,
+            (self._n_chains, 1),
+        )
+
+        # Position of the replica at beta=1 in every chain
+        self._beta_pos = jax.numpy.zeros(self._n_chains, dtype=jax.numpy.int32)
+
+        self.reset(True)
+
+    @property
+    def machine_pow(self):
+        return self._machine_pow
+
+    @machine_pow.setter
+    def machine_pow(self, m_power):
+        self._machine_pow = m_power
+
+    @property
+    def sweep_size(self):
+        return self._sweep_size
+
+    @sweep_size.setter
+    def sweep_size(self, sweep_size):
+        self._sweep_size = sweep_size if sweep_size != None else self._input_size
+        if self._sweep_size < 0:
+            raise ValueError("Expected a positive integer for sweep_size ")
+
+    def reset(self, init_random=False):
+        if init_random:
+
+            self._rng_key, self._state = jax.lax.scan(
+                self._random_state_kernel,
+                self._rng_key,
+                xs=None,
+                length=self._n_chains * self._n_replicas,
+            )
+
+        self._log_values = None
+
+    @property
+    def log_values(self):
+        r"""The log-values of the machine on the replicas at :math:`\beta=1`."""
+        return self._log_values
+
+    def _run(self, n_samples):
+        (
+            self._rng_key,
+            samples,
+            log_values,
+            self._state,
+            self._beta,
+            self._beta_pos,
+        ) = self._metropolis_pt_kernel(
+            self.machine._forward_fn_nj,
+            self._transition_kernel,
+            n_samples,
+            self.sweep_size,
+            self._state,
+            self._beta,
+            self._beta_pos,
+            self.machine.parameters,
+            self.machine_pow,
+            self._rng_key,
+        )
+
+        self._log_values = log_values[-1]
+        return samples, log_values
+
+    def generate_samples(
+        self, n_samples, init_random=False, samples=None, return_log_values=False
+    ):
+        if n_samples == 0:
+            return self._no_samples(return_log_values)
+
+        self.reset(init_random)
+
+        samples, log_values = self._run(n_samples)
+
+        if return_log_values:
+            return samples, log_values
+        return samples
+
+    def __next__(self):
+        samples, _ = self._run(1)
+        return samples[-1]
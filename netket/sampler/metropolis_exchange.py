@@ -113,6 +113,8 @@ def MetropolisExchangePt(
                  :math:`F(X)`, is arbitrary, by default :math:`F(X)=|X|^2`.
         d_max: The maximum graph distance allowed for exchanges.
         n_replicas: The number of replicas used for parallel tempering.
+        n_chains: The number of independent sets of replicas, each one returning
+                  one sample per sweep. Defaults to 1.
         sweep_size: The number of exchanges that compose a single sweep.
                     If None, sweep_size is equal to the number of degrees of freedom (n_visible).
 
@@ -70,6 +70,8 @@ def MetropolisHamiltonianPt(
                   :math:`F(X)`, is arbitrary, by default :math:`F(X)=|X|^2`.
         hamiltonian: The operator used to perform off-diagonal transition.
         n_replicas: The number of replicas used for parallel tempering.
+        n_chains: The number of independent sets of replicas, each one returning
+                  one sample per sweep. Defaults to 1.
         sweep_size: The number of exchanges that compose a single sweep.
                      If None, sweep_size is equal to the number of degrees of freedom (n_visible).
         batch_size: The batch size to be used when calling log_val on the given Machine.
@@ -3,7 +3,7 @@ from . import numpy
 
 
 @singledispatch
-def MetropolisHastings(machine, kernel, n_chains=16, sweep_size=None):
+def MetropolisHastings(machine, kernel, n_chains=16, sweep_size=None, **kwargs):
     r"""
     ``MetropolisHastings`` is a generic Metropolis-Hastings sampler using
     a transition kernel to perform moves in the Markov Chain.
@@ -37,14 +37,22 @@ def MetropolisHastings(machine, kernel, n_chains=16, sweep_size=None):
         sweep_size: The number of exchanges that compose a single sweep.
                 If None, sweep_size is equal to the number of degrees of freedom being sampled
                 (the size of the input vector s to the machine).
+        fast_update: If True (default) and the machine supports lookup tables
+                (see `AbstractMachine.has_fast_update`), the log-values of the
+                proposed states are computed incrementally from the sites changed
+                by the transition kernel instead of evaluating the machine from scratch.
+        n_threads: The number of threads among which the chains are split
+                (default 1). Each thread evolves a block of chains with its own
+                random stream, seeded from the main one, so that results are
+                reproducible for a given seed and number of threads.
 
     """
 
-    return numpy.MetropolisHastings(machine, kernel, n_chains, sweep_size)
+    return numpy.MetropolisHastings(machine, kernel, n_chains, sweep_size, **kwargs)
 
 
 @singledispatch
-def MetropolisHastingsPt(machine, kernel, n_replicas=32, sweep_size=None):
+def MetropolisHastingsPt(machine, kernel, n_replicas=32, sweep_size=None, **kwargs):
     r"""
     ``MetropolisHastingsPt`` is a generic Metropolis-Hastings sampler using
     a local transition kernel to perform moves in the Markov Chain and replica-exchange moves
@@ -72,6 +80,9 @@ def MetropolisHastingsPt(machine, kernel, n_replicas=32, sweep_size=None):
         n_replicas (int): The number of replicas used for replica-exchange moves. Each replica samples
         sweep_size (int): The number of exchanges that compose a single sweep.
                     If None, sweep_size is equal to the number of degrees of freedom (the input size of the machine).
+        n_chains (int): The number of independent sets of replicas, evolved together. Each of them
+                    contributes the configuration of its replica at :math:`\beta=1` to every sweep, therefore
+                    n_chains samples are returned per sweep. Defaults to 1.
 
     """
-    return numpy.MetropolisHastingsPt(machine, kernel, n_replicas, sweep_size)
+    return numpy.MetropolisHastingsPt(machine, kernel, n_replicas, sweep_size, **kwargs)
@@ -72,6 +72,8 @@ def MetropolisLocalPt(machine, n_replicas=16, sweep_size=None, **kwargs):
                   from is :math:`F(\Psi(s))`, where the function
                   :math:`F(X)`, is arbitrary, by default :math:`F(X)=|X|^2`.
          n_replicas: The number of replicas used for parallel tempering.
+         n_chains: The number of independent sets of replicas, each one returning
+                   one sample per sweep. Defaults to 1.
          sweep_size: The number of exchanges that compose a single sweep.
                      If None, sweep_size is equal to the number of degrees of freedom (n_visible).
 
@@ -6,10 +6,6 @@ from netket import random as _random
 class _CustomKernel:
     def __init__(self, move_operators, move_weights=None):
 
-        self._rand_op_n = _np.empty(1, dtype=_np.intp)
-        self._sections = _np.empty(1, dtype=_np.intp)
-        self._x_prime = _np.empty(1)
-        self._mels = _np.empty(1)
         self._get_conn = move_operators.get_conn_filtered
         self._n_operators = move_operators.n_operators
 
@@ -42,20 +38,21 @@ class _CustomKernel:
 
     def transition(self, state, state_1, log_prob_corr):
 
-        self._rand_op_n, self._sections = self._pick_random_and_init(
-            state.shape[0], self._move_cumulative, self._rand_op_n, self._sections
-        )
+        # The scratch vectors are O(n_chains) and allocated at every call, so
+        # that the kernel can be used concurrently on different blocks of chains
+        rand_op_n = _np.empty(state.shape[0], dtype=_np.intp)
+        sections = _np.empty(state.shape[0], dtype=_np.intp)
 
-        self._x_prime, self._mels = self._get_conn(
-            state, self._sections, self._rand_op_n
+        rand_op_n, sections = self._pick_random_and_init(
+            state.shape[0], self._move_cumulative, rand_op_n, sections
         )
 
-        self._choose_and_return(
-            state_1, self._x_prime, self._mels, self._sections, log_prob_corr
-        )
+        x_prime, mels = self._get_conn(state, sections, rand_op_n)
+
+        self._choose_and_return(state_1, x_prime, mels, sections, log_prob_corr)
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _pick_random_and_init(batch_size, move_cumulative, out, sections):
 
         if out.size != batch_size:
@@ -68,7 +65,7 @@ class _CustomKernel:
         return out, sections
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _choose_and_return(state_1, x_prime, mels, sections, log_prob_corr):
         low = 0
         for i in range(state_1.shape[0]):
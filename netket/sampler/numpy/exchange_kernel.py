@@ -9,7 +9,7 @@ class _ExchangeKernel:
         self._hilbert = hilbert
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _transition(state, state_1, log_prob_corr, clusters):
 
         clusters_size = clusters.shape[0]
@@ -31,7 +31,7 @@ class _HamiltonianKernel:
             self._hilbert.random_state(out=state[i])
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def _choose(states, sections, out, w):
         low_range = 0
         for i, s in enumerate(sections):
@@ -1,5 +1,6 @@
 from ..abstract_sampler import AbstractSampler
 from netket import random as _random
+from netket.hilbert._compact_states import _machine_input
 
 from netket.stats import sum_inplace as _sum_inplace
 
@@ -7,10 +8,25 @@ import math
 import numpy as _np
 from numba import jit, int64, float64
 from ..._jitclass import jitclass
+from concurrent.futures import ThreadPoolExecutor
+
+
+@jit(nopython=True, nogil=True)
+def _seed_thread(seed):
+    # numba keeps a separate random state for every thread
+    _np.random.seed(seed)
 
 
 class MetropolisHastings(AbstractSampler):
-    def __init__(self, machine, kernel, n_chains=16, sweep_size=None):
+    def __init__(
+        self,
+        machine,
+        kernel,
+        n_chains=16,
+        sweep_size=None,
+        fast_update=True,
+        n_threads=1,
+    ):
 
         super().__init__(machine, n_chains)
 
@@ -20,6 +36,13 @@ class MetropolisHastings(AbstractSampler):
 
         self._kernel = kernel
 
+        # Use the lookup tables of the machine to compute the log-values of
+        # the proposed states, when available
+        self._fast_update = fast_update and machine.has_fast_update
+
+        self._pool = None
+        self.n_threads = n_threads
+
         self.machine_pow = 2.0
         self.reset(True)
 
@@ -34,13 +57,48 @@ class MetropolisHastings(AbstractSampler):
 
         self._n_chains = n_chains
 
-        self._state = _np.zeros((n_chains, self._input_size))
+        self._state = _np.zeros((n_chains, self._input_size), dtype=self.sample_dtype)
         self._state1 = _np.copy(self._state)
 
         self._log_values = _np.zeros(n_chains, dtype=_np.complex128)
         self._log_values_1 = _np.zeros(n_chains, dtype=_np.complex128)
         self._log_prob_corr = _np.zeros(n_chains)
 
+        self._lookup = None
+        self._sites = _np.empty((n_chains, self._input_size), dtype=_np.int64)
+        self._deltas = _np.empty((n_chains, self._input_size))
+        self._accepted_mask = _np.empty(n_chains, dtype=_np.bool_)
+
+    @property
+    def n_threads(self):
+        r"""The number of threads among which the chains are split."""
+        return self._n_threads
+
+    @n_threads.setter
+    def n_threads(self, n_threads):
+        if n_threads < 1:
+            raise ValueError("Expected a positive integer for n_threads ")
+
+        self._n_threads = int(n_threads)
+
+        # The threads of the previous pool are released
+        if self._pool is not None:
+            self._pool.shutdown()
+        self._pool = (
+            ThreadPoolExecutor(max_workers=self._n_threads)
+            if self._n_threads > 1
+            else None
+        )
+
+    def __del__(self):
+        if getattr(self, "_pool", None) is not None:
+            self._pool.shutdown(wait=False)
+
+    @property
+    def log_values(self):
+        r"""The log-values of the machine on the current state of the chains."""
+        return self._log_values
+
     @property
     def machine_pow(self):
         return self._machine_pow
@@ -64,13 +122,17 @@ class MetropolisHastings(AbstractSampler):
     def reset(self, init_random=False):
         if init_random:
             self._kernel.random_state(self._state)
-        self._log_values = self.machine.log_val(self._state, out=self._log_values)
+        state = _machine_input(self._state)
+        self._log_values = self.machine.log_val(state, out=self._log_values)
+
+        if self._fast_update:
+            self._lookup = self.machine.init_lookup(state, out=self._lookup)
 
         self._accepted_samples = 0
         self._total_samples = 0
 
     @staticmethod
-    @jit(nopython=True)
+    @jit(nopython=True, nogil=True)
     def acceptance_kernel(
         state, state1, log_values, log_values_1, log_prob_corr, machine_pow
     ):
@@ -89,15 +151,87 @@ class MetropolisHastings(AbstractSampler):
 
         return accepted
 
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def _masked_acceptance_kernel(
+        state, state1, log_values, log_values_1, log_prob_corr, machine_pow, mask
+    ):
+        accepted = 0
+
+        for i in range(state.shape[0]):
+            prob = _np.exp(
+                machine_pow * (log_values_1[i] - log_values[i] + log_prob_corr[i]).real
+            )
+            assert not math.isnan(prob)
+
+            mask[i] = prob > _random.uniform(0, 1)
+            if mask[i]:
+                log_values[i] = log_values_1[i]
+                state[i] = state1[i]
+                accepted += 1
+
+        return accepted
+
+    @staticmethod
+    @jit(nopython=True, nogil=True)
+    def _find_changes_kernel(state, state1, sites, deltas):
+        # Finds the sites where state1 differs from state, padding with -1.
+        # Returns the maximum number of changed sites across the batch.
+        max_changes = 0
+        for i in range(state.shape[0]):
+            k = 0
+            for j in range(state.shape[1]):
+                if state1[i, j] != state[i, j]:
+                    sites[i, k] = j
+                    deltas[i, k] = state1[i, j] - state[i, j]
+                    k += 1
+            for j in range(k, state.shape[1]):
+                sites[i, j] = -1
+                deltas[i, j] = 0.0
+            max_changes = max(max_changes, k)
+
+        return max_changes
+
     def __next__(self):
 
+        if self._fast_update and self._lookup is None:
+            self._lookup = self.machine.init_lookup(_machine_input(self._state))
+
+        if self._n_threads == 1:
+            accepted = self._sweep(slice(None))
+        else:
+            # Each block of chains is evolved by a different thread, using its own
+            # random stream. The seeds are drawn from the main stream, therefore
+            # results are reproducible for a given seed and number of threads.
+            bounds = _np.linspace(0, self._n_chains, self._n_threads + 1).astype(int)
+            blocks = [slice(bounds[i], bounds[i + 1]) for i in range(self._n_threads)]
+            seeds = _random.randint(0, 1 << 31, size=(self._n_threads,))
+
+            accepted = sum(self._pool.map(self._seeded_sweep, blocks, seeds))
+
+        self._total_samples += self.sweep_size * self.n_chains
+        self._accepted_samples += accepted
+
+        return self._state
+
+    def _seeded_sweep(self, chains, seed):
+        if chains.stop == chains.start:
+            return 0
+
+        _seed_thread(seed)
+        return self._sweep(chains)
+
+    def _sweep(self, chains):
+        if self._fast_update:
+            return self._sweep_fast_update(chains)
+
         _log_val = self.machine.log_val
         _acc_kernel = self.acceptance_kernel
-        _state = self._state
-        _state1 = self._state1
-        _log_values = self._log_values
-        _log_values_1 = self._log_values_1
-        _log_prob_corr = self._log_prob_corr
+        _state = self._state[chains]
+        _state1 = self._state1[chains]
+        _log_values = self._log_values[chains]
+        _log_values_1 = self._log_values_1[chains]
+        _log_prob_corr = self._log_prob_corr[chains]
         _machine_pow = self._machine_pow
         _t_kernel = self._kernel.transition
 
@@ -108,7 +242,7 @@ class MetropolisHastings(AbstractSampler):
             # Propose a new state using the transition kernel
             _t_kernel(_state, _state1, _log_prob_corr)
 
-            _log_values_1 = _log_val(_state1, out=_log_values_1)
+            _log_values_1 = _log_val(_machine_input(_state1), out=_log_values_1)
 
             # Acceptance Kernel
             accepted += _acc_kernel(
@@ -120,10 +254,55 @@ class MetropolisHastings(AbstractSampler):
                 _machine_pow,
             )
 
-        self._total_samples += self.sweep_size * self.n_chains
-        self._accepted_samples += accepted
+        return accepted
 
-        return self._state
+    def _sweep_fast_update(self, chains):
+
+        _machine = self.machine
+        _acc_kernel = self._masked_acceptance_kernel
+        _changes_kernel = self._find_changes_kernel
+        _state = self._state[chains]
+        _state1 = self._state1[chains]
+        _log_values = self._log_values[chains]
+        _log_values_1 = self._log_values_1[chains]
+        _log_prob_corr = self._log_prob_corr[chains]
+        _machine_pow = self._machine_pow
+        _t_kernel = self._kernel.transition
+        _lookup = self._lookup[chains]
+        _sites = self._sites[chains]
+        _deltas = self._deltas[chains]
+        _mask = self._accepted_mask[chains]
+
+        accepted = 0
+
+        for sweep in range(self.sweep_size):
+
+            # Propose a new state using the transition kernel
+            _t_kernel(_state, _state1, _log_prob_corr)
+
+            n_changes = _changes_kernel(_state, _state1, _sites, _deltas)
+            sites = _sites[:, :n_changes]
+            deltas = _deltas[:, :n_changes]
+
+            _log_values_1 = _machine.log_val_diff(
+                _lookup, sites, deltas, out=_log_values_1
+            )
+            _log_values_1 += _log_values
+
+            # Acceptance Kernel
+            accepted += _acc_kernel(
+                _state,
+                _state1,
+                _log_values,
+                _log_values_1,
+                _log_prob_corr,
+                _machine_pow,
+                _mask,
+            )
+
+            _machine.update_lookup(_lookup, sites, deltas, _mask)
+
+        return accepted
 
     @property
     def acceptance(self):
@@ -1,5 +1,6 @@
 import numpy as _np
 from ..abstract_sampler import AbstractSampler
+from netket.hilbert._compact_states import _machine_input
 
 from ...stats import mean as _mean
 
@@ -16,8 +17,11 @@ class MetropolisHastingsPt(AbstractSampler):
         kernel,
         n_replicas=32,
         sweep_size=None,
+        n_chains=1,
     ):
-        super().__init__(machine)
+        super().__init__(machine, n_chains)
+
+        self._n_chains = n_chains
 
         self.n_replicas = n_replicas
 
@@ -27,13 +31,25 @@ class MetropolisHastingsPt(AbstractSampler):
 
         self.machine_pow = 2.0
 
-        # Contains quantities to compute diffusion coefficient of replicas
-        # beta_stats[0] = position of replica at beta=1 (do not reset this!)
-        # beta_stats[1] = running average of beta=1 position
-        # beta_stats[2] = running average of beta=1 position**2
-        # beta_stats[3] = current number of exchange steps performed
-        self._beta_stats = _np.zeros(4)
+        self.reset(True)
 
+    @property
+    def n_chains(self):
+        r"""The number of independent tempering ladders, each one contributing
+        one sample per sweep."""
+        return self._n_chains
+
+    @n_chains.setter
+    def n_chains(self, n_chains):
+        if n_chains < 1:
+            raise ValueError("Expected n_chains>0. ")
+
+        self._n_chains = n_chains
+        self.sample_size = n_chains
+        self.sample_shape = (n_chains, self._input_size)
+
+        # Reallocates the buffers for the new number of chains
+        self.n_replicas = self._n_replicas
         self.reset(True)
 
     @property
@@ -47,22 +63,41 @@ class MetropolisHastingsPt(AbstractSampler):
 
         self._n_replicas = n_replicas
 
-        self._state = _np.zeros((n_replicas, self._input_size))
+        n_chains = self._n_chains
+
+        # The replicas of all the chains are stored contiguously, the replicas of
+        # chain c being in rows [c * n_replicas, (c + 1) * n_replicas), so that
+        # they are evolved with a single call to the machine
+        self._state = _np.zeros(
+            (n_chains * n_replicas, self._input_size), dtype=self.sample_dtype
+        )
         self._state1 = _np.copy(self._state)
 
-        self._log_values = _np.zeros(n_replicas, dtype=_np.complex128)
-        self._log_values_1 = _np.zeros(n_replicas, dtype=_np.complex128)
-        self._log_prob_corr = _np.zeros(n_replicas)
+        self._log_values = _np.zeros(n_chains * n_replicas, dtype=_np.complex128)
+        self._log_values_1 = _np.zeros(n_chains * n_replicas, dtype=_np.complex128)
+        self._log_prob_corr = _np.zeros(n_chains * n_replicas)
 
-        # Linearly spaced inverse temperature
-        self._beta = _np.empty(n_replicas)
+        # Linearly spaced inverse temperature, the same for all chains
+        self._beta = _np.empty((n_chains, n_replicas))
 
         for i in range(n_replicas):
-            self._beta[i] = 1.0 - float(i) / float(n_replicas)
+            self._beta[:, i] = 1.0 - float(i) / float(n_replicas)
+
+        # Contains quantities to compute diffusion coefficient of replicas
+        # beta_stats[c, 0] = position of replica at beta=1 (do not reset this!)
+        # beta_stats[c, 1] = running average of beta=1 position
+        # beta_stats[c, 2] = running average of beta=1 position**2
+        # beta_stats[c, 3] = current number of exchange steps performed
+        self._beta_stats = _np.zeros((n_chains, 4))
 
         # some temporary arrays
-        self._proposed_beta = _np.empty(n_replicas)
-        self._beta_prob = _np.empty(n_replicas)
+        self._proposed_beta = _np.empty((n_chains, n_replicas))
+        self._beta_prob = _np.empty((n_chains, n_replicas))
+
+    @property
+    def log_values(self):
+        r"""The log-values of the machine on the replicas at :math:`\beta=1`."""
+        return self._log_values[self._beta_one_rows()]
 
     @property
     def machine_pow(self):
@@ -86,12 +121,20 @@ class MetropolisHastingsPt(AbstractSampler):
         if init_random:
             self._kernel.random_state(self._state)
 
-        self._log_values = self.machine.log_val(self._state, out=self._log_values)
+        self._log_values = self.machine.log_val(
+            _machine_input(self._state), out=self._log_values
+        )
 
-        self._accepted_samples = _np.zeros(self._n_replicas)
+        self._accepted_samples = _np.zeros((self._n_chains, self._n_replicas))
         self._total_samples = 0
 
-        self._beta_stats[1:].fill(0)
+        self._beta_stats[:, 1:].fill(0)
+
+    def _beta_one_rows(self):
+        # Rows of the state holding the replica at beta=1, for every chain
+        return _np.arange(self._n_chains) * self._n_replicas + self._beta_stats[
+            :, 0
+        ].astype(_np.intp)
 
     @staticmethod
     @jit(nopython=True)
@@ -139,12 +182,17 @@ class MetropolisHastingsPt(AbstractSampler):
         _proposed_beta = self._proposed_beta
         _beta_prob = self._beta_prob
 
+        # Flat views matching the layout of the state
+        _beta_r = _beta.reshape(-1)
+        _accepted_samples_r = _accepted_samples.reshape(-1)
+        _log_values_rep = _log_values.reshape(_beta.shape)
+
         for sweep in range(self.sweep_size):
 
             # Propose a new state using the transition kernel
             _t_kernel(_state, _state1, _log_prob_corr)
 
-            _log_values_1 = _log_val(_state1, out=_log_values_1)
+            _log_values_1 = _log_val(_machine_input(_state1), out=_log_values_1)
 
             # Acceptance Kernel for fixed-beta moves
             _fb_acc_kernel(
@@ -154,13 +202,13 @@ class MetropolisHastingsPt(AbstractSampler):
                 _log_values_1,
                 _log_prob_corr,
                 _machine_pow,
-                _beta,
-                _accepted_samples,
+                _beta_r,
+                _accepted_samples_r,
             )
 
             # Transition + Acceptance Kernel for replica exchange moves
             self._exchange_step_kernel(
-                _log_values,
+                _log_values_rep,
                 _machine_pow,
                 _beta,
                 _proposed_beta,
@@ -170,54 +218,58 @@ class MetropolisHastingsPt(AbstractSampler):
             )
 
         self._total_samples += self.sweep_size
-        return self._state[_np.intp(_beta_stats[0])].reshape(1, -1)
+        return self._state[self._beta_one_rows()]
 
     @staticmethod
     @jit(nopython=True)
     def _exchange_step_kernel(
         log_values, machine_pow, beta, proposed_beta, prob, beta_stats, accepted_samples
     ):
-        # Choose a random swap order (odd/even swap)
-        swap_order = _random.randint(0, 2, size=()).item()
-
-        n_replicas = beta.shape[0]
-
-        for i in range(swap_order, n_replicas, 2):
-            inn = (i + 1) % n_replicas
-            proposed_beta[i] = beta[inn]
-            proposed_beta[inn] = beta[i]
-
-        for i in range(n_replicas):
-            prob[i] = math.exp(
-                machine_pow * (proposed_beta[i] - beta[i]) * log_values[i].real
-            )
+        n_chains = beta.shape[0]
+        n_replicas = beta.shape[1]
+
+        for c in range(n_chains):
+            # Choose a random swap order (odd/even swap)
+            swap_order = _random.randint(0, 2, size=()).item()
+
+            for i in range(swap_order, n_replicas, 2):
+                inn = (i + 1) % n_replicas
+                proposed_beta[c, i] = beta[c, inn]
+                proposed_beta[c, inn] = beta[c, i]
+
+            for i in range(n_replicas):
+                prob[c, i] = math.exp(
+                    machine_pow
+                    * (proposed_beta[c, i] - beta[c, i])
+                    * log_values[c, i].real
+                )
 
-        for i in range(swap_order, n_replicas, 2):
-            inn = (i + 1) % n_replicas
+            for i in range(swap_order, n_replicas, 2):
+                inn = (i + 1) % n_replicas
 
-            prob[i] *= prob[inn]
+                prob[c, i] *= prob[c, inn]
 
-            if prob[i] > _random.uniform(0, 1):
-                # swapping status
-                beta[i], beta[inn] = beta[inn], beta[i]
-                accepted_samples[i], accepted_samples[inn] = (
-                    accepted_samples[inn],
-                    accepted_samples[i],
-                )
+                if prob[c, i] > _random.uniform(0, 1):
+                    # swapping status
+                    beta[c, i], beta[c, inn] = beta[c, inn], beta[c, i]
+                    accepted_samples[c, i], accepted_samples[c, inn] = (
+                        accepted_samples[c, inn],
+                        accepted_samples[c, i],
+                    )
 
-                if beta_stats[0] == i:
-                    beta_stats[0] = inn
-                elif beta_stats[0] == inn:
-                    beta_stats[0] = i
+                    if beta_stats[c, 0] == i:
+                        beta_stats[c, 0] = inn
+                    elif beta_stats[c, 0] == inn:
+                        beta_stats[c, 0] = i
 
-        # Update statistics to compute diffusion coefficient of replicas
-        # Total exchange steps performed
-        beta_stats[-1] += 1
+            # Update statistics to compute diffusion coefficient of replicas
+            # Total exchange steps performed
+            beta_stats[c, -1] += 1
 
-        delta = beta_stats[0] - beta_stats[1]
-        beta_stats[1] += delta / float(beta_stats[-1])
-        delta2 = beta_stats[0] - beta_stats[1]
-        beta_stats[2] += delta * delta2
+            delta = beta_stats[c, 0] - beta_stats[c, 1]
+            beta_stats[c, 1] += delta / float(beta_stats[c, -1])
+            delta2 = beta_stats[c, 0] - beta_stats[c, 1]
+            beta_stats[c, 2] += delta * delta2
 
     @property
     def stats(self):
@@ -231,14 +283,15 @@ class MetropolisHastingsPt(AbstractSampler):
         # Average position of beta=1
         # This is normalized and centered around zero
         # In the ideal case the average should be zero
-        stats["normalized_beta=1_position"] = (
-            self._beta_stats[1] / float(self._n_replicas - 1) - 0.5
+        stats["normalized_beta=1_position"] = _mean(
+            self._beta_stats[:, 1] / float(self._n_replicas - 1) - 0.5
         )
 
         # Average variance on the position of beta=1
         # In the ideal case this quantity should be of order ~ [0.2, 1]
-        stats["normalized_beta=1_diffusion"] = _np.sqrt(
-            self._beta_stats[2] / self._beta_stats[-1]
-        ) / float(self._n_replicas)
+        stats["normalized_beta=1_diffusion"] = _mean(
+            _np.sqrt(self._beta_stats[:, 2] / self._beta_stats[:, -1])
+            / float(self._n_replicas)
+        )
 
         return stats
@@ -123,6 +123,8 @@ def statistics(data):
 
     stats = Stats()
     data = _np.atleast_1d(data)
+    # Data in single precision are accumulated in double precision
+    data = data.astype(_np.promote_types(data.dtype, _np.float64), copy=False)
     if data.ndim == 1:
         data = data.reshape((1, -1))
 
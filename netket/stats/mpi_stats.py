@@ -31,7 +31,7 @@ def subtract_mean(x, axis=None):
     return x
 
 
-def mean(a, axis=None, keepdims: bool = False):
+def mean(a, axis=None, dtype=None, keepdims: bool = False):
     """
     Compute the arithmetic mean along the specified axis and over MPI processes.
 
@@ -42,6 +42,8 @@ def mean(a, axis=None, keepdims: bool = False):
         a: The input array
         axis: Axis or axes along which the means are computed. The default (None) is to
               compute the mean of the flattened array.
+        dtype: The type used to accumulate the mean and of the result. The default (None)
+              is the type of the input for floating point inputs.
         keepdims: If True the output array will have the same number of dimensions as the input,
               with the reduced axes having length 1. (default=False)
 
@@ -49,7 +51,7 @@ def mean(a, axis=None, keepdims: bool = False):
         The array with reduced dimensions defined by axis.
 
     """
-    out = a.mean(axis=axis, keepdims=keepdims)
+    out = a.mean(axis=axis, dtype=dtype, keepdims=keepdims)
 
     out = _sum_inplace(out)
     out /= _n_nodes
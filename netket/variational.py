@@ -36,6 +36,7 @@ def estimate_expectations(
     """
 
     from netket.operator import local_values as _local_values
+    from netket.hilbert._compact_states import _machine_input
     from netket.stats import (
         statistics as _statistics,
         mean as _mean,
@@ -50,19 +51,19 @@ def estimate_expectations(
     # Burnout phase
     sampler.generate_samples(n_discard)
     # Generate samples
-    samples = sampler.generate_samples(n_samples).reshape(
-        (-1, sampler.sample_shape[-1])
-    )
+    samples, log_vals = sampler.generate_samples(n_samples, return_log_values=True)
+    samples = samples.reshape((-1, sampler.sample_shape[-1]))
+    log_vals = log_vals.reshape(-1)
 
     def estimate(op):
-        lvs = _local_values(op, psi, samples)
+        lvs = _local_values(op, psi, samples, log_vals=log_vals)
         stats = _statistics(lvs.T)
 
         if compute_gradients:
             samples_r = samples.reshape((-1, samples.shape[-1]))
             eloc_r = (lvs - _mean(lvs)).reshape(-1, 1)
             grad = sampler.machine.vector_jacobian_prod(
-                samples_r,
+                _machine_input(samples_r),
                 eloc_r / n_samples,
             )
             return stats, grad
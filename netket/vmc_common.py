@@ -1,3 +1,5 @@
+import math
+
 from .utils import jax_available
 
 
@@ -8,6 +10,84 @@ def info(obj, depth=None):
         return str(obj)
 
 
+def adaptive_n_discard(stats, n_discard, r_hat_max=1.1, tau_factor=2.0):
+    r"""
+    Returns the number of sweeps to discard before sampling from Markov chains
+    that have been carried over from the previous optimization step.
+
+    If the chains were equilibrated at the previous step, as diagnosed by
+    the Gelman-Rubin statistic R_hat, only a few autocorrelation times are
+    needed to forget the previous parameters. Otherwise, the full burn-in is performed.
+
+    Args:
+        stats (Stats): The statistics of a quantity sampled at the previous step,
+            or None if there is no previous step.
+        n_discard (int): The maximum (and fallback) number of sweeps to discard.
+        r_hat_max (float): The largest value of R_hat for which the chains are
+            considered equilibrated.
+        tau_factor (float): Number of autocorrelation times to discard.
+
+    Returns:
+        int: The number of sweeps to discard.
+    """
+    if stats is None:
+        return n_discard
+
+    tau_corr, r_hat = stats.tau_corr, stats.R_hat
+    if math.isnan(tau_corr) or math.isnan(r_hat) or r_hat > r_hat_max:
+        return n_discard
+
+    return min(n_discard, int(math.ceil(tau_factor * tau_corr)))
+
+
+def tuned_sweep_size(
+    stats, sweep_size, time_per_move, time_per_sample, max_sweep_size, r_hat_max=1.1
+):
+    r"""
+    Returns the sweep size maximizing the number of effective samples per second.
+
+    If :math:`T` is the autocorrelation time in units of single Metropolis moves,
+    :math:`a` the time spent for every move and :math:`b` the time spent to compute
+    the local estimators on every sample, a sweep of :math:`s` moves yields
+    effective samples at a rate :math:`[(1 + 2T/s)(as+b)]^{-1}`, which is maximal
+    for :math:`s=\sqrt{2Tb/a}`. To avoid following the statistical fluctuations
+    of :math:`T`, the result is rounded to a power of two and it differs at most
+    by a factor two from the current sweep size. The sweep size is never
+    decreased if the chains are not equilibrated, as diagnosed by R_hat. The
+    result is the largest power of two not exceeding `max_sweep_size` if no
+    power of two satisfies these constraints.
+
+    Args:
+        stats (Stats): The statistics of a quantity sampled with the current sweep size.
+        sweep_size (int): The current sweep size.
+        time_per_move (float): The time spent for every move of the chains.
+        time_per_sample (float): The time spent for every sample to compute the
+            local estimators.
+        max_sweep_size (int): The largest allowed sweep size.
+        r_hat_max (float): The largest value of R_hat for which the chains are
+            considered equilibrated.
+
+    Returns:
+        int: The new sweep size.
+    """
+    if stats is None or math.isnan(stats.tau_corr) or time_per_move <= 0:
+        return sweep_size
+
+    tau_moves = stats.tau_corr * sweep_size
+    optimal = math.sqrt(2.0 * tau_moves * time_per_sample / time_per_move)
+
+    optimal = 2 ** round(math.log2(max(optimal, 1.0)))
+
+    # The bounds are powers of two as well
+    if stats.R_hat > r_hat_max:
+        low = 2 ** math.ceil(math.log2(sweep_size))
+    else:
+        low = 2 ** math.ceil(math.log2(max(sweep_size / 2, 1.0)))
+    high = 2 ** math.floor(math.log2(max(min(2 * sweep_size, max_sweep_size), 1)))
+
+    return int(min(max(optimal, low), high))
+
+
 if jax_available:
     from jax import tree_map as _tree_map
 